@@ -18,34 +18,37 @@ class CoeffToSlotOperation:
 
     def apply(self, ciph, rot_keys, conj_key, encoder):
         """应用完整的系数到槽位转换"""
-        # 第一部分矩阵变换
-        s1 = self._multiply_matrix(ciph, self.boot_context.encoding_mat_conj_transpose0, rot_keys, encoder)
-        s2 = self._conjugate(ciph, conj_key)
-        s2 = self._multiply_matrix(s2, self.boot_context.encoding_mat_transpose0, rot_keys, encoder)
-        ciph0 = self._add(s1, s2)
+        # 两部分矩阵变换作用于同一密文及其共轭, 小步旋转各只计算一次
+        s1_0, s1_1 = self._multiply_matrices(ciph, [self.boot_context.encoding_mat_conj_transpose0,
+                                                    self.boot_context.encoding_mat_conj_transpose1],
+                                             rot_keys, encoder)
+        ciph_conj = self._conjugate(ciph, conj_key)
+        s2_0, s2_1 = self._multiply_matrices(ciph_conj, [self.boot_context.encoding_mat_transpose0,
+                                                         self.boot_context.encoding_mat_transpose1],
+                                             rot_keys, encoder)
+
+        # 第一部分
+        ciph0 = self._add(s1_0, s2_0)
 
         # 缩放和重缩放
-        constant = self._create_constant_plain(1 / self.params.poly_degree)
-        ciph0 = self._multiply_plain(ciph0, constant)
+        constant = 1 / self.params.poly_degree
+        ciph0 = self._multiply_const(ciph0, constant)
         ciph0 = self._rescale(ciph0, self.scaling_factor)
 
-        # 第二部分矩阵变换
-        s1 = self._multiply_matrix(ciph, self.boot_context.encoding_mat_conj_transpose1, rot_keys, encoder)
-        s2 = self._conjugate(ciph, conj_key)
-        s2 = self._multiply_matrix(s2, self.boot_context.encoding_mat_transpose1, rot_keys, encoder)
-        ciph1 = self._add(s1, s2)
+        # 第二部分
+        ciph1 = self._add(s1_1, s2_1)
 
         # 缩放和重缩放
-        ciph1 = self._multiply_plain(ciph1, constant)
+        ciph1 = self._multiply_const(ciph1, constant)
         ciph1 = self._rescale(ciph1, self.scaling_factor)
 
         return ciph0, ciph1
 
-    def _multiply_matrix(self, ciph, matrix, rot_keys, encoder):
-        """矩阵乘法实现"""
+    def _multiply_matrices(self, ciph, matrices, rot_keys, encoder):
+        """同一密文与多个矩阵的乘法实现"""
         from operations.matrix_ops import MatrixOperations
         matrix_ops = MatrixOperations(self.params, self.crt_context)
-        return matrix_ops.multiply_matrix(ciph, matrix, rot_keys, encoder)
+        return matrix_ops.multiply_matrices(ciph, matrices, rot_keys, encoder)
 
     def _conjugate(self, ciph, conj_key):
         """共轭操作实现"""
@@ -65,6 +68,12 @@ class CoeffToSlotOperation:
         arithmetic_ops = ArithmeticOperations(self.params, self.crt_context)
         return arithmetic_ops.multiply_plain(ciph, plain)
 
+    def _multiply_const(self, ciph, const):
+        """密文常数乘法实现"""
+        from operations.arithmetic import ArithmeticOperations
+        arithmetic_ops = ArithmeticOperations(self.params, self.crt_context)
+        return arithmetic_ops.multiply_const(ciph, const, self.scaling_factor)
+
     def _rescale(self, ciph, division_factor):
         """重缩放实现"""
         from operations.arithmetic import ArithmeticOperations
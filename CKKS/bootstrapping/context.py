@@ -1,5 +1,5 @@
 import math
-from operations.matrix_ops import MatrixOperations
+import numpy as np
 
 
 class CKKSBootstrappingContext:
@@ -9,6 +9,7 @@ class CKKSBootstrappingContext:
         self.poly_degree = params.poly_degree
         self.old_modulus = params.ciph_modulus
         self.num_taylor_iterations = params.num_taylor_iterations
+        self.context_cache = params.context_cache
         self.generate_encoding_matrices()
 
     def get_primitive_root(self, index):
@@ -17,7 +18,25 @@ class CKKSBootstrappingContext:
         return complex(math.cos(angle), math.sin(angle))
 
     def generate_encoding_matrices(self):
-        """生成编码矩阵"""
+        """生成编码矩阵, 配置了上下文缓存时从磁盘加载"""
+        if self.context_cache:
+            mat0, mat1 = self.context_cache.encoding_matrices(self.poly_degree, self.compute_encoding_matrices)
+        else:
+            mat0, mat1 = np.asarray(self.compute_encoding_matrices(), dtype=np.complex128)
+        self.encoding_mat0, self.encoding_mat1 = mat0, mat1
+
+        # 计算系数到槽位变换矩阵
+        self.encoding_mat_transpose0 = self.encoding_mat0.T
+        self.encoding_mat_conj_transpose0 = self.encoding_mat0.T.conj()
+        self.encoding_mat_transpose1 = self.encoding_mat1.T
+        self.encoding_mat_conj_transpose1 = self.encoding_mat1.T.conj()
+        # 矩阵为只读常量, 对角线缓存可按对象标识记忆其指纹
+        for matrix in (self.encoding_mat0, self.encoding_mat1,
+                       self.encoding_mat_conj_transpose0, self.encoding_mat_conj_transpose1):
+            matrix.flags.writeable = False
+
+    def compute_encoding_matrices(self):
+        """计算槽位到系数变换矩阵"""
         num_slots = self.poly_degree // 2
         primitive_roots = [0] * num_slots
         power = 1
@@ -26,23 +45,18 @@ class CKKSBootstrappingContext:
             primitive_roots[i] = self.get_primitive_root(power)
             power = (power * 5) % (2 * self.poly_degree)
 
-        # 计算槽位到系数变换矩阵
-        self.encoding_mat0 = [[1] * num_slots for _ in range(num_slots)]
-        self.encoding_mat1 = [[1] * num_slots for _ in range(num_slots)]
+        encoding_mat0 = [[1] * num_slots for _ in range(num_slots)]
+        encoding_mat1 = [[1] * num_slots for _ in range(num_slots)]
 
         for i in range(num_slots):
             for k in range(1, num_slots):
-                self.encoding_mat0[i][k] = self.encoding_mat0[i][k - 1] * primitive_roots[i]
+                encoding_mat0[i][k] = encoding_mat0[i][k - 1] * primitive_roots[i]
 
         for i in range(num_slots):
-            self.encoding_mat1[i][0] = self.encoding_mat0[i][-1] * primitive_roots[i]
+            encoding_mat1[i][0] = encoding_mat0[i][-1] * primitive_roots[i]
 
         for i in range(num_slots):
             for k in range(1, num_slots):
-                self.encoding_mat1[i][k] = self.encoding_mat1[i][k - 1] * primitive_roots[i]
+                encoding_mat1[i][k] = encoding_mat1[i][k - 1] * primitive_roots[i]
 
-        # 计算系数到槽位变换矩阵
-        self.encoding_mat_transpose0 = MatrixOperations.transpose_matrix(self.encoding_mat0)
-        self.encoding_mat_conj_transpose0 = MatrixOperations.conjugate_matrix(self.encoding_mat_transpose0)
-        self.encoding_mat_transpose1 = MatrixOperations.transpose_matrix(self.encoding_mat1)
-        self.encoding_mat_conj_transpose1 = MatrixOperations.conjugate_matrix(self.encoding_mat_transpose1)
\ No newline at end of file
+        return encoding_mat0, encoding_mat1
\ No newline at end of file
@@ -21,8 +21,7 @@ class FunctionEvaluation:
         if num_iterations is None:
             num_iterations = self.params.num_taylor_iterations
 
-        const_plain = self._create_complex_constant_plain(const / (2 ** num_iterations), encoder)
-        ciph = self._multiply_plain(ciph, const_plain)
+        ciph = self._multiply_const(ciph, const / (2 ** num_iterations))
         ciph = self._rescale(ciph, self.scaling_factor)
 
         # 泰勒展开评估
@@ -30,7 +29,7 @@ class FunctionEvaluation:
 
         # 重复平方
         for _ in range(num_iterations):
-            ciph_exp = self._multiply(ciph_exp, ciph_exp, relin_key)
+            ciph_exp = self._square(ciph_exp, relin_key)
             ciph_exp = self._rescale(ciph_exp, self.scaling_factor)
 
         return ciph_exp
@@ -47,8 +46,7 @@ class FunctionEvaluation:
         ciph_sin = self._subtract(ciph_exp_pos, ciph_exp_neg)
 
         # 除以 2i
-        scaling_constant = self._create_complex_constant_plain(1 / (2j), encoder)
-        ciph_sin = self._multiply_plain(ciph_sin, scaling_constant)
+        ciph_sin = self._multiply_const(ciph_sin, 1 / (2j))
         ciph_sin = self._rescale(ciph_sin, self.scaling_factor)
 
         return ciph_sin
@@ -65,8 +63,7 @@ class FunctionEvaluation:
         ciph_cos = self._add(ciph_exp_pos, ciph_exp_neg)
 
         # 除以 2
-        scaling_constant = self._create_constant_plain(0.5)
-        ciph_cos = self._multiply_plain(ciph_cos, scaling_constant)
+        ciph_cos = self._multiply_const(ciph_cos, 0.5)
         ciph_cos = self._rescale(ciph_cos, self.scaling_factor)
 
         return ciph_cos
@@ -75,29 +72,27 @@ class FunctionEvaluation:
         """泰勒级数指数函数评估"""
         # e^x ≈ 1 + x + x^2/2! + x^3/3! + x^4/4! + x^5/5! + x^6/6! + x^7/7!
 
-        result = self._create_constant_plain(1.0)
-
-        # x 项
-        result = self._add(result, ciph)
+        # 1 + x 项
+        result = self._add_const(ciph, 1.0)
 
         # x^2/2! 项
-        x2 = self._multiply(ciph, ciph, relin_key)
+        x2 = self._square(ciph, relin_key)
         x2 = self._rescale(x2, self.scaling_factor)
-        x2_scaled = self._multiply_plain(x2, self._create_constant_plain(0.5))
+        x2_scaled = self._multiply_const(x2, 0.5)
         x2_scaled = self._rescale(x2_scaled, self.scaling_factor)
         result = self._add(result, x2_scaled)
 
         # x^3/6 项
         x3 = self._multiply(x2, ciph, relin_key)
         x3 = self._rescale(x3, self.scaling_factor)
-        x3_scaled = self._multiply_plain(x3, self._create_constant_plain(1 / 6))
+        x3_scaled = self._multiply_const(x3, 1 / 6)
         x3_scaled = self._rescale(x3_scaled, self.scaling_factor)
         result = self._add(result, x3_scaled)
 
         # x^4/24 项
-        x4 = self._multiply(x2, x2, relin_key)
+        x4 = self._square(x2, relin_key)
         x4 = self._rescale(x4, self.scaling_factor)
-        x4_scaled = self._multiply_plain(x4, self._create_constant_plain(1 / 24))
+        x4_scaled = self._multiply_const(x4, 1 / 24)
         x4_scaled = self._rescale(x4_scaled, self.scaling_factor)
         result = self._add(result, x4_scaled)
 
@@ -120,12 +115,30 @@ class FunctionEvaluation:
         arithmetic_ops = ArithmeticOperations(self.params, self.crt_context)
         return arithmetic_ops.multiply(ciph1, ciph2, relin_key)
 
+    def _square(self, ciph, relin_key):
+        """同态平方"""
+        from operations.arithmetic import ArithmeticOperations
+        arithmetic_ops = ArithmeticOperations(self.params, self.crt_context)
+        return arithmetic_ops.square(ciph, relin_key)
+
     def _multiply_plain(self, ciph, plain):
         """密文明文乘法"""
         from operations.arithmetic import ArithmeticOperations
         arithmetic_ops = ArithmeticOperations(self.params, self.crt_context)
         return arithmetic_ops.multiply_plain(ciph, plain)
 
+    def _multiply_const(self, ciph, const):
+        """密文常数乘法"""
+        from operations.arithmetic import ArithmeticOperations
+        arithmetic_ops = ArithmeticOperations(self.params, self.crt_context)
+        return arithmetic_ops.multiply_const(ciph, const, self.scaling_factor)
+
+    def _add_const(self, ciph, const):
+        """密文常数加法"""
+        from operations.arithmetic import ArithmeticOperations
+        arithmetic_ops = ArithmeticOperations(self.params, self.crt_context)
+        return arithmetic_ops.add_const(ciph, const)
+
     def _add(self, ciph1, ciph2):
         """同态加法"""
         from operations.arithmetic import ArithmeticOperations
@@ -1,4 +1,5 @@
 from primitives.plaintext import Plaintext
+from mathematics.rns_polynomial import RNSPolynomial
 
 
 class CKKSDecryptor:
@@ -10,16 +11,35 @@ class CKKSDecryptor:
         self.secret_key = secret_key
 
     def decrypt(self, ciphertext, c2=None):
-        """完整解密实现"""
+        """完整解密实现, 未给出c2时使用三分量密文自身的c2"""
         (c0, c1) = (ciphertext.c0, ciphertext.c1)
+        if c2 is None:
+            c2 = ciphertext.c2
+
+        if isinstance(c0, RNSPolynomial):
+            return self.decrypt_rns(ciphertext, c2)
 
         message = c1.multiply(self.secret_key.s, ciphertext.modulus, crt=self.crt_context)
         message = c0.add(message, ciphertext.modulus)
 
         if c2:
-            secret_key_squared = self.secret_key.s.multiply(self.secret_key.s, ciphertext.modulus)
+            secret_key_squared = self.secret_key.s.multiply(self.secret_key.s, ciphertext.modulus,
+                                                            crt=self.crt_context)
             c2_message = c2.multiply(secret_key_squared, ciphertext.modulus, crt=self.crt_context)
             message = message.add(c2_message, ciphertext.modulus)
 
         message = message.mod_small(ciphertext.modulus)
+        return Plaintext(message, ciphertext.scaling_factor)
+
+    def decrypt_rns(self, ciphertext, c2=None):
+        """RNS密文解密: 在剩余上计算c0 + c1*s, 只做一次CRT重构"""
+        crt = ciphertext.c0.crt
+        s = RNSPolynomial.from_polynomial(self.secret_key.s, crt, ntt_form=True, bound=1)
+
+        message = ciphertext.c0.add(ciphertext.c1.multiply(s))
+        if c2:
+            c2 = c2 if isinstance(c2, RNSPolynomial) else RNSPolynomial.from_polynomial(c2, crt, bound=ciphertext.c0.bound)
+            message = message.add(c2.multiply(s.multiply(s)))
+
+        message = message.to_polynomial(ciphertext.modulus)
         return Plaintext(message, ciphertext.scaling_factor)
\ No newline at end of file
@@ -1,44 +1,109 @@
-from mathematics.fft import FFTContext
-from primitives.plaintext import Plaintext
+import numpy as np
+from mathematics.ntt import FFTContext
+from primitives.plaintext import Plaintext, PreparedPlaintext
 from mathematics.polynomial import Polynomial
+from mathematics.rns_polynomial import RNSPolynomial
+
+# 批量编码解码每次变换的复数数组字节数上限, 整批超出缓存后逐级蝶形反复读写主存, 反而慢于逐个编码
+CHUNK_BYTES = 1 << 18
 
 
 class CKKSEncoder:
     """完整的CKKS编码器实现"""
 
     def __init__(self, params):
+        self.params = params
         self.degree = params.poly_degree
         self.fft = FFTContext(self.degree * 2)
 
-    def encode(self, values, scaling_factor):
-        """完整编码实现"""
-        num_values = len(values)
+    def encode(self, values, scaling_factor, prepared=False, modulus=None):
+        """完整编码实现, prepared为True时返回NTT域的预处理明文(见prepare)"""
+        return self.encode_many([values], scaling_factor, prepared, modulus)[0]
+
+    @staticmethod
+    def _chunk_rows(num_values):
+        """每块的行数: 一块的复数数组不超过CHUNK_BYTES, 至少一行"""
+        return max(1, CHUNK_BYTES // (16 * num_values))
+
+    def encode_many(self, values, scaling_factor, prepared=False, modulus=None):
+        """批量编码: values为二维数组, 每行一个向量, 按缓存大小分块, 每块的规范嵌入逆变换一次完成"""
+        values = np.asarray(values, dtype=np.complex128)
+        assert values.ndim == 2, "批量编码输入必须是二维数组"
+        step = self._chunk_rows(values.shape[1])
+        plains = []
+        for start in range(0, len(values), step):
+            plains.extend(self._encode_chunk(values[start:start + step], scaling_factor))
+        if prepared:
+            return self.prepare_many(plains, modulus)
+        return plains
+
+    def _encode_chunk(self, values, scaling_factor):
+        """编码一块向量"""
+        num_values = values.shape[1]
         plain_len = num_values << 1
 
         # 规范嵌入逆变换
-        to_scale = self.fft.embedding_inv(values)
+        to_scale = self.fft.embedding_inv_array(values)
+
+        # 缩放和舍入, 实部为前一半系数, 虚部为后一半系数
+        scaled = np.concatenate((to_scale.real, to_scale.imag), axis=1) * scaling_factor + 0.5
+        if np.abs(scaled).max() < 2 ** 62:
+            # 与int()一样向零截断, 整数数组转列表比逐元素转换快得多
+            rows = np.trunc(scaled).astype(np.int64).tolist()
+        else:
+            rows = [[int(coeff) for coeff in row] for row in scaled.tolist()]
+        return [Plaintext(Polynomial(plain_len, row), scaling_factor) for row in rows]
 
-        # 缩放和舍入
-        message = [0] * plain_len
-        for i in range(num_values):
-            message[i] = int(to_scale[i].real * scaling_factor + 0.5)
-            message[i + num_values] = int(to_scale[i].imag * scaling_factor + 0.5)
+    def prepare(self, plain, modulus=None):
+        """将明文转换为NTT域的预处理明文, 之后的明文乘法跳过明文侧的全部变换
 
-        return Plaintext(Polynomial(plain_len, message), scaling_factor)
+        模数链模式下明文处于模数为modulus(默认最高层)的层, 可用于该层及以下各层的密文;
+        大整数模式下使用完整CRT上下文, 可用于任意模数的密文。
+        """
+        return self.prepare_many([plain], modulus)[0]
+
+    def prepare_many(self, plains, modulus=None):
+        """批量预处理明文, 所有明文的NTT在一次数组变换中完成"""
+        chain = self.params.modulus_chain
+        if chain:
+            crt = chain.context_for_modulus(modulus) if modulus else chain.level_context(chain.num_levels)
+        else:
+            crt = self.params.crt_context
+            assert crt is not None, '预处理明文需要CRT上下文'
+
+        residues = crt.ftt_fwd_array(np.stack([crt.crt_poly(plain.poly.coeffs) for plain in plains]))
+        prepared = []
+        for plain, plain_residues in zip(plains, residues):
+            # 模数链中按剩余类运算, 不追踪系数上界
+            bound = None if chain else max(abs(coeff) for coeff in plain.poly.coeffs)
+            poly = RNSPolynomial(plain.poly.ring_degree, plain_residues, crt, True, bound)
+            prepared.append(PreparedPlaintext(poly, plain.scaling_factor))
+        return prepared
 
     def decode(self, plain):
         """完整解码实现"""
-        if not isinstance(plain, Plaintext):
-            raise ValueError("解码输入必须是明文类型")
+        return self.decode_many([plain])[0].tolist()
+
+    def decode_many(self, plains):
+        """批量解码: 返回二维复数数组, 每行对应一个明文, 明文长度须相同; 与编码一样按缓存大小分块"""
+        for plain in plains:
+            if not isinstance(plain, Plaintext):
+                raise ValueError("解码输入必须是明文类型")
+
+        plain_len = len(plains[0].poly.coeffs)
+        assert all(len(plain.poly.coeffs) == plain_len for plain in plains), "批量解码的明文长度必须相同"
+        step = self._chunk_rows(plain_len >> 1)
+        return np.concatenate([self._decode_chunk(plains[start:start + step])
+                               for start in range(0, len(plains), step)])
 
-        plain_len = len(plain.poly.coeffs)
-        num_values = plain_len >> 1
+    def _decode_chunk(self, plains):
+        """解码一块明文"""
+        num_values = len(plains[0].poly.coeffs) >> 1
 
         # 恢复复数表示
-        message = [0] * num_values
-        for i in range(num_values):
-            message[i] = complex(plain.poly.coeffs[i] / plain.scaling_factor,
-                                 plain.poly.coeffs[i + num_values] / plain.scaling_factor)
+        scaled = np.array([plain.poly.coeffs for plain in plains], dtype=np.float64)
+        scaled /= np.array([[plain.scaling_factor] for plain in plains], dtype=np.float64)
+        message = scaled[:, :num_values] + 1j * scaled[:, num_values:]
 
         # 规范嵌入变换
-        return self.fft.embedding(message)
\ No newline at end of file
+        return self.fft.embedding_array(message)
\ No newline at end of file
@@ -1,26 +1,71 @@
-from primitives.ciphertext import Ciphertext
+import os
+import itertools
+import numpy as np
+from primitives.ciphertext import Ciphertext, SeededCiphertext
 from mathematics.polynomial import Polynomial
-from utils.random_sampler import sample_triangle
+from mathematics.rns_polynomial import RNSPolynomial
+from utils.random_sampler import XOFSampler
+
+# 本进程中反序列化加密器的次数, 用于区分同一进程收到的多个副本
+_unpickle_count = itertools.count()
 
 
 class CKKSEncryptor:
-    """完整的CKKS加密器"""
+    """完整的CKKS加密器
+
+    公钥约化到密文模数后以NTT形式缓存, 每次加密只需变换随机多项式;
+    全部加密的随机数由以seed初始化的SHAKE-256采样器批量生成。seed为None时从os.urandom取种子;
+    显式的seed使加密可复现, 只应用于测试与基准。加密器被序列化(如传给工作进程)时不复制采样器状态,
+    每个副本重新取种子, 显式种子时由进程号派生子采样器, 以免各进程产生相同的随机数。
+    """
 
-    def __init__(self, params, public_key, secret_key=None):
+    def __init__(self, params, public_key, secret_key=None, seed=None):
         self.poly_degree = params.poly_degree
         self.coeff_modulus = params.ciph_modulus
         self.big_modulus = params.big_modulus
         self.crt_context = params.crt_context
         self.public_key = public_key
         self.secret_key = secret_key
+        self.seeded = seed is not None
+        self.sampler = XOFSampler(seed)
+        self._public_key_ntt = {}
+        self._secret_key_ntt = {}
+        if self.crt_context:
+            self.public_key_ntt(self.coeff_modulus)
+
+    def __getstate__(self):
+        """序列化时只保留显式种子, 不保留采样器的计数器"""
+        state = self.__dict__.copy()
+        state['sampler'] = self.sampler.seed if self.seeded else None
+        return state
+
+    def __setstate__(self, state):
+        seed = state.pop('sampler')
+        self.__dict__.update(state)
+        if seed is None:
+            self.sampler = XOFSampler()
+        else:
+            self.sampler = XOFSampler(seed).child(f'{os.getpid()}:{next(_unpickle_count)}')
+
+    def public_key_ntt(self, modulus):
+        """公钥约化到模modulus后的NTT形式(p0, p1), 按模数缓存
+
+        与系数属于{-1, 0, 1}的多项式相乘再约化到modulus, 结果与原公钥相乘一致,
+        所用CRT上下文只需容纳 N * modulus 的乘积。
+        """
+        if modulus not in self._public_key_ntt:
+            crt = self.crt_context.context_for_product(modulus, 1)
+            self._public_key_ntt[modulus] = tuple(RNSPolynomial.from_polynomial(poly.mod(modulus), crt, ntt_form=True)
+                                                  for poly in (self.public_key.p0, self.public_key.p1))
+        return self._public_key_ntt[modulus]
 
     def encrypt_with_secret_key(self, plain):
         """私钥加密"""
         assert self.secret_key != None, '私钥不存在'
 
         sk = self.secret_key.s
-        random_vec = Polynomial(self.poly_degree, sample_triangle(self.poly_degree))
-        error = Polynomial(self.poly_degree, sample_triangle(self.poly_degree))
+        random_vec = Polynomial(self.poly_degree, self.sampler.ternary(self.poly_degree).tolist())
+        error = Polynomial(self.poly_degree, self.sampler.ternary(self.poly_degree).tolist())
 
         c0 = sk.multiply(random_vec, self.coeff_modulus, crt=self.crt_context)
         c0 = error.add(c0, self.coeff_modulus)
@@ -32,26 +77,111 @@ class CKKSEncryptor:
 
         return Ciphertext(c0, c1, plain.scaling_factor, self.coeff_modulus)
 
+    def encrypt_seeded(self, plain):
+        """种子压缩的私钥加密: c1 = a为由32字节种子展开的均匀多项式, c0 = -a*s + e + m
+
+        返回只携带c0与种子的SeededCiphertext, 上传与存储的数据量约为普通密文的一半。
+        """
+        assert self.secret_key is not None, '私钥不存在'
+
+        modulus = self.coeff_modulus
+        seed = self.sampler.random_bytes(32)
+        c1 = SeededCiphertext.expand(seed, self.poly_degree, modulus)
+        error = Polynomial(self.poly_degree, self.sampler.ternary(self.poly_degree).tolist())
+
+        if self.crt_context:
+            sk_ntt = self.secret_key_ntt(modulus)
+            c0 = RNSPolynomial.from_polynomial(c1, sk_ntt.crt, ntt_form=True).multiply(sk_ntt)
+            c0 = c0.to_polynomial(modulus)
+        else:
+            c0 = c1.multiply(self.secret_key.s, modulus)
+        c0 = c0.scalar_multiply(-1, modulus)
+        c0 = c0.add(error, modulus)
+        c0 = c0.add(plain.poly, modulus)
+        c0 = c0.mod_small(modulus)
+
+        return SeededCiphertext(c0, seed, plain.scaling_factor, modulus)
+
+    def secret_key_ntt(self, modulus):
+        """私钥在与模modulus多项式相乘所需CRT前缀上下文下的NTT形式, 按模数缓存"""
+        if modulus not in self._secret_key_ntt:
+            crt = self.crt_context.context_for_product(modulus, 1)
+            self._secret_key_ntt[modulus] = RNSPolynomial.from_polynomial(self.secret_key.s, crt, ntt_form=True)
+        return self._secret_key_ntt[modulus]
+
     def encrypt(self, plain):
         """公钥加密"""
         p0 = self.public_key.p0
         p1 = self.public_key.p1
 
-        random_vec = Polynomial(self.poly_degree, sample_triangle(self.poly_degree))
-        error1 = Polynomial(self.poly_degree, sample_triangle(self.poly_degree))
-        error2 = Polynomial(self.poly_degree, sample_triangle(self.poly_degree))
+        random_vec, error1, error2 = (Polynomial(self.poly_degree, sample.tolist())
+                                      for sample in self.sampler.ternary(3 * self.poly_degree).reshape(3, -1))
+
+        if self.crt_context:
+            p0_ntt, p1_ntt = self.public_key_ntt(self.coeff_modulus)
+            random_ntt = RNSPolynomial.from_polynomial(random_vec, p0_ntt.crt, ntt_form=True)
+            c0 = p0_ntt.multiply(random_ntt).to_polynomial(self.coeff_modulus)
+            c1 = p1_ntt.multiply(random_ntt).to_polynomial(self.coeff_modulus)
+        else:
+            c0 = p0.multiply(random_vec, self.coeff_modulus)
+            c1 = p1.multiply(random_vec, self.coeff_modulus)
 
-        c0 = p0.multiply(random_vec, self.coeff_modulus, crt=self.crt_context)
         c0 = error1.add(c0, self.coeff_modulus)
         c0 = c0.add(plain.poly, self.coeff_modulus)
         c0 = c0.mod_small(self.coeff_modulus)
 
-        c1 = p1.multiply(random_vec, self.coeff_modulus, crt=self.crt_context)
         c1 = error2.add(c1, self.coeff_modulus)
         c1 = c1.mod_small(self.coeff_modulus)
 
         return Ciphertext(c0, c1, plain.scaling_factor, self.coeff_modulus)
 
+    def encrypt_many(self, plains):
+        """批量公钥加密
+
+        全部随机多项式与误差由XOF采样器一次生成, 随机多项式的前向NTT、与两个公钥分量的乘积、
+        逆向NTT与CRT重构都对整批一次完成。大素数(object数组)的逐元素运算不因批量而加速,
+        此时逐个变换以避免过大的中间数组, 仍共享批量采样与缓存的公钥。
+        """
+        if not self.crt_context:
+            return [self.encrypt(plain) for plain in plains]
+
+        num_plains, degree, modulus = len(plains), self.poly_degree, self.coeff_modulus
+        assert all(len(plain.poly.coeffs) == degree for plain in plains), '明文长度必须等于多项式度数'
+        samples = self.sampler.ternary(3 * num_plains * degree).reshape(3, num_plains, degree)
+
+        p0_ntt, p1_ntt = self.public_key_ntt(modulus)
+        batch_size = num_plains if p0_ntt.crt.word_sized else 1
+        ciphs = []
+        for start in range(0, num_plains, batch_size):
+            ciphs.extend(self._encrypt_batch(plains[start:start + batch_size],
+                                             *samples[:, start:start + batch_size], p0_ntt, p1_ntt))
+        return ciphs
+
+    def _encrypt_batch(self, plains, random_vecs, errors1, errors2, p0_ntt, p1_ntt):
+        """以给定的随机多项式与误差加密一批明文"""
+        num_plains, degree, modulus = len(plains), self.poly_degree, self.coeff_modulus
+        crt = p0_ntt.crt
+        random_ntt = crt.ftt_fwd_array(crt.crt_poly(random_vecs))
+        products = np.stack([(random_ntt * p0_ntt.residues) % crt.moduli,
+                             (random_ntt * p1_ntt.residues) % crt.moduli])
+        products = crt.ftt_inv_array(products)
+
+        # 整批剩余按素数拼接后一次重构: 2 × 明文数 × 素数数 × N -> 素数数 × (2 * 明文数 * N)
+        residues = products.transpose(2, 0, 1, 3).reshape(len(crt.primes), 2 * num_plains * degree)
+        coeffs = crt.reconstruct_poly(residues, centered=True)
+
+        ciphs = []
+        for i, plain in enumerate(plains):
+            c0 = Polynomial(degree, coeffs[i * degree:(i + 1) * degree])
+            c0 = c0.add(Polynomial(degree, errors1[i].tolist()), modulus)
+            c0 = c0.add(plain.poly, modulus).mod_small(modulus)
+
+            offset = (num_plains + i) * degree
+            c1 = Polynomial(degree, coeffs[offset:offset + degree])
+            c1 = c1.add(Polynomial(degree, errors2[i].tolist()), modulus).mod_small(modulus)
+            ciphs.append(Ciphertext(c0, c1, plain.scaling_factor, modulus))
+        return ciphs
+
     def raise_modulus(self, new_modulus):
         """提升模数"""
         self.coeff_modulus = new_modulus
\ No newline at end of file
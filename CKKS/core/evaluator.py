@@ -6,6 +6,7 @@ from operations.matrix_ops import MatrixOperations
 from operations.rotation import RotationOperations
 from operations.bootstrapping import BootstrappingOperations
 from bootstrapping.context import CKKSBootstrappingContext
+from utils.serialization import serialize
 
 
 class CKKSEvaluator:
@@ -17,12 +18,21 @@ class CKKSEvaluator:
         self.scaling_factor = params.scaling_factor
         self.boot_context = CKKSBootstrappingContext(params)
         self.crt_context = params.crt_context
+        self.params = params
 
         self.arithmetic = ArithmeticOperations(params, self.crt_context)
         self.matrix_ops = MatrixOperations(params, self.crt_context)
         self.rotation_ops = RotationOperations(params, self.crt_context)
         self.bootstrapping_ops = BootstrappingOperations(params, self.crt_context, self.boot_context)
 
+    def to_rns(self, ciph, ntt_form=True):
+        """转换为RNS密文表示"""
+        return self.arithmetic.to_rns(ciph, ntt_form)
+
+    def from_rns(self, ciph):
+        """由RNS表示转换回系数表示"""
+        return self.arithmetic.from_rns(ciph)
+
     def add(self, ciph1, ciph2):
         """同态加法"""
         assert isinstance(ciph1, Ciphertext)
@@ -57,6 +67,20 @@ class CKKSEvaluator:
 
         return self.arithmetic.multiply(ciph1, ciph2, relin_key)
 
+    def multiply_no_relin(self, ciph1, ciph2):
+        """不做重线性化的同态乘法, 返回三分量密文"""
+        assert isinstance(ciph1, Ciphertext)
+        assert isinstance(ciph2, Ciphertext)
+        assert ciph1.modulus == ciph2.modulus, "模数不相等"
+
+        return self.arithmetic.multiply_no_relin(ciph1, ciph2)
+
+    def square(self, ciph, relin_key):
+        """同态平方"""
+        assert isinstance(ciph, Ciphertext)
+
+        return self.arithmetic.square(ciph, relin_key)
+
     def multiply_plain(self, ciph, plain):
         """密文与明文乘法"""
         assert isinstance(ciph, Ciphertext)
@@ -64,10 +88,28 @@ class CKKSEvaluator:
 
         return self.arithmetic.multiply_plain(ciph, plain)
 
+    def multiply_const(self, ciph, const, scaling_factor=None):
+        """密文乘以实数或复数常数, O(N)"""
+        assert isinstance(ciph, Ciphertext)
+
+        return self.arithmetic.multiply_const(ciph, const, scaling_factor)
+
+    def add_const(self, ciph, const):
+        """密文加上实数或复数常数, O(N)"""
+        assert isinstance(ciph, Ciphertext)
+
+        return self.arithmetic.add_const(ciph, const)
+
     def relinearize(self, relin_key, c0, c1, c2, new_scaling_factor, modulus):
         """重线性化"""
         return self.arithmetic.relinearize(relin_key, c0, c1, c2, new_scaling_factor, modulus)
 
+    def relinearize_ciphertext(self, ciph, relin_key):
+        """对累加后的三分量密文做一次重线性化"""
+        assert isinstance(ciph, Ciphertext)
+
+        return self.arithmetic.relinearize_ciphertext(ciph, relin_key)
+
     def rescale(self, ciph, division_factor):
         """重缩放"""
         return self.arithmetic.rescale(ciph, division_factor)
@@ -76,6 +118,14 @@ class CKKSEvaluator:
         """降低模数"""
         return self.arithmetic.lower_modulus(ciph, division_factor)
 
+    def compact(self, ciph, precision, max_value):
+        """降到满足输出精度的最小模数, max_value为槽位取值绝对值的上界"""
+        return self.arithmetic.compact(ciph, precision, max_value)
+
+    def serialize_compact(self, ciph, precision, max_value):
+        """压缩到最小模数后序列化, 系数字宽与压缩后的模数匹配"""
+        return serialize(self.compact(ciph, precision, max_value), self.params)
+
     def switch_key(self, ciph, key):
         """密钥交换"""
         return self.rotation_ops.switch_key(ciph, key)
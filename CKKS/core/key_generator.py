@@ -1,64 +1,142 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
 from primitives.secret_key import SecretKey
 from primitives.public_key import PublicKey
 from primitives.rotation_key import RotationKey
 from mathematics.polynomial import Polynomial
-from utils.random_sampler import sample_triangle, sample_uniform, sample_hamming_weight_vector
+from utils.random_sampler import XOFSampler
+
+# 工作进程中的密钥生成器, 由进程池初始化函数设置
+_worker_generator = None
+
+
+def _init_worker(params, secret_key):
+    """进程池初始化: 每个工作进程只接收一次参数与私钥"""
+    global _worker_generator
+    _worker_generator = CKKSKeyGenerator.from_secret_key(params, secret_key)
+
+
+def _galois_key_task(task):
+    """工作进程中生成一个旋转或共轭密钥"""
+    rotation, sampler = task
+    return rotation, _worker_generator.generate_galois_key(rotation, sampler)
 
 
 class CKKSKeyGenerator:
-    """完整的CKKS密钥生成器"""
+    """完整的CKKS密钥生成器
+
+    全部随机数由以seed初始化的SHAKE-256采样器生成: 私钥、公钥与重线性化密钥各用一个子采样器,
+    每个旋转密钥与共轭密钥的子采样器由旋转量派生, 因此结果与生成顺序及工作进程数无关。
+    seed为None时从os.urandom取种子; 显式的seed只应用于测试与可复现的基准。
+    """
 
-    def __init__(self, params):
+    def __init__(self, params, seed=None):
         self.params = params
+        self.crt_context = params.crt_context
+        self.sampler = XOFSampler(seed)
         self.generate_secret_key(params)
         self.generate_public_key(params)
         self.generate_relin_key(params)
 
+    @classmethod
+    def from_secret_key(cls, params, secret_key):
+        """由已有私钥构造密钥生成器, 不重新生成公钥与重线性化密钥"""
+        generator = cls.__new__(cls)
+        generator.params = params
+        generator.crt_context = params.crt_context
+        generator.secret_key = secret_key
+        generator.sampler = XOFSampler()
+        return generator
+
+    def _crt_for(self, coeff_modulus):
+        """系数位于[0, coeff_modulus)的多项式与私钥(系数属于{-1, 0, 1})相乘所用的CRT上下文"""
+        if self.crt_context is None:
+            return None
+        return self.crt_context.context_for_product(coeff_modulus, 1)
+
     def generate_secret_key(self, params):
         """生成私钥"""
-        key = sample_hamming_weight_vector(params.poly_degree, params.hamming_weight)
+        key = self.sampler.child('secret').hamming_weight(params.poly_degree, params.hamming_weight).tolist()
         self.secret_key = SecretKey(Polynomial(params.poly_degree, key))
 
     def generate_public_key(self, params):
         """生成公钥"""
-        mod = self.params.big_modulus
+        mod = self.params.pk_modulus
+        sampler = self.sampler.child('public')
 
-        pk_coeff = Polynomial(params.poly_degree, sample_uniform(0, mod, params.poly_degree))
-        pk_error = Polynomial(params.poly_degree, sample_triangle(params.poly_degree))
-        p0 = pk_coeff.multiply(self.secret_key.s, mod)
+        pk_coeff = Polynomial(params.poly_degree, sampler.uniform(params.poly_degree, mod).tolist())
+        pk_error = Polynomial(params.poly_degree, sampler.ternary(params.poly_degree).tolist())
+        p0 = pk_coeff.multiply(self.secret_key.s, mod, crt=self._crt_for(mod))
         p0 = p0.scalar_multiply(-1, mod)
         p0 = p0.add(pk_error, mod)
         p1 = pk_coeff
         self.public_key = PublicKey(p0, p1)
 
-    def generate_switching_key(self, new_key):
-        """生成交换密钥"""
+    def generate_switching_key(self, new_key, sampler):
+        """以采样器sampler生成交换密钥"""
         mod = self.params.big_modulus
-        mod_squared = mod ** 2
+        swk_mod = self.params.swk_modulus
 
-        swk_coeff = Polynomial(self.params.poly_degree, sample_uniform(0, mod_squared, self.params.poly_degree))
-        swk_error = Polynomial(self.params.poly_degree, sample_triangle(self.params.poly_degree))
+        swk_coeff = Polynomial(self.params.poly_degree, sampler.uniform(self.params.poly_degree, swk_mod).tolist())
+        swk_error = Polynomial(self.params.poly_degree, sampler.ternary(self.params.poly_degree).tolist())
 
-        sw0 = swk_coeff.multiply(self.secret_key.s, mod_squared)
-        sw0 = sw0.scalar_multiply(-1, mod_squared)
-        sw0 = sw0.add(swk_error, mod_squared)
-        temp = new_key.scalar_multiply(mod, mod_squared)
-        sw0 = sw0.add(temp, mod_squared)
+        sw0 = swk_coeff.multiply(self.secret_key.s, swk_mod, crt=self._crt_for(swk_mod))
+        sw0 = sw0.scalar_multiply(-1, swk_mod)
+        sw0 = sw0.add(swk_error, swk_mod)
+        temp = new_key.scalar_multiply(mod, swk_mod)
+        sw0 = sw0.add(temp, swk_mod)
         sw1 = swk_coeff
         return PublicKey(sw0, sw1)
 
     def generate_relin_key(self, params):
         """生成重线性化密钥"""
-        sk_squared = self.secret_key.s.multiply(self.secret_key.s, self.params.big_modulus)
-        self.relin_key = self.generate_switching_key(sk_squared)
+        sk_squared = self.secret_key.s.multiply(self.secret_key.s, self.params.big_modulus,
+                                                crt=self._crt_for(1))
+        sk_squared = sk_squared.mod_small(self.params.big_modulus)
+        self.relin_key = self.generate_switching_key(sk_squared, self.sampler.child('relin'))
 
-    def generate_rot_key(self, rotation):
-        """生成旋转密钥"""
+    def generate_rot_key(self, rotation, sampler=None):
+        """生成旋转密钥, 默认使用由旋转量派生的子采样器"""
         new_key = self.secret_key.s.rotate(rotation)
-        rk = self.generate_switching_key(new_key)
+        rk = self.generate_switching_key(new_key, sampler or self.sampler.child(rotation))
         return RotationKey(rotation, rk)
 
-    def generate_conj_key(self):
+    def generate_conj_key(self, sampler=None):
         """生成共轭密钥"""
         new_key = self.secret_key.s.conjugate()
-        return self.generate_switching_key(new_key)
\ No newline at end of file
+        return self.generate_switching_key(new_key, sampler or self.sampler.child('conj'))
+
+    def generate_galois_key(self, rotation, sampler):
+        """以给定采样器生成一个旋转密钥, rotation为None时生成共轭密钥"""
+        if rotation is None:
+            return self.generate_conj_key(sampler)
+        return self.generate_rot_key(rotation, sampler)
+
+    def generate_galois_keys(self, rotations, conjugate=True, num_workers=None, seed=None):
+        """批量生成旋转密钥与共轭密钥
+
+        每个密钥使用由总采样器与旋转量派生的子采样器, 因此结果与工作进程数无关;
+        seed为None时总采样器为本生成器的采样器, 与generate_rot_key/generate_conj_key的结果相同。
+        num_workers为1时在当前进程中顺序生成, 默认使用全部CPU核。
+        返回(按旋转量索引的旋转密钥字典, 共轭密钥或None)。
+        """
+        root = self.sampler if seed is None else XOFSampler(seed)
+        tasks = [(rotation, root.child(rotation)) for rotation in rotations]
+        if conjugate:
+            tasks.append((None, root.child('conj')))
+
+        num_workers = min(num_workers or os.cpu_count() or 1, len(tasks))
+        if num_workers <= 1:
+            results = [(rotation, self.generate_galois_key(rotation, sampler)) for rotation, sampler in tasks]
+        else:
+            with ProcessPoolExecutor(max_workers=num_workers, initializer=_init_worker,
+                                     initargs=(self.params, self.secret_key)) as executor:
+                results = list(executor.map(_galois_key_task, tasks))
+
+        rot_keys = {rotation: key for rotation, key in results if rotation is not None}
+        conj_key = next((key for rotation, key in results if rotation is None), None)
+        return rot_keys, conj_key
+
+    def generate_rot_keys(self, rotations, num_workers=None, seed=None):
+        """批量并行生成旋转密钥, 返回按旋转量索引的字典"""
+        return self.generate_galois_keys(rotations, conjugate=False, num_workers=num_workers, seed=seed)[0]
\ No newline at end of file
@@ -1,27 +1,52 @@
 import math
-from mathematics.crt import CRTContext
+from mathematics.crt import CRTContext, SMALL_PRIME_SIZE
+from mathematics.modulus_chain import ModulusChain
+from utils.context_cache import ContextCache
+from utils.diagonal_cache import DiagonalCache
 
 
 class CKKSParameters:
     """完整的CKKS参数配置"""
 
     def __init__(self, poly_degree, ciph_modulus, big_modulus, scaling_factor,
-                 taylor_iterations=6, prime_size=59, hamming_weight=None):
+                 taylor_iterations=6, prime_size=59, hamming_weight=None, small_primes=False,
+                 modulus_chain=False, context_cache=None, diagonal_cache=True):
         self.poly_degree = poly_degree
         self.ciph_modulus = ciph_modulus
         self.big_modulus = big_modulus
         self.scaling_factor = scaling_factor
+        self.modulus_chain = None
+        if modulus_chain:
+            # 模数链模式下密文模数与大模数由链上素数的乘积给出
+            self.modulus_chain = ModulusChain(poly_degree, scaling_factor, ciph_modulus, big_modulus)
+            self.ciph_modulus = self.modulus_chain.ciph_modulus
+            self.big_modulus = self.modulus_chain.special_modulus
+        # 公钥模数与交换密钥模数: 交换密钥含 big_modulus * s', 在模 ciph_modulus * big_modulus 下使用
+        self.pk_modulus = self.ciph_modulus * self.big_modulus if modulus_chain else self.big_modulus
+        self.swk_modulus = self.ciph_modulus * self.big_modulus if modulus_chain else self.big_modulus ** 2
         self.num_taylor_iterations = taylor_iterations
-        self.prime_size = prime_size
+        self.small_primes = small_primes
+        self.prime_size = min(prime_size, SMALL_PRIME_SIZE) if small_primes and prime_size else prime_size
         self.hamming_weight = hamming_weight if hamming_weight else poly_degree // 4
+        # context_cache可为ContextCache实例或缓存目录
+        self.context_cache = ContextCache(context_cache) if isinstance(context_cache, str) else context_cache
+        # 矩阵乘法编码对角线缓存: True时为256MB的内存缓存, 配置了上下文缓存时同时持久化到磁盘;
+        # 可传入DiagonalCache实例, None或False时不缓存
+        if diagonal_cache is True:
+            diagonal_cache = DiagonalCache(context_cache=self.context_cache)
+        self.diagonal_cache = diagonal_cache or None
         self.crt_context = self._create_crt_context()
 
     def _create_crt_context(self):
         """创建CRT上下文"""
         if self.prime_size:
             num_primes = 1 + int((1 + math.log(self.poly_degree, 2) +
-                                  4 * math.log(self.big_modulus, 2)) / self.prime_size)
-            return CRTContext(num_primes, self.prime_size, self.poly_degree)
+                                  2 * math.log(self.swk_modulus, 2)) / self.prime_size)
+            if self.context_cache:
+                return self.context_cache.crt_context(num_primes, self.prime_size, self.poly_degree,
+                                                      small_primes=self.small_primes)
+            return CRTContext(num_primes, self.prime_size, self.poly_degree,
+                              small_primes=self.small_primes)
         return None
 
     def print_parameters(self):
@@ -34,4 +59,11 @@ class CKKSParameters:
         print(f"  泰勒迭代次数: {self.num_taylor_iterations}")
         print(f"  汉明权重: {self.hamming_weight}")
         print(f"  素数大小: {self.prime_size}位")
-        print(f"  RNS支持: {'是' if self.crt_context else '否'}")
\ No newline at end of file
+        print(f"  RNS支持: {'是' if self.crt_context else '否'}")
+        if self.crt_context:
+            print(f"  RNS素数个数: {len(self.crt_context.primes)}")
+            print(f"  RNS模式: {'小素数(uint64)' if self.crt_context.word_sized else '大素数(任意精度)'}")
+        if self.modulus_chain:
+            chain = self.modulus_chain
+            print(f"  模数链: {chain.num_levels}层, 链素数{len(chain.chain_primes)}个, "
+                  f"特殊素数{len(chain.special_primes)}个")
\ No newline at end of file
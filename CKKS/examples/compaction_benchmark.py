@@ -0,0 +1,77 @@
+"""传输前压缩性能测试: 结果密文按输出精度降到最小模数后, 序列化字节数与解密误差的变化"""
+
+import time
+import numpy as np
+from core.parameters import CKKSParameters
+from core.key_generator import CKKSKeyGenerator
+from core.encoder import CKKSEncoder
+from core.encryptor import CKKSEncryptor
+from core.decryptor import CKKSDecryptor
+from core.evaluator import CKKSEvaluator
+from utils.serialization import serialize
+
+
+def workloads(evaluator, encoder, encryptor, params, relin_key, rng):
+    """典型计算的结果密文、明文期望值与槽位取值上界: 新鲜密文、大取值密文、一次乘法、三次多项式"""
+    num_slots = params.poly_degree // 2
+    x, y = rng.uniform(-1, 1, (2, num_slots))
+    z = rng.uniform(-8, 8, num_slots)
+    ciph_x, ciph_y, ciph_z = [encryptor.encrypt(plain) for plain in
+                              encoder.encode_many(np.array([x, y, z]), params.scaling_factor)]
+
+    def multiply(ciph1, ciph2):
+        return evaluator.rescale(evaluator.multiply(ciph1, ciph2, relin_key), params.scaling_factor)
+
+    ciph_xy = multiply(ciph_x, ciph_y)
+    ciph_x2 = multiply(ciph_x, ciph_x)
+    ciph_x = evaluator.lower_modulus(ciph_x, params.scaling_factor)
+    ciph_x3 = multiply(ciph_x2, ciph_x)
+    return [('新鲜密文', ciph_y, y, 1), ('大取值密文', ciph_z, z, 8), ('一次乘法', ciph_xy, x * y, 1),
+            ('三次多项式', ciph_x3, x ** 3, 1)]
+
+
+def benchmark_compaction(poly_degree=2048, precisions=(10, 20), seed=0):
+    """两种模式下各计算结果在不同输出精度下的字节数与误差, 检查新增误差不超过2^-precision"""
+    rng = np.random.default_rng(seed)
+    all_correct = True
+    for modulus_chain in (False, True):
+        params = CKKSParameters(poly_degree=poly_degree, ciph_modulus=1 << 200, big_modulus=1 << 240,
+                                scaling_factor=1 << (30 if modulus_chain else 40), modulus_chain=modulus_chain)
+        key_generator = CKKSKeyGenerator(params, seed=seed)
+        encoder = CKKSEncoder(params)
+        encryptor = CKKSEncryptor(params, key_generator.public_key, seed=seed)
+        decryptor = CKKSDecryptor(params, key_generator.secret_key)
+        evaluator = CKKSEvaluator(params)
+
+        print(f"传输前压缩测试 (N = {poly_degree}, {'模数链' if modulus_chain else '大整数'}模式)")
+        print(f"{'计算':<8} {'上界':>4} {'精度':>4} {'模数位数':>10} {'原字节':>8} {'压缩字节':>8} {'节省':>7} "
+              f"{'原误差':>10} {'压缩后误差':>10} {'压缩(毫秒)':>10}")
+        for name, ciph, expected, max_value in workloads(evaluator, encoder, encryptor, params,
+                                              key_generator.relin_key, rng):
+            ciph = evaluator.from_rns(ciph)
+            original_size = len(serialize(ciph, params))
+            original_error = np.abs(np.array(encoder.decode(decryptor.decrypt(ciph))) - expected).max()
+            for precision in precisions:
+                start_time = time.time()
+                data = evaluator.serialize_compact(ciph, precision, max_value)
+                compact_time = time.time() - start_time
+
+                compacted = evaluator.compact(ciph, precision, max_value)
+                error = np.abs(np.array(encoder.decode(decryptor.decrypt(compacted))) - expected).max()
+                correct = error <= original_error + 2.0 ** -precision and len(data) <= original_size
+                all_correct = all_correct and correct
+                print(f"{name:<8} {max_value:>4} {precision:>4} {ciph.modulus.bit_length():>4} -> {compacted.modulus.bit_length():>3} "
+                      f"{original_size:>8} {len(data):>8} {1 - len(data) / original_size:>7.1%} "
+                      f"{original_error:>10.2e} {error:>10.2e} {compact_time * 1000:>10.1f}"
+                      f"{'' if correct else '  误差超出要求!'}")
+        print()
+
+    return all_correct
+
+
+if __name__ == "__main__":
+    success = benchmark_compaction()
+    if success:
+        print("✅ 压缩后的密文满足输出精度要求!")
+    else:
+        print("❌ 压缩后的密文不满足输出精度要求!")
\ No newline at end of file
@@ -0,0 +1,77 @@
+"""常数运算性能测试: 常数明文的多项式乘法与O(N)系数缩放/单项式移位的耗时对比"""
+
+import time
+import random
+from core.parameters import CKKSParameters
+from core.key_generator import CKKSKeyGenerator
+from core.encryptor import CKKSEncryptor
+from operations.arithmetic import ArithmeticOperations
+from primitives.plaintext import Plaintext
+from mathematics.polynomial import Polynomial
+
+
+def constant_plain(arithmetic, const, scaling_factor):
+    """常数c在所有槽位上的明文: round(Re(c)*Δ) + round(Im(c)*Δ) * x^(N/2)"""
+    poly_degree = arithmetic.params.poly_degree
+    real, imag = arithmetic._constant_coeffs(const, scaling_factor)
+    coeffs = [0] * poly_degree
+    coeffs[0], coeffs[poly_degree // 2] = real, imag
+    return Plaintext(Polynomial(poly_degree, coeffs), scaling_factor)
+
+
+def components(ciph):
+    """密文各分量的整数系数"""
+    return [poly.coeffs if isinstance(poly, Polynomial) else poly.to_polynomial(ciph.modulus).coeffs
+            for poly in (ciph.c0, ciph.c1)]
+
+
+def benchmark_constant_ops(log_degrees=(10, 12), constants=(0.37, -2.5, 0.3 - 1.2j), seed=0):
+    """大整数模式与RNS表示下对比常数乘法/加法的耗时, 并检查与明文路径结果一致"""
+    print("常数运算性能测试 (单位: 毫秒/次)")
+    print(f"{'N':>6} {'表示':>6} {'明文乘法':>10} {'常数乘法':>10} {'明文加法':>10} {'常数加法':>10}")
+
+    all_exact = True
+    for log_degree in log_degrees:
+        random.seed(seed)
+        poly_degree = 1 << log_degree
+        params = CKKSParameters(poly_degree=poly_degree, ciph_modulus=1 << 120, big_modulus=1 << 160,
+                                scaling_factor=1 << 30)
+        key_generator = CKKSKeyGenerator(params, seed=seed)
+        encryptor = CKKSEncryptor(params, key_generator.public_key, key_generator.secret_key, seed=seed)
+        arithmetic = ArithmeticOperations(params, params.crt_context)
+
+        message = [random.randint(-1000, 1000) * params.scaling_factor for _ in range(poly_degree)]
+        ciph = encryptor.encrypt(Plaintext(Polynomial(poly_degree, message), params.scaling_factor))
+
+        for name, operand in (('大整数', ciph), ('RNS', arithmetic.to_rns(ciph))):
+            timings = [0.0] * 4
+            exact = True
+            for const in constants:
+                mul_plain = constant_plain(arithmetic, const, params.scaling_factor)
+                add_plain = constant_plain(arithmetic, const, operand.scaling_factor)
+                results = []
+                for i, (func, arg) in enumerate(((arithmetic.multiply_plain, mul_plain),
+                                                 (arithmetic.multiply_const, const),
+                                                 (arithmetic.add_plain, add_plain),
+                                                 (arithmetic.add_const, const))):
+                    start_time = time.time()
+                    results.append(func(operand, arg))
+                    timings[i] += time.time() - start_time
+
+                exact = exact and components(results[0]) == components(results[1]) and \
+                    components(results[2]) == components(results[3])
+
+            all_exact = all_exact and exact
+            print(f"{poly_degree:>6} {name:>6} " +
+                  " ".join(f"{timing / len(constants) * 1000:>10.2f}" for timing in timings) +
+                  f"{'' if exact else '  结果不一致!'}")
+
+    return all_exact
+
+
+if __name__ == "__main__":
+    success = benchmark_constant_ops()
+    if success:
+        print("\n✅ 常数运算与明文路径结果一致!")
+    else:
+        print("\n❌ 常数运算结果不一致!")
\ No newline at end of file
@@ -0,0 +1,61 @@
+"""上下文缓存性能测试: 冷启动与读取缓存的参数/自举上下文构建耗时对比"""
+
+import time
+import tempfile
+import numpy as np
+from core.parameters import CKKSParameters
+from bootstrapping.context import CKKSBootstrappingContext
+from utils.context_cache import ContextCache
+
+
+def build(cache, poly_degree, ciph_modulus, big_modulus, scaling_factor):
+    """构建参数与自举上下文, 返回(参数, 自举上下文, 参数耗时, 自举耗时)"""
+    start_time = time.time()
+    params = CKKSParameters(poly_degree=poly_degree, ciph_modulus=ciph_modulus, big_modulus=big_modulus,
+                            scaling_factor=scaling_factor, context_cache=cache)
+    params_time = time.time() - start_time
+
+    start_time = time.time()
+    boot_context = CKKSBootstrappingContext(params)
+    boot_time = time.time() - start_time
+    return params, boot_context, params_time, boot_time
+
+
+def benchmark_context_cache(log_degrees=(10, 11, 12)):
+    """对比首次构建(未命中)与再次构建(命中)的耗时, 并检查恢复的上下文与原上下文一致"""
+    cache = ContextCache(tempfile.mkdtemp(prefix='ckks_cache_'))
+    print("上下文缓存性能测试")
+    print(f"{'N':>6} {'素数个数':>8} {'参数冷启动(秒)':>14} {'参数缓存(秒)':>12} "
+          f"{'自举冷启动(秒)':>14} {'自举缓存(秒)':>12}")
+
+    all_exact = True
+    for log_degree in log_degrees:
+        poly_degree = 1 << log_degree
+        config = (poly_degree, 1 << 600, 1 << 1200, 1 << 40)
+        cold_params, cold_boot, cold_params_time, cold_boot_time = build(cache, *config)
+        warm_params, warm_boot, warm_params_time, warm_boot_time = build(cache, *config)
+
+        cold_crt, warm_crt = cold_params.crt_context, warm_params.crt_context
+        coeffs = list(range(poly_degree))
+        exact = cold_crt.primes == warm_crt.primes and \
+            np.array_equal(cold_crt.ftt_fwd_array(cold_crt.crt_poly(coeffs)),
+                           warm_crt.ftt_fwd_array(warm_crt.crt_poly(coeffs))) and \
+            all(ntt_a.roots_of_unity == ntt_b.roots_of_unity
+                for ntt_a, ntt_b in zip(cold_crt.ntts, warm_crt.ntts)) and \
+            np.array_equal(np.array(cold_boot.encoding_mat_conj_transpose1), warm_boot.encoding_mat_conj_transpose1)
+        all_exact = all_exact and exact
+
+        print(f"{poly_degree:>6} {len(warm_crt.primes):>8} {cold_params_time:>14.3f} {warm_params_time:>12.3f} "
+              f"{cold_boot_time:>14.3f} {warm_boot_time:>12.3f}{'' if exact else '  结果不一致!'}")
+
+    print()
+    stats = cache.report()
+    return all_exact and stats['hits'] == 2 * len(log_degrees) and stats['invalid'] == 0
+
+
+if __name__ == "__main__":
+    success = benchmark_context_cache()
+    if success:
+        print("\n✅ 缓存恢复的上下文与重新生成的上下文一致!")
+    else:
+        print("\n❌ 上下文缓存结果不一致!")
\ No newline at end of file
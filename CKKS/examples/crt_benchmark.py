@@ -0,0 +1,44 @@
+"""CRT重构性能测试: 逐系数重构与整体Garner重构对比"""
+
+import time
+import random
+from mathematics.crt import CRTContext
+from mathematics.polynomial import Polynomial
+
+
+def benchmark_crt(poly_degree=2048, configs=((59, 10), (59, 20), (59, 40), (30, 40), (30, 80))):
+    """对比reconstruct + mod_small与reconstruct_poly(centered=True)的耗时"""
+    print(f"CRT重构性能测试 (N = {poly_degree})")
+    print(f"{'素数大小':>8} {'素数个数':>8} {'逐系数(秒)':>12} {'Garner(秒)':>12} {'加速比':>8}")
+
+    all_exact = True
+    for prime_size, num_primes in configs:
+        crt = CRTContext(num_primes, prime_size, poly_degree)
+        coeffs = [random.randrange(0, crt.modulus) for _ in range(poly_degree)]
+        residues = crt.crt_poly(coeffs)
+
+        start_time = time.time()
+        values = residues.T.tolist()
+        per_coeff = [crt.reconstruct(values[i]) for i in range(poly_degree)]
+        per_coeff = Polynomial(poly_degree, per_coeff).mod_small(crt.modulus).coeffs
+        per_coeff_time = time.time() - start_time
+
+        start_time = time.time()
+        bulk = crt.reconstruct_poly(residues, centered=True)
+        bulk_time = time.time() - start_time
+
+        exact = bulk == per_coeff
+        all_exact = all_exact and exact
+
+        print(f"{prime_size:>8} {num_primes:>8} {per_coeff_time:>12.4f} {bulk_time:>12.4f} "
+              f"{per_coeff_time / bulk_time:>7.1f}x{'' if exact else '  结果不一致!'}")
+
+    return all_exact
+
+
+if __name__ == "__main__":
+    success = benchmark_crt()
+    if success:
+        print("\n✅ Garner重构与逐系数重构结果一致!")
+    else:
+        print("\n❌ Garner重构结果不一致!")
\ No newline at end of file
@@ -0,0 +1,94 @@
+"""对角线缓存性能测试: 同一矩阵重复乘法时, 不缓存、对角线未命中、内存命中与磁盘命中的每次耗时对比"""
+
+import time
+import random
+import tempfile
+from core.parameters import CKKSParameters
+from core.key_generator import CKKSKeyGenerator
+from core.encoder import CKKSEncoder
+from core.encryptor import CKKSEncryptor
+from core.decryptor import CKKSDecryptor
+from core.evaluator import CKKSEvaluator
+from bootstrapping.context import CKKSBootstrappingContext
+from utils.context_cache import ContextCache
+from utils.diagonal_cache import DiagonalCache
+
+
+def build(poly_degree, context_cache, modulus_chain):
+    """构建参数(带新的对角线缓存)、密钥与运算对象"""
+    random.seed(0)
+    params = CKKSParameters(poly_degree=poly_degree, ciph_modulus=1 << 120, big_modulus=1 << 160,
+                            scaling_factor=1 << 30, modulus_chain=modulus_chain, context_cache=context_cache,
+                            diagonal_cache=DiagonalCache(context_cache=context_cache))
+    key_generator = CKKSKeyGenerator(params, seed=0)
+    num_slots = poly_degree // 2
+    # ±2^k 旋转密钥, 其余旋转量由RotationOperations组合完成
+    steps = {step % num_slots for k in range(num_slots.bit_length() - 1) for step in (1 << k, -(1 << k))}
+    rot_keys = key_generator.generate_rot_keys(sorted(steps), num_workers=1, seed=0)
+    return params, key_generator, rot_keys
+
+
+def benchmark_diagonal_cache(log_degrees=(7, 8), num_ciphertexts=4, modulus_chain=True):
+    """以自举的槽位到系数矩阵为例, 检查三种情况下乘积完全一致并报告缓存计数"""
+    context_cache = ContextCache(tempfile.mkdtemp(prefix='ckks_diag_'))
+    print(f"对角线缓存性能测试 ({'模数链' if modulus_chain else '大整数'}模式, 单位: 秒/次矩阵乘法)")
+    print(f"{'N':>6} {'不缓存':>10} {'未命中':>10} {'内存命中':>10} {'磁盘命中':>10} {'加速比':>8} {'磁盘读取':>8}")
+
+    all_exact = True
+    for log_degree in log_degrees:
+        poly_degree = 1 << log_degree
+        params, key_generator, rot_keys = build(poly_degree, context_cache, modulus_chain)
+        encoder = CKKSEncoder(params)
+        encryptor = CKKSEncryptor(params, key_generator.public_key, key_generator.secret_key, seed=0)
+        decryptor = CKKSDecryptor(params, key_generator.secret_key)
+        evaluator = CKKSEvaluator(params)
+        matrix = CKKSBootstrappingContext(params).encoding_mat0
+
+        messages = [[complex(random.uniform(-1, 1), random.uniform(-1, 1)) for _ in range(poly_degree // 2)]
+                    for _ in range(num_ciphertexts)]
+        ciphs = [encryptor.encrypt(encoder.encode(message, params.scaling_factor)) for message in messages]
+
+        start_time = time.time()
+        cold = [decryptor.decrypt(evaluator.multiply_matrix(ciphs[0], matrix, rot_keys, encoder)).poly.coeffs]
+        cold_time = time.time() - start_time
+
+        start_time = time.time()
+        warm = [decryptor.decrypt(evaluator.multiply_matrix(ciph, matrix, rot_keys, encoder)).poly.coeffs
+                for ciph in ciphs]
+        warm_time = (time.time() - start_time) / num_ciphertexts
+
+        # 换用新的内存缓存, 对角线从磁盘读取
+        memory_cache = params.diagonal_cache
+        params.diagonal_cache = DiagonalCache(context_cache=context_cache)
+        evaluator = CKKSEvaluator(params)
+        start_time = time.time()
+        disk = [decryptor.decrypt(evaluator.multiply_matrix(ciphs[0], matrix, rot_keys, encoder)).poly.coeffs]
+        disk_time = time.time() - start_time
+
+        disk_hits = params.diagonal_cache.disk_hits
+
+        # diagonal_cache=None时每次重新编码
+        params.diagonal_cache = CKKSParameters(poly_degree=poly_degree, ciph_modulus=1 << 120, big_modulus=1 << 160,
+                                               scaling_factor=1 << 30, diagonal_cache=None).diagonal_cache
+        evaluator = CKKSEvaluator(params)
+        start_time = time.time()
+        uncached = [decryptor.decrypt(evaluator.multiply_matrix(ciphs[0], matrix, rot_keys, encoder)).poly.coeffs]
+        uncached_time = time.time() - start_time
+
+        exact = cold[0] == warm[0] == disk[0] == uncached[0] and params.diagonal_cache is None
+        all_exact = all_exact and exact and disk_hits == 1
+        print(f"{poly_degree:>6} {uncached_time:>10.3f} {cold_time:>10.3f} {warm_time:>10.3f} {disk_time:>10.3f} "
+              f"{cold_time / warm_time:>7.2f}x {'是' if disk_hits == 1 else '否':>8}"
+              f"{'' if exact else '  结果不一致!'}")
+
+    print()
+    stats = memory_cache.report()
+    return all_exact and stats['hits'] == num_ciphertexts
+
+
+if __name__ == "__main__":
+    success = benchmark_diagonal_cache() and benchmark_diagonal_cache(modulus_chain=False)
+    if success:
+        print("\n✅ 缓存对角线的矩阵乘法结果与重新编码一致!")
+    else:
+        print("\n❌ 对角线缓存结果不一致!")
\ No newline at end of file
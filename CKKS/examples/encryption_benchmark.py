@@ -0,0 +1,73 @@
+"""批量加密性能测试: 每次变换公钥的逐个加密、缓存NTT公钥的逐个加密与批量加密的吞吐量对比"""
+
+import time
+import random
+import numpy as np
+from core.parameters import CKKSParameters
+from core.key_generator import CKKSKeyGenerator
+from core.encoder import CKKSEncoder
+from core.encryptor import CKKSEncryptor
+from core.decryptor import CKKSDecryptor
+from primitives.ciphertext import Ciphertext
+from mathematics.polynomial import Polynomial
+from utils.random_sampler import sample_triangle
+
+
+def legacy_encrypt(encryptor, plain):
+    """原有的公钥加密: 每次在完整CRT上下文下重新变换公钥, 仅作为对照"""
+    modulus = encryptor.coeff_modulus
+    random_vec = Polynomial(encryptor.poly_degree, sample_triangle(encryptor.poly_degree))
+    error1 = Polynomial(encryptor.poly_degree, sample_triangle(encryptor.poly_degree))
+    error2 = Polynomial(encryptor.poly_degree, sample_triangle(encryptor.poly_degree))
+
+    c0 = encryptor.public_key.p0.multiply(random_vec, modulus, crt=encryptor.crt_context)
+    c0 = error1.add(c0, modulus).add(plain.poly, modulus).mod_small(modulus)
+    c1 = encryptor.public_key.p1.multiply(random_vec, modulus, crt=encryptor.crt_context)
+    c1 = error2.add(c1, modulus).mod_small(modulus)
+    return Ciphertext(c0, c1, plain.scaling_factor, modulus)
+
+
+def benchmark_encryption(log_degrees=(12, 13), batch_size=16, small_primes=False, seed=0):
+    """三种加密方式的每秒密文数, 并检查全部密文解密正确"""
+    print(f"批量加密性能测试 ({'小素数' if small_primes else '大素数'}RNS, 每批{batch_size}个明文, 单位: 密文/秒)")
+    print(f"{'N':>6} {'原加密':>10} {'缓存公钥':>10} {'批量加密':>10} {'加速比':>8} {'最大误差':>12}")
+
+    rng = np.random.default_rng(seed)
+    all_correct = True
+    for log_degree in log_degrees:
+        random.seed(seed)
+        poly_degree = 1 << log_degree
+        params = CKKSParameters(poly_degree=poly_degree, ciph_modulus=1 << 120, big_modulus=1 << 160,
+                                scaling_factor=1 << 30, small_primes=small_primes)
+        key_generator = CKKSKeyGenerator(params, seed=seed)
+        encoder = CKKSEncoder(params)
+        encryptor = CKKSEncryptor(params, key_generator.public_key, seed=seed)
+        decryptor = CKKSDecryptor(params, key_generator.secret_key)
+
+        messages = rng.uniform(-1, 1, (batch_size, poly_degree // 2))
+        plains = encoder.encode_many(messages, params.scaling_factor)
+
+        rates, results = [], []
+        for encrypt in (lambda: [legacy_encrypt(encryptor, plain) for plain in plains],
+                        lambda: [encryptor.encrypt(plain) for plain in plains],
+                        lambda: encryptor.encrypt_many(plains)):
+            start_time = time.time()
+            results.append(encrypt())
+            rates.append(batch_size / (time.time() - start_time))
+
+        error = max(np.abs(np.array(encoder.decode_many([decryptor.decrypt(ciph) for ciph in ciphs])) -
+                           messages).max() for ciphs in results)
+        correct = error < 1e-4
+        all_correct = all_correct and correct
+        print(f"{poly_degree:>6} " + " ".join(f"{rate:>10.1f}" for rate in rates) +
+              f" {rates[2] / rates[0]:>7.2f}x {error:>12.2e}{'' if correct else '  结果不正确!'}")
+
+    return all_correct
+
+
+if __name__ == "__main__":
+    success = benchmark_encryption() and benchmark_encryption(small_primes=True)
+    if success:
+        print("\n✅ 批量加密结果正确!")
+    else:
+        print("\n❌ 批量加密结果不正确!")
\ No newline at end of file
@@ -0,0 +1,70 @@
+"""Galois自同构性能测试: 逐系数循环与缓存置换表, 系数域往返与NTT域直接置换的耗时对比"""
+
+import time
+import random
+from mathematics.crt import CRTContext
+from mathematics.polynomial import Polynomial
+from mathematics.rns_polynomial import RNSPolynomial
+
+
+def legacy_rotate(poly, r):
+    """原有的逐系数循环旋转, 仅作为对照"""
+    k = 5 ** r
+    new_coeffs = [0] * poly.ring_degree
+    for i in range(poly.ring_degree):
+        index = (i * k) % (2 * poly.ring_degree)
+        if index < poly.ring_degree:
+            new_coeffs[index] = poly.coeffs[i]
+        else:
+            new_coeffs[index - poly.ring_degree] = -poly.coeffs[i]
+    return Polynomial(poly.ring_degree, new_coeffs)
+
+
+def benchmark_galois(log_degrees=(10, 12, 14), rotations=(1, 7, 100, 1000), num_primes=4):
+    """对比各实现的单次旋转耗时(毫秒), 并检查结果一致"""
+    print("Galois自同构性能测试 (单位: 毫秒/次)")
+    print(f"{'N':>6} {'循环旋转':>10} {'置换表':>8} {'NTT往返':>10} {'NTT置换':>10}")
+
+    all_exact = True
+    for log_degree in log_degrees:
+        poly_degree = 1 << log_degree
+        poly = Polynomial(poly_degree, [random.randint(-(1 << 100), 1 << 100) for _ in range(poly_degree)])
+        crt = CRTContext(num_primes, 30, poly_degree)
+        rns_poly = RNSPolynomial.from_polynomial(poly, crt, ntt_form=True)
+
+        timings = [0.0] * 4
+        exact = True
+        for rotation in rotations:
+            start_time = time.time()
+            expected = legacy_rotate(poly, rotation)
+            timings[0] += time.time() - start_time
+
+            start_time = time.time()
+            rotated = poly.rotate(rotation)
+            timings[1] += time.time() - start_time
+
+            start_time = time.time()
+            round_trip = rns_poly.from_ntt().rotate(rotation).to_ntt()
+            timings[2] += time.time() - start_time
+
+            start_time = time.time()
+            permuted = rns_poly.rotate(rotation)
+            timings[3] += time.time() - start_time
+
+            exact = exact and rotated.coeffs == expected.coeffs and \
+                (permuted.residues == round_trip.residues).all() and \
+                (permuted.residues == crt.ftt_fwd_array(crt.crt_poly(expected.coeffs))).all()
+
+        all_exact = all_exact and exact
+        print(f"{poly_degree:>6} " + " ".join(f"{timing / len(rotations) * 1000:>9.2f}" for timing in timings) +
+              f"{'' if exact else '  结果不一致!'}")
+
+    return all_exact
+
+
+if __name__ == "__main__":
+    success = benchmark_galois()
+    if success:
+        print("\n✅ 置换表自同构与原实现结果一致!")
+    else:
+        print("\n❌ 自同构结果不一致!")
\ No newline at end of file
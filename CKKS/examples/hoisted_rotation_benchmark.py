@@ -0,0 +1,72 @@
+"""提升旋转性能测试: 同一密文的多个旋转逐个计算与共享模数提升/NTT的每旋转耗时"""
+
+import time
+import random
+from core.parameters import CKKSParameters
+from core.key_generator import CKKSKeyGenerator
+from core.encryptor import CKKSEncryptor
+from core.decryptor import CKKSDecryptor
+from operations.rotation import RotationOperations
+from primitives.plaintext import Plaintext
+from mathematics.polynomial import Polynomial
+
+
+def max_error(decryptor, rot_ciphs, message, scaling_factor):
+    """各旋转结果解密后与明文旋转的最大误差"""
+    error = 0
+    for rotation, rot_ciph in rot_ciphs.items():
+        expected = Polynomial(len(message), message).rotate(rotation).coeffs
+        coeffs = decryptor.decrypt(rot_ciph).poly.coeffs
+        error = max(error, max(abs(a - b) for a, b in zip(coeffs, expected)) / scaling_factor)
+    return error
+
+
+def benchmark_hoisted_rotation(poly_degree=1024, rotation_counts=(1, 2, 4, 8, 16, 32), seed=0):
+    """大整数模式与模数链模式下, 对比逐个旋转与提升旋转的每旋转耗时并检查解密结果"""
+    all_correct = True
+    for modulus_chain in (False, True):
+        random.seed(seed)
+        params = CKKSParameters(poly_degree=poly_degree, ciph_modulus=1 << 120, big_modulus=1 << 160,
+                                scaling_factor=1 << 40, modulus_chain=modulus_chain)
+        key_generator = CKKSKeyGenerator(params, seed=seed)
+        encryptor = CKKSEncryptor(params, key_generator.public_key, key_generator.secret_key, seed=seed)
+        decryptor = CKKSDecryptor(params, key_generator.secret_key)
+        rotation_ops = RotationOperations(params, params.crt_context)
+        rot_keys = key_generator.generate_rot_keys(range(1, max(rotation_counts) + 1), num_workers=1, seed=seed)
+
+        message = [random.randint(-1000, 1000) * (1 << 30) for _ in range(poly_degree)]
+        ciph = encryptor.encrypt(Plaintext(Polynomial(poly_degree, message), params.scaling_factor))
+        # 预热: 交换密钥的NTT域表示在首次使用时缓存, 不计入对比
+        rotation_ops.rotate_many(ciph, list(rot_keys), rot_keys)
+
+        print(f"提升旋转测试 (N = {poly_degree}, {'模数链' if modulus_chain else '大整数'}模式, 单位: 毫秒/旋转)")
+        print(f"{'旋转数':>6} {'逐个旋转':>10} {'提升旋转':>10} {'加速比':>8} {'最大误差':>12}")
+        for num_rotations in rotation_counts:
+            rotations = list(range(1, num_rotations + 1))
+
+            start_time = time.time()
+            for rotation in rotations:
+                rotation_ops.rotate(ciph, rotation, rot_keys[rotation])
+            single_time = (time.time() - start_time) / num_rotations
+
+            start_time = time.time()
+            rot_ciphs = rotation_ops.rotate_many(ciph, rotations, rot_keys)
+            hoisted_time = (time.time() - start_time) / num_rotations
+
+            error = max_error(decryptor, rot_ciphs, message, params.scaling_factor)
+            correct = sorted(rot_ciphs) == rotations and error < 1e-3
+            all_correct = all_correct and correct
+
+            print(f"{num_rotations:>6} {single_time * 1000:>10.2f} {hoisted_time * 1000:>10.2f} "
+                  f"{single_time / hoisted_time:>7.2f}x {error:>12.2e}{'' if correct else '  结果不正确!'}")
+        print()
+
+    return all_correct
+
+
+if __name__ == "__main__":
+    success = benchmark_hoisted_rotation()
+    if success:
+        print("\n✅ 提升旋转结果正确!")
+    else:
+        print("\n❌ 提升旋转结果不正确!")
\ No newline at end of file
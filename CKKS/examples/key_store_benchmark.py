@@ -0,0 +1,117 @@
+"""密钥库性能测试: 内存中的整数密钥与内存映射密钥库的大小、打开耗时、按需加载与多进程共享对比"""
+
+import os
+import sys
+import time
+import random
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from core.parameters import CKKSParameters
+from core.key_generator import CKKSKeyGenerator
+from core.encoder import CKKSEncoder
+from core.encryptor import CKKSEncryptor
+from core.decryptor import CKKSDecryptor
+from core.evaluator import CKKSEvaluator
+from bootstrapping.context import CKKSBootstrappingContext
+from operations.rotation import RotationOperations
+from utils.key_store import KeyStore
+
+
+def key_nbytes(keys):
+    """整数系数密钥在内存中占用的字节数(列表指针加Python整数对象)"""
+    return sum(8 * len(poly.coeffs) + sum(sys.getsizeof(coeff) for coeff in poly.coeffs)
+               for key in keys for poly in (key.p0, key.p1))
+
+
+def rotate_in_worker(store, ciph, rotation):
+    """子进程中以密钥库旋转, 返回结果与已加载条目, 并检查剩余是否直接引用映射页面"""
+    evaluator = CKKSEvaluator(store.params)
+    result = evaluator.rotate(ciph, rotation, store.rot_keys[rotation])
+    shared = not store.rot_keys[rotation].key.p0.residues.flags.owndata
+    return result, store.loaded, shared
+
+
+def benchmark_key_store(poly_degree=1024, scaling_factor=1 << 30, num_workers=2, seed=0):
+    """模数链参数下检查密钥库与内存密钥的运算结果完全一致, 只加载用到的密钥, 且剩余始终引用映射页面
+
+    缩放因子为2^40时链上素数超过2^32, 剩余在每次密钥交换时临时转换为对象数组。
+    """
+    random.seed(seed)
+    params = CKKSParameters(poly_degree=poly_degree, ciph_modulus=1 << 120, big_modulus=1 << 160,
+                            scaling_factor=scaling_factor, modulus_chain=True)
+    key_generator = CKKSKeyGenerator(params, seed=seed)
+    encoder = CKKSEncoder(params)
+    encryptor = CKKSEncryptor(params, key_generator.public_key, key_generator.secret_key, seed=seed)
+    decryptor = CKKSDecryptor(params, key_generator.secret_key)
+    evaluator = CKKSEvaluator(params)
+    num_slots = poly_degree // 2
+
+    steps = sorted({step % num_slots for k in range(num_slots.bit_length() - 1) for step in (1 << k, -(1 << k))})
+    rot_keys, conj_key = key_generator.generate_galois_keys(steps, num_workers=1, seed=seed)
+    relin_key = key_generator.relin_key
+
+    path = os.path.join(tempfile.mkdtemp(prefix='ckks_keys_'), 'keys.bin')
+    start_time = time.time()
+    KeyStore.write(path, params, rot_keys, conj_key, relin_key)
+    write_time = time.time() - start_time
+    start_time = time.time()
+    store = KeyStore(path, params)
+    open_time = time.time() - start_time
+    memory_size = key_nbytes([rot_key.key for rot_key in rot_keys.values()] + [conj_key, relin_key])
+
+    print(f"密钥库测试 (N = {poly_degree}, 模数链模式, 缩放因子2^{scaling_factor.bit_length() - 1}, "
+          f"{len(steps)}个旋转密钥 + 共轭 + 重线性化)")
+    print(f"  内存中的整数密钥: {memory_size / (1 << 20):.2f} MB/进程, 密钥库文件: "
+          f"{os.path.getsize(path) / (1 << 20):.2f} MB")
+    print(f"  写入耗时: {write_time:.2f} 秒, 打开耗时: {open_time * 1000:.2f} 毫秒")
+
+    message = [complex(random.uniform(-1, 1), random.uniform(-1, 1)) for _ in range(num_slots)]
+    ciph = encryptor.encrypt(encoder.encode(message, params.scaling_factor))
+
+    # 旋转3由 ±2^k 密钥组合, 只应加载两个旋转密钥
+    checks = {}
+    rotation_ops = RotationOperations(params, params.crt_context)
+    rotated = rotation_ops.rotate_with_keys(ciph, 3, store.rot_keys)
+    checks['按需加载'] = len(store.loaded) == 2
+    checks['组合旋转一致'] = decryptor.decrypt(rotated).poly.coeffs == \
+        decryptor.decrypt(rotation_ops.rotate_with_keys(ciph, 3, rot_keys)).poly.coeffs
+
+    operations = [
+        ('共轭', lambda keys: evaluator.conjugate(ciph, keys[1])),
+        ('乘法重线性化', lambda keys: evaluator.multiply(ciph, ciph, keys[2])),
+        ('矩阵乘法', lambda keys: evaluator.multiply_matrix(ciph, CKKSBootstrappingContext(params).encoding_mat0,
+                                                      keys[0], encoder)),
+    ]
+    for name, operation in operations:
+        timings, results = [], []
+        for keys in ((rot_keys, conj_key, relin_key), (store.rot_keys, store.conj_key, store.relin_key)):
+            start_time = time.time()
+            results.append(decryptor.decrypt(operation(keys)).poly.coeffs)
+            timings.append(time.time() - start_time)
+        checks[f'{name}一致'] = results[0] == results[1]
+        print(f"  {name}: 内存密钥 {timings[0] * 1000:.1f} 毫秒, 密钥库 {timings[1] * 1000:.1f} 毫秒")
+
+    # 子进程各自映射同一文件, 密钥剩余引用共享的页缓存
+    expected = decryptor.decrypt(evaluator.rotate(ciph, 1, rot_keys[1])).poly.coeffs
+    with ProcessPoolExecutor(max_workers=num_workers) as executor:
+        outputs = list(executor.map(rotate_in_worker, [store] * num_workers, [ciph] * num_workers,
+                                    [1] * num_workers))
+    loaded_keys = [getattr(key, 'key', key) for key in map(store.load, store.loaded)]
+    checks['剩余引用映射页面'] = all(not poly.residues.flags.owndata for key in loaded_keys for poly in (key.p0, key.p1))
+    checks['多进程共享映射'] = all(decryptor.decrypt(result).poly.coeffs == expected and loaded == ['rot:1'] and shared
+                            for result, loaded, shared in outputs)
+
+    print()
+    store.report()
+    print()
+    for name, passed in checks.items():
+        print(f"  {name}: {'通过' if passed else '失败'}")
+    return all(checks.values())
+
+
+if __name__ == "__main__":
+    success = all([benchmark_key_store(scaling_factor=1 << 30), benchmark_key_store(scaling_factor=1 << 40)])
+    if success:
+        print("\n✅ 密钥库运算结果与内存密钥一致!")
+    else:
+        print("\n❌ 密钥库运算结果不一致!")
\ No newline at end of file
@@ -0,0 +1,71 @@
+"""密钥生成性能测试: 各类密钥在NTT/CRT路径上的生成耗时"""
+
+import time
+from core.parameters import CKKSParameters
+from core.key_generator import CKKSKeyGenerator
+
+
+def time_keys(params, seed=0):
+    """生成全部密钥并逐类计时, 返回(耗时字典, 密钥系数列表)"""
+    timings = {}
+
+    key_generator = CKKSKeyGenerator(params, seed=seed)
+
+    start_time = time.time()
+    rot_key = key_generator.generate_rot_key(1)
+    timings['旋转密钥'] = time.time() - start_time
+
+    start_time = time.time()
+    conj_key = key_generator.generate_conj_key()
+    timings['共轭密钥'] = time.time() - start_time
+
+    keys = [key_generator.public_key, key_generator.relin_key, rot_key.key, conj_key]
+    keys = [(key.p0.coeffs, key.p1.coeffs) for key in keys]
+
+    # 构造之后单独重新生成公钥与重线性化密钥以分别计时
+    start_time = time.time()
+    key_generator.generate_public_key(params)
+    timings['公钥'] = time.time() - start_time
+
+    start_time = time.time()
+    key_generator.generate_relin_key(params)
+    timings['重线性化密钥'] = time.time() - start_time
+
+    return timings, keys
+
+
+def make_params(poly_degree, prime_size=59):
+    """基准测试所用参数, prime_size为None时不使用CRT(朴素乘法)"""
+    return CKKSParameters(poly_degree=poly_degree, ciph_modulus=1 << 120, big_modulus=1 << 160,
+                          scaling_factor=1 << 40, prime_size=prime_size)
+
+
+def benchmark_keygen(log_degrees=range(11, 15), naive_log_degree=11):
+    """输出N = 2^11..2^14的逐类密钥生成耗时, 并在最小N上与朴素乘法对比结果与耗时"""
+    names = ['公钥', '重线性化密钥', '旋转密钥', '共轭密钥']
+    print("密钥生成性能测试 (NTT/CRT路径, 单位: 秒)")
+    print(f"{'N':>6} " + " ".join(f"{name:>10}" for name in names))
+
+    for log_degree in log_degrees:
+        timings, _ = time_keys(make_params(1 << log_degree))
+        print(f"{1 << log_degree:>6} " + " ".join(f"{timings[name]:>10.3f}" for name in names))
+
+    poly_degree = 1 << naive_log_degree
+    fast_timings, fast_keys = time_keys(make_params(poly_degree))
+    naive_timings, naive_keys = time_keys(make_params(poly_degree, prime_size=None))
+    exact = fast_keys == naive_keys
+
+    print(f"\n朴素乘法对比 (N = {poly_degree})")
+    for name in names:
+        print(f"  {name}: 朴素 {naive_timings[name]:.3f}秒, CRT {fast_timings[name]:.3f}秒, "
+              f"加速比 {naive_timings[name] / fast_timings[name]:.1f}x")
+    print(f"  密钥一致: {'是' if exact else '否'}")
+    return exact
+
+
+if __name__ == "__main__":
+    success = benchmark_keygen()
+    if success:
+        print("\n✅ NTT/CRT密钥生成与朴素乘法结果一致!")
+    else:
+        print("\n❌ 密钥生成结果不一致!")
\ No newline at end of file
@@ -0,0 +1,86 @@
+"""延迟重线性化性能测试: n项密文内积逐项重线性化与累加后一次重线性化的耗时对比"""
+
+import time
+import numpy as np
+from core.parameters import CKKSParameters
+from core.key_generator import CKKSKeyGenerator
+from core.encryptor import CKKSEncryptor
+from core.decryptor import CKKSDecryptor
+from core.evaluator import CKKSEvaluator
+from primitives.plaintext import Plaintext
+from mathematics.polynomial import Polynomial
+
+
+def negacyclic_product(poly1, poly2):
+    """小整数系数多项式在 Z[x]/(x^N + 1) 中的乘积"""
+    degree = len(poly1)
+    full = np.convolve(poly1, poly2)
+    result = full[:degree].copy()
+    result[:degree - 1] -= full[degree:]
+    return result
+
+
+def dot_product(evaluator, ciphs1, ciphs2, relin_key, lazy):
+    """密文内积: lazy为True时累加三分量密文后只重线性化一次"""
+    result = None
+    for ciph1, ciph2 in zip(ciphs1, ciphs2):
+        if lazy:
+            prod = evaluator.multiply_no_relin(ciph1, ciph2)
+        else:
+            prod = evaluator.multiply(ciph1, ciph2, relin_key)
+        result = prod if result is None else evaluator.add(result, prod)
+    return evaluator.relinearize_ciphertext(result, relin_key) if lazy else result
+
+
+def benchmark_lazy_relin(poly_degree=1024, term_counts=(2, 4, 8, 16), modulus_chain=False, seed=0):
+    """对比两种内积的耗时与解密误差(相对于缩放因子的平方)"""
+    params = CKKSParameters(poly_degree=poly_degree, ciph_modulus=1 << 120, big_modulus=1 << 160,
+                            scaling_factor=1 << 30, modulus_chain=modulus_chain)
+    key_generator = CKKSKeyGenerator(params, seed=seed)
+    encryptor = CKKSEncryptor(params, key_generator.public_key, key_generator.secret_key, seed=seed)
+    decryptor = CKKSDecryptor(params, key_generator.secret_key)
+    evaluator = CKKSEvaluator(params)
+    relin_key = key_generator.relin_key
+    scale = params.scaling_factor
+
+    def encrypt(message):
+        coeffs = [int(value) * scale for value in message]
+        return encryptor.encrypt(Plaintext(Polynomial(poly_degree, coeffs), scale))
+
+    print(f"延迟重线性化测试 (N = {poly_degree}, {'模数链' if modulus_chain else '大整数'}模式)")
+    print(f"{'项数':>4} {'逐项重线性化(秒)':>16} {'一次重线性化(秒)':>16} {'加速比':>8} "
+          f"{'逐项误差':>10} {'延迟误差':>10}")
+
+    all_correct = True
+    for num_terms in term_counts:
+        messages1 = [np.random.randint(-8, 9, poly_degree) for _ in range(num_terms)]
+        messages2 = [np.random.randint(-8, 9, poly_degree) for _ in range(num_terms)]
+        expected = sum(negacyclic_product(m1, m2) for m1, m2 in zip(messages1, messages2))
+        ciphs1 = [encrypt(message) for message in messages1]
+        ciphs2 = [encrypt(message) for message in messages2]
+
+        timings, errors = [], []
+        for lazy in (False, True):
+            start_time = time.time()
+            result = dot_product(evaluator, ciphs1, ciphs2, relin_key, lazy)
+            timings.append(time.time() - start_time)
+
+            coeffs = decryptor.decrypt(result).poly.coeffs
+            errors.append(max(abs(coeff / result.scaling_factor - int(value))
+                              for coeff, value in zip(coeffs, expected)))
+
+        correct = max(errors) < 1e-3
+        all_correct = all_correct and correct
+        print(f"{num_terms:>4} {timings[0]:>16.3f} {timings[1]:>16.3f} {timings[0] / timings[1]:>7.2f}x "
+              f"{errors[0]:>10.2e} {errors[1]:>10.2e}{'' if correct else '  结果不正确!'}")
+
+    return all_correct
+
+
+if __name__ == "__main__":
+    np.random.seed(0)
+    success = benchmark_lazy_relin() and benchmark_lazy_relin(term_counts=(4, 16), modulus_chain=True)
+    if success:
+        print("\n✅ 延迟重线性化内积结果正确!")
+    else:
+        print("\n❌ 延迟重线性化内积结果不正确!")
\ No newline at end of file
@@ -0,0 +1,53 @@
+"""按层选取CRT上下文的性能测试: 不同密文模数下全素数与最小前缀上下文的乘法耗时对比"""
+
+import time
+import random
+from core.parameters import CKKSParameters
+from mathematics.polynomial import Polynomial
+
+
+def benchmark_levels(poly_degree=2048, num_levels=6, scale_bits=40, repeats=3):
+    """对每一层密文模数, 对比重线性化规模乘积(交换密钥 × 密文分量)的耗时"""
+    scaling_factor = 1 << scale_bits
+    ciph_modulus = 1 << (scale_bits * (num_levels + 1))
+    big_modulus = 1 << (scale_bits * (num_levels + 2))
+    params = CKKSParameters(poly_degree=poly_degree, ciph_modulus=ciph_modulus,
+                            big_modulus=big_modulus, scaling_factor=scaling_factor)
+    crt = params.crt_context
+
+    print(f"分层CRT上下文性能测试 (N = {poly_degree}, 全部素数: {len(crt.primes)}个)")
+    print(f"{'层':>4} {'模数位数':>8} {'素数个数':>8} {'全部素数(秒)':>14} {'最小前缀(秒)':>14} {'加速比':>8}")
+
+    key = Polynomial(poly_degree, [random.randrange(0, params.swk_modulus) for _ in range(poly_degree)])
+    all_exact = True
+    for level in range(num_levels, -1, -1):
+        modulus = ciph_modulus >> (scale_bits * (num_levels - level))
+        product_modulus = modulus * big_modulus
+        poly = Polynomial(poly_degree, [random.randrange(-modulus // 2, modulus // 2)
+                                        for _ in range(poly_degree)])
+        level_crt = crt.context_for_product(params.swk_modulus, modulus)
+
+        start_time = time.time()
+        for _ in range(repeats):
+            full = key.multiply(poly, product_modulus, crt=crt).mod_small(product_modulus)
+        full_time = (time.time() - start_time) / repeats
+
+        start_time = time.time()
+        for _ in range(repeats):
+            prefix = key.multiply(poly, product_modulus, crt=level_crt).mod_small(product_modulus)
+        prefix_time = (time.time() - start_time) / repeats
+
+        exact = full.coeffs == prefix.coeffs
+        all_exact = all_exact and exact
+        print(f"{level:>4} {modulus.bit_length() - 1:>8} {len(level_crt.primes):>8} {full_time:>14.4f} "
+              f"{prefix_time:>14.4f} {full_time / prefix_time:>7.1f}x{'' if exact else '  结果不一致!'}")
+
+    return all_exact
+
+
+if __name__ == "__main__":
+    success = benchmark_levels()
+    if success:
+        print("\n✅ 各层最小前缀上下文与全素数上下文结果一致!")
+    else:
+        print("\n❌ 分层CRT上下文结果不一致!")
\ No newline at end of file
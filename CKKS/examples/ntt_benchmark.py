@@ -0,0 +1,45 @@
+"""NTT性能测试: 逐元素循环实现与向量化实现对比"""
+
+import time
+import random
+from mathematics.crt import CRTContext
+
+
+def benchmark_ntt(log_degrees=range(10, 16), prime_size=59, repeats=3):
+    """对比ftt_fwd/ftt_inv与ftt_fwd_array/ftt_inv_array的前向+逆向耗时"""
+    print(f"NTT性能测试 (素数大小: {prime_size}位)")
+    print(f"{'N':>8} {'循环(秒)':>12} {'向量化(秒)':>12} {'加速比':>8}")
+
+    all_exact = True
+    for log_degree in log_degrees:
+        poly_degree = 1 << log_degree
+        ntt = CRTContext(1, prime_size, poly_degree).ntts[0]
+        coeffs = [random.randrange(0, ntt.coeff_modulus) for _ in range(poly_degree)]
+
+        start_time = time.time()
+        for _ in range(repeats):
+            loop_fwd = ntt.ftt_fwd(coeffs)
+            loop_inv = ntt.ftt_inv(loop_fwd)
+        loop_time = (time.time() - start_time) / repeats
+
+        start_time = time.time()
+        for _ in range(repeats):
+            vec_fwd = ntt.ftt_fwd_array(coeffs)
+            vec_inv = ntt.ftt_inv_array(vec_fwd)
+        vec_time = (time.time() - start_time) / repeats
+
+        exact = vec_fwd.tolist() == loop_fwd and vec_inv.tolist() == loop_inv == coeffs
+        all_exact = all_exact and exact
+
+        print(f"{poly_degree:>8} {loop_time:>12.4f} {vec_time:>12.4f} {loop_time / vec_time:>7.1f}x"
+              f"{'' if exact else '  结果不一致!'}")
+
+    return all_exact
+
+
+if __name__ == "__main__":
+    success = benchmark_ntt(prime_size=59) and benchmark_ntt(prime_size=30)
+    if success:
+        print("\n✅ 向量化NTT与循环实现逐位一致!")
+    else:
+        print("\n❌ 向量化NTT结果不一致!")
\ No newline at end of file
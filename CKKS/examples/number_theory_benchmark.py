@@ -0,0 +1,94 @@
+"""数论函数性能测试: 随机化Miller-Rabin与sympy原根路径对比确定性实现"""
+
+import time
+import random
+import mathematics.number_theory as nbtheory
+
+try:
+    import sympy
+except ImportError:
+    sympy = None
+
+
+def legacy_is_prime(number, num_trials=200):
+    """原有的随机化Miller-Rabin测试, 仅作为对照"""
+    if number < 2:
+        return False
+    if number != 2 and number % 2 == 0:
+        return False
+
+    exp = number - 1
+    while exp % 2 == 0:
+        exp //= 2
+
+    for _ in range(num_trials):
+        rand_val = int(random.SystemRandom().randrange(1, number))
+        new_exp = exp
+        power = pow(rand_val, new_exp, number)
+        while new_exp != number - 1 and power != 1 and power != number - 1:
+            power = (power * power) % number
+            new_exp *= 2
+        if power != number - 1 and new_exp % 2 == 0:
+            return False
+
+    return True
+
+
+def legacy_primes(num_primes, prime_size, mod):
+    """原有的逐个候选生成NTT友好素数"""
+    primes = []
+    possible_prime = (1 << prime_size) + 1
+    for _ in range(num_primes):
+        possible_prime += mod
+        while not legacy_is_prime(possible_prime):
+            possible_prime += mod
+        primes.append(possible_prime)
+    return primes
+
+
+def benchmark_number_theory(poly_degree=4096, configs=((59, 40), (30, 40), (40, 80))):
+    """对比素数生成与单位根搜索耗时, 并检查确定性实现的结果"""
+    mod = 2 * poly_degree
+    print(f"数论函数性能测试 (N = {poly_degree})")
+    print(f"{'素数大小':>8} {'素数个数':>8} {'原生成(秒)':>12} {'批量生成(秒)':>14} {'加速比':>8} "
+          f"{'sympy单位根(秒)':>16} {'确定性单位根(秒)':>16}")
+
+    all_correct = True
+    for prime_size, num_primes in configs:
+        start_time = time.time()
+        old_primes = legacy_primes(num_primes, prime_size, mod)
+        old_time = time.time() - start_time
+
+        start_time = time.time()
+        new_primes = nbtheory.generate_ntt_primes(num_primes, (1 << prime_size) + 1 + mod, mod)
+        new_time = time.time() - start_time
+
+        sympy_time = float('nan')
+        if sympy:
+            start_time = time.time()
+            for prime in new_primes:
+                generator = sympy.ntheory.primitive_root(prime)
+                pow(generator, (prime - 1) // mod, prime)
+            sympy_time = time.time() - start_time
+
+        start_time = time.time()
+        roots = [nbtheory.root_of_unity(mod, prime) for prime in new_primes]
+        root_time = time.time() - start_time
+
+        correct = old_primes == new_primes and \
+            all(pow(root, poly_degree, prime) == prime - 1 for root, prime in zip(roots, new_primes))
+        all_correct = all_correct and correct
+
+        print(f"{prime_size:>8} {num_primes:>8} {old_time:>12.4f} {new_time:>14.4f} "
+              f"{old_time / new_time:>7.1f}x {sympy_time:>16.4f} {root_time:>16.4f}"
+              f"{'' if correct else '  结果不一致!'}")
+
+    return all_correct
+
+
+if __name__ == "__main__":
+    success = benchmark_number_theory()
+    if success:
+        print("\n✅ 确定性素数生成与单位根搜索结果正确!")
+    else:
+        print("\n❌ 数论函数结果不一致!")
\ No newline at end of file
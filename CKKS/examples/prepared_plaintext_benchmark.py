@@ -0,0 +1,66 @@
+"""预处理明文性能测试: 固定明文(模型权重)与多个密文相乘时, 普通明文与NTT域预处理明文的耗时对比"""
+
+import time
+import numpy as np
+from core.parameters import CKKSParameters
+from core.key_generator import CKKSKeyGenerator
+from core.encoder import CKKSEncoder
+from core.encryptor import CKKSEncryptor
+from core.decryptor import CKKSDecryptor
+from core.evaluator import CKKSEvaluator
+
+
+def benchmark_prepared_plaintext(poly_degree=4096, num_ciphertexts=8, seed=0):
+    """大整数模式与模数链模式下, 同一权重明文与多个密文相乘的每次耗时与解密误差"""
+    rng = np.random.default_rng(seed)
+    all_correct = True
+    for modulus_chain in (False, True):
+        params = CKKSParameters(poly_degree=poly_degree, ciph_modulus=1 << 120, big_modulus=1 << 160,
+                                scaling_factor=1 << 30, modulus_chain=modulus_chain)
+        key_generator = CKKSKeyGenerator(params)
+        encoder = CKKSEncoder(params)
+        encryptor = CKKSEncryptor(params, key_generator.public_key, key_generator.secret_key)
+        decryptor = CKKSDecryptor(params, key_generator.secret_key)
+        evaluator = CKKSEvaluator(params)
+        num_slots = poly_degree // 2
+
+        weights = rng.uniform(-1, 1, num_slots)
+        inputs = rng.uniform(-1, 1, (num_ciphertexts, num_slots))
+        ciphs = [encryptor.encrypt(plain) for plain in encoder.encode_many(inputs, params.scaling_factor)]
+        if modulus_chain:
+            ciphs = [evaluator.to_rns(ciph) for ciph in ciphs]
+
+        plain = encoder.encode(weights, params.scaling_factor)
+        start_time = time.time()
+        prepared = encoder.prepare(plain)
+        prepare_time = time.time() - start_time
+
+        timings, errors = [], []
+        for weight_plain in (plain, prepared):
+            start_time = time.time()
+            products = [evaluator.multiply_plain(ciph, weight_plain) for ciph in ciphs]
+            timings.append((time.time() - start_time) / num_ciphertexts)
+
+            products = [evaluator.rescale(product, params.scaling_factor) for product in products]
+            decoded = np.array([encoder.decode(decryptor.decrypt(evaluator.from_rns(product)))
+                                for product in products])
+            errors.append(np.abs(decoded - inputs * weights).max())
+
+        correct = max(errors) < 1e-3
+        all_correct = all_correct and correct
+        print(f"预处理明文测试 (N = {poly_degree}, {'模数链' if modulus_chain else '大整数'}模式, "
+              f"{num_ciphertexts}个密文)")
+        print(f"  预处理耗时: {prepare_time * 1000:.2f} 毫秒 (一次)")
+        print(f"  普通明文乘法: {timings[0] * 1000:.2f} 毫秒/次, 误差 {errors[0]:.2e}")
+        print(f"  预处理明文乘法: {timings[1] * 1000:.2f} 毫秒/次, 误差 {errors[1]:.2e}, "
+              f"加速比 {timings[0] / timings[1]:.2f}x{'' if correct else '  结果不正确!'}")
+
+    return all_correct
+
+
+if __name__ == "__main__":
+    success = benchmark_prepared_plaintext()
+    if success:
+        print("\n✅ 预处理明文乘法结果正确!")
+    else:
+        print("\n❌ 预处理明文乘法结果不正确!")
\ No newline at end of file
@@ -0,0 +1,55 @@
+"""旋转密钥并行生成性能测试: 不同工作进程数下的墙钟时间与扩展性"""
+
+import os
+import time
+from core.parameters import CKKSParameters
+from core.key_generator import CKKSKeyGenerator
+
+
+def key_coeffs(rot_keys, conj_key):
+    """密钥系数, 用于比较不同进程数下的结果"""
+    coeffs = {rotation: (key.key.p0.coeffs, key.key.p1.coeffs) for rotation, key in rot_keys.items()}
+    coeffs['conj'] = (conj_key.p0.coeffs, conj_key.p1.coeffs)
+    return coeffs
+
+
+def benchmark_rotation_keys(poly_degree=2048, num_rotations=32, worker_counts=None, seed=2024):
+    """以相同种子在不同进程数下生成同一组旋转密钥与共轭密钥, 报告耗时与加速比"""
+    params = CKKSParameters(poly_degree=poly_degree, ciph_modulus=1 << 120, big_modulus=1 << 160,
+                            scaling_factor=1 << 40)
+    key_generator = CKKSKeyGenerator(params, seed=0)
+    rotations = list(range(1, num_rotations + 1))
+
+    cpu_count = os.cpu_count() or 1
+    if worker_counts is None:
+        worker_counts = sorted({1, 2, 4, cpu_count})
+
+    print(f"旋转密钥并行生成测试 (N = {poly_degree}, 旋转密钥{num_rotations}个 + 共轭密钥, CPU核数: {cpu_count})")
+    print(f"{'进程数':>6} {'耗时(秒)':>10} {'每密钥(秒)':>12} {'加速比':>8}")
+
+    reference = None
+    serial_time = None
+    all_exact = True
+    for num_workers in worker_counts:
+        start_time = time.time()
+        rot_keys, conj_key = key_generator.generate_galois_keys(rotations, num_workers=num_workers, seed=seed)
+        elapsed = time.time() - start_time
+
+        coeffs = key_coeffs(rot_keys, conj_key)
+        reference = reference or coeffs
+        serial_time = serial_time or elapsed
+        exact = coeffs == reference and sorted(rot_keys) == rotations
+        all_exact = all_exact and exact
+
+        print(f"{num_workers:>6} {elapsed:>10.3f} {elapsed / (num_rotations + 1):>12.4f} "
+              f"{serial_time / elapsed:>7.2f}x{'' if exact else '  结果不一致!'}")
+
+    return all_exact
+
+
+if __name__ == "__main__":
+    success = benchmark_rotation_keys()
+    if success:
+        print("\n✅ 不同进程数生成的密钥完全一致!")
+    else:
+        print("\n❌ 并行生成的密钥不一致!")
\ No newline at end of file
@@ -0,0 +1,75 @@
+"""旋转密钥规划测试: 自举工作负载在direct与naf策略下的密钥数、密钥内存与密钥交换次数"""
+
+import time
+import random
+from core.parameters import CKKSParameters
+from core.key_generator import CKKSKeyGenerator
+from core.encryptor import CKKSEncryptor
+from core.decryptor import CKKSDecryptor
+from operations.rotation import RotationOperations
+from operations.rotation_planner import RotationKeyPlanner
+from bootstrapping.context import CKKSBootstrappingContext
+from primitives.plaintext import Plaintext
+from mathematics.polynomial import Polynomial
+
+
+def report_bootstrapping(log_degrees=(8, 10, 11)):
+    """输出一次自举(6次编码矩阵乘法)在两种策略下的密钥规划"""
+    for log_degree in log_degrees:
+        params = CKKSParameters(poly_degree=1 << log_degree, ciph_modulus=1 << 600, big_modulus=1 << 1200,
+                                scaling_factor=1 << 40)
+        planner = RotationKeyPlanner(params)
+        planner.add_bootstrapping(CKKSBootstrappingContext(params))
+        planner.report()
+        print()
+
+
+def check_naf_rotations(poly_degree=64, seed=0):
+    """检查按naf规划生成的密钥组合出的旋转与直接密钥旋转解密结果一致"""
+    random.seed(seed)
+    params = CKKSParameters(poly_degree=poly_degree, ciph_modulus=1 << 80, big_modulus=1 << 100,
+                            scaling_factor=1 << 25)
+    key_generator = CKKSKeyGenerator(params, seed=seed)
+    encryptor = CKKSEncryptor(params, key_generator.public_key, key_generator.secret_key, seed=seed)
+    decryptor = CKKSDecryptor(params, key_generator.secret_key)
+    rotation_ops = RotationOperations(params, params.crt_context)
+
+    planner = RotationKeyPlanner(params)
+    planner.add_bootstrapping(CKKSBootstrappingContext(params))
+    direct_keys = planner.generate_keys(key_generator, 'direct', num_workers=1, seed=seed)
+    naf_keys = planner.generate_keys(key_generator, 'naf', num_workers=1, seed=seed)
+
+    message = [random.randint(-1000, 1000) * (1 << 20) for _ in range(poly_degree)]
+    ciph = encryptor.encrypt(Plaintext(Polynomial(poly_degree, message), params.scaling_factor))
+
+    print(f"naf组合旋转检查 (N = {poly_degree}, direct密钥{len(direct_keys)}个, naf密钥{len(naf_keys)}个)")
+    print(f"{'旋转量':>6} {'direct(秒)':>12} {'naf(秒)':>10} {'最大误差':>12}")
+    max_error = 0
+    for rotation in sorted(direct_keys):
+        expected = Polynomial(poly_degree, message).rotate(rotation).coeffs
+
+        start_time = time.time()
+        direct = rotation_ops.rotate_with_keys(ciph, rotation, direct_keys)
+        direct_time = time.time() - start_time
+
+        start_time = time.time()
+        composed = rotation_ops.rotate_with_keys(ciph, rotation, naf_keys)
+        naf_time = time.time() - start_time
+
+        error = 0
+        for result in (direct, composed):
+            coeffs = decryptor.decrypt(result).poly.coeffs
+            error = max(error, max(abs(a - b) for a, b in zip(coeffs, expected)) / params.scaling_factor)
+        max_error = max(max_error, error)
+        print(f"{rotation:>6} {direct_time:>12.4f} {naf_time:>10.4f} {error:>12.2e}")
+
+    return len(naf_keys) < len(direct_keys) and max_error < 1e-3
+
+
+if __name__ == "__main__":
+    report_bootstrapping()
+    success = check_naf_rotations()
+    if success:
+        print("\n✅ naf策略以更少的密钥得到正确的旋转结果!")
+    else:
+        print("\n❌ 旋转密钥规划结果不正确!")
\ No newline at end of file
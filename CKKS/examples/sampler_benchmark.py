@@ -0,0 +1,71 @@
+"""采样器性能测试: 逐系数random采样与SHAKE-256批量采样的吞吐量对比, 并检查分布与可复现性"""
+
+import time
+import numpy as np
+from mathematics.crt import CRTContext
+from utils.random_sampler import sample_triangle, sample_uniform, sample_hamming_weight_vector, XOFSampler
+
+
+def throughput(func, num_samples, repeats=3):
+    """返回(每秒样本数, 最后一次的结果)"""
+    start_time = time.time()
+    for _ in range(repeats):
+        result = func()
+    return num_samples * repeats / (time.time() - start_time), result
+
+
+def benchmark_sampler(poly_degree=1 << 14, modulus=(1 << 600) + 1, seed=0):
+    """各分布的吞吐量(样本/秒)与基本统计检查"""
+    sampler = XOFSampler(seed)
+    hamming_weight = poly_degree // 4
+    # 与模q位数相当的RNS素数, 均匀剩余即为乘积模数下的均匀分布
+    crt = CRTContext(modulus.bit_length() // 59 + 1, 59, poly_degree)
+    cases = [
+        ('三角形分布', lambda: sample_triangle(poly_degree), lambda: sampler.ternary(poly_degree)),
+        ('汉明权重', lambda: sample_hamming_weight_vector(poly_degree, hamming_weight),
+         lambda: sampler.hamming_weight(poly_degree, hamming_weight)),
+        ('模q均匀(600位)', lambda: sample_uniform(0, modulus, poly_degree),
+         lambda: sampler.uniform(poly_degree, modulus)),
+        ('模Q均匀(RNS剩余)', lambda: sample_uniform(0, crt.modulus, poly_degree),
+         lambda: sampler.uniform_residues(poly_degree, crt.primes)),
+        ('模p均匀(59位)', lambda: sample_uniform(0, (1 << 59) - 55, poly_degree),
+         lambda: sampler.uniform(poly_degree, (1 << 59) - 55)),
+        ('离散高斯', None, lambda: sampler.gaussian(poly_degree)),
+    ]
+
+    print(f"采样器性能测试 (N = {poly_degree}, 单位: 样本/秒)")
+    print(f"{'分布':<14} {'random逐个':>12} {'SHAKE-256批量':>14} {'加速比':>8}")
+    samples = {}
+    for name, legacy, bulk in cases:
+        bulk_rate, samples[name] = throughput(bulk, poly_degree)
+        if legacy is None:
+            print(f"{name:<14} {'-':>12} {bulk_rate:>14.0f} {'-':>8}")
+            continue
+        legacy_rate, _ = throughput(legacy, poly_degree)
+        print(f"{name:<14} {legacy_rate:>12.0f} {bulk_rate:>14.0f} {bulk_rate / legacy_rate:>7.1f}x")
+
+    ternary = samples['三角形分布']
+    zero_rate = np.mean(ternary == 0)
+    uniform = samples['模q均匀(600位)']
+    gaussian = samples['离散高斯']
+    checks = {
+        '三角形分布取值与0的频率': set(ternary.tolist()) <= {-1, 0, 1} and abs(zero_rate - 0.5) < 0.02,
+        '汉明权重': np.count_nonzero(samples['汉明权重']) == hamming_weight,
+        '均匀分布范围': all(0 <= value < modulus for value in uniform) and
+                  max(value.bit_length() for value in uniform) >= 590,
+        '离散高斯标准差': abs(np.std(gaussian) - 3.2) < 0.1,
+        '相同种子可复现': (XOFSampler(seed).ternary(64) == XOFSampler(seed).ternary(64)).all() and
+                    (XOFSampler(seed).uniform(8, modulus) == XOFSampler(seed).uniform(8, modulus)).all(),
+    }
+    print()
+    for name, passed in checks.items():
+        print(f"  {name}: {'通过' if passed else '失败'}")
+    return all(checks.values())
+
+
+if __name__ == "__main__":
+    success = benchmark_sampler()
+    if success:
+        print("\n✅ 批量采样器分布检查通过!")
+    else:
+        print("\n❌ 批量采样器分布检查失败!")
\ No newline at end of file
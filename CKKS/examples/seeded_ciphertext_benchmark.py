@@ -0,0 +1,71 @@
+"""种子压缩密文性能测试: 完整保存均匀c1的密文与种子压缩密文的序列化大小、加密与c1展开耗时对比"""
+
+import time
+import pickle
+import numpy as np
+from core.parameters import CKKSParameters
+from core.key_generator import CKKSKeyGenerator
+from core.encoder import CKKSEncoder
+from core.encryptor import CKKSEncryptor
+from core.decryptor import CKKSDecryptor
+from core.evaluator import CKKSEvaluator
+from primitives.ciphertext import Ciphertext
+
+
+def benchmark_seeded_ciphertext(log_degrees=(12, 13), num_ciphertexts=4, seed=0):
+    """检查种子压缩密文可正确解密、运算, 反序列化后展开的c1与加密时一致"""
+    rng = np.random.default_rng(seed)
+    print(f"种子压缩密文测试 (每组{num_ciphertexts}个密文, 大小为pickle字节数)")
+    print(f"{'N':>6} {'完整密文':>12} {'种子压缩':>12} {'压缩比':>8} {'加密(毫秒)':>12} {'展开(毫秒)':>12} {'最大误差':>12}")
+
+    all_correct = True
+    for log_degree in log_degrees:
+        poly_degree = 1 << log_degree
+        params = CKKSParameters(poly_degree=poly_degree, ciph_modulus=1 << 120, big_modulus=1 << 160,
+                                scaling_factor=1 << 30)
+        key_generator = CKKSKeyGenerator(params)
+        encoder = CKKSEncoder(params)
+        encryptor = CKKSEncryptor(params, key_generator.public_key, key_generator.secret_key, seed=seed)
+        decryptor = CKKSDecryptor(params, key_generator.secret_key)
+        evaluator = CKKSEvaluator(params)
+
+        messages = rng.uniform(-1, 1, (num_ciphertexts, poly_degree // 2))
+        plains = encoder.encode_many(messages, params.scaling_factor)
+
+        start_time = time.time()
+        seeded = [encryptor.encrypt_seeded(plain) for plain in plains]
+        encrypt_time = (time.time() - start_time) / num_ciphertexts
+        seeded_sizes = [len(pickle.dumps(ciph)) for ciph in seeded]
+        # 同一密文完整保存c0与c1时的大小
+        full_sizes = [len(pickle.dumps(Ciphertext(ciph.c0, ciph.c1, ciph.scaling_factor, ciph.modulus)))
+                      for ciph in seeded]
+
+        # 模拟传输: 接收方反序列化后首次访问c1时展开
+        received = [pickle.loads(pickle.dumps(ciph)) for ciph in seeded]
+        start_time = time.time()
+        expanded = [ciph.c1 for ciph in received]
+        expand_time = (time.time() - start_time) / num_ciphertexts
+
+        deterministic = all(ciph.c1.coeffs == c1.coeffs for ciph, c1 in zip(seeded, expanded))
+        decoded = np.array(encoder.decode_many([decryptor.decrypt(ciph) for ciph in received]))
+        error = np.abs(decoded - messages).max()
+        product = evaluator.rescale(evaluator.multiply(received[0], received[1], key_generator.relin_key),
+                                    params.scaling_factor)
+        product_error = np.abs(np.array(encoder.decode(decryptor.decrypt(product))) -
+                               messages[0] * messages[1]).max()
+
+        correct = deterministic and error < 1e-4 and product_error < 1e-3
+        all_correct = all_correct and correct
+        print(f"{poly_degree:>6} {np.mean(full_sizes):>12.0f} {np.mean(seeded_sizes):>12.0f} "
+              f"{np.mean(full_sizes) / np.mean(seeded_sizes):>7.2f}x {encrypt_time * 1000:>12.2f} "
+              f"{expand_time * 1000:>12.2f} {max(error, product_error):>12.2e}{'' if correct else '  结果不正确!'}")
+
+    return all_correct
+
+
+if __name__ == "__main__":
+    success = benchmark_seeded_ciphertext()
+    if success:
+        print("\n✅ 种子压缩密文结果正确!")
+    else:
+        print("\n❌ 种子压缩密文结果不正确!")
\ No newline at end of file
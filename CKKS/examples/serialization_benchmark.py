@@ -0,0 +1,124 @@
+"""序列化性能测试: 二进制格式与pickle的每密文字节数、序列化/反序列化吞吐量对比, 并检查各对象往返一致"""
+
+import mmap
+import time
+import pickle
+import tempfile
+import numpy as np
+from core.parameters import CKKSParameters
+from core.key_generator import CKKSKeyGenerator
+from core.encoder import CKKSEncoder
+from core.encryptor import CKKSEncryptor
+from core.evaluator import CKKSEvaluator
+from mathematics.rns_polynomial import RNSPolynomial
+from utils.serialization import serialize, deserialize, read_header
+
+
+def polys_of(obj):
+    """对象包含的全部多项式"""
+    if hasattr(obj, 'key'):
+        obj = obj.key
+    names = ('c0', 'c1', 'c2', 'poly', 'p0', 'p1', 's')
+    return [getattr(obj, name) for name in names if getattr(obj, name, None) is not None]
+
+
+def same_poly(poly1, poly2):
+    if isinstance(poly1, RNSPolynomial):
+        return isinstance(poly2, RNSPolynomial) and poly1.crt is poly2.crt and \
+            poly1.ntt_form == poly2.ntt_form and poly1.bound == poly2.bound and \
+            np.array_equal(poly1.residues, poly2.residues)
+    return poly1.coeffs == poly2.coeffs
+
+
+def round_trip(obj, params, packed=True):
+    """序列化后读回, 检查类型、元数据与多项式完全一致"""
+    restored = deserialize(serialize(obj, params, packed), params)
+    polys, restored_polys = polys_of(obj), polys_of(restored)
+    return type(restored) is type(obj) and len(polys) == len(restored_polys) and \
+        all(same_poly(poly1, poly2) for poly1, poly2 in zip(polys, restored_polys)) and \
+        getattr(obj, 'scaling_factor', None) == getattr(restored, 'scaling_factor', None) and \
+        getattr(obj, 'modulus', None) == getattr(restored, 'modulus', None) and \
+        getattr(obj, 'rotation', None) == getattr(restored, 'rotation', None)
+
+
+def throughput(func, obj, num_bytes, repeats=5):
+    """返回(MB/s, 最后一次结果)"""
+    start_time = time.time()
+    for _ in range(repeats):
+        result = func(obj)
+    return num_bytes * repeats / (time.time() - start_time) / (1 << 20), result
+
+
+def build(poly_degree, modulus_chain):
+    params = CKKSParameters(poly_degree=poly_degree, ciph_modulus=1 << 120, big_modulus=1 << 160,
+                            scaling_factor=1 << 30, modulus_chain=modulus_chain)
+    key_generator = CKKSKeyGenerator(params, seed=0)
+    encoder = CKKSEncoder(params)
+    encryptor = CKKSEncryptor(params, key_generator.public_key, key_generator.secret_key, seed=0)
+    return params, key_generator, encoder, encryptor, CKKSEvaluator(params)
+
+
+def benchmark_serialization(poly_degree=4096, seed=0):
+    """三种表示下密文的字节数与吞吐量, 以及全部对象类型的往返检查
+
+    吞吐量均以二进制格式的字节数计算, 即两种方式传输同样数据量的速度。
+    """
+    rng = np.random.default_rng(seed)
+    print(f"序列化性能测试 (N = {poly_degree}, 模数2^120, 吞吐量以二进制格式字节数计)")
+    print(f"{'密文表示':<10} {'二进制字节':>10} {'pickle字节':>11} {'写MB/s':>9} {'读MB/s':>9} "
+          f"{'pickle写':>9} {'pickle读':>9}")
+
+    checks = {}
+    for modulus_chain in (False, True):
+        params, key_generator, encoder, encryptor, evaluator = build(poly_degree, modulus_chain)
+        message = rng.uniform(-1, 1, poly_degree // 2)
+        plain = encoder.encode(message, params.scaling_factor)
+        ciph = encryptor.encrypt(plain)
+        # 大整数模式可直接写出系数, 也可先转为RNS表示按素数打包写出
+        representations = [('模数链RNS', evaluator.to_rns(ciph))] if modulus_chain else \
+            [('大整数系数', ciph), ('大整数RNS', evaluator.to_rns(ciph))]
+        name = '模数链' if modulus_chain else '大整数'
+
+        for label, rep_ciph in representations:
+            data = serialize(rep_ciph, params)
+            pickled = pickle.dumps(rep_ciph)
+            rates = [throughput(lambda obj: serialize(obj, params), rep_ciph, len(data))[0],
+                     throughput(lambda obj: deserialize(obj, params), data, len(data))[0],
+                     throughput(pickle.dumps, rep_ciph, len(data))[0],
+                     throughput(pickle.loads, pickled, len(data))[0]]
+            print(f"{label:<10} {len(data):>10} {len(pickled):>11} " + " ".join(f"{rate:>9.1f}" for rate in rates))
+        ciph = representations[-1][1]
+
+        objects = [rep_ciph for _, rep_ciph in representations] + [plain, encoder.prepare(plain), encryptor.encrypt_seeded(plain),
+                   key_generator.public_key, key_generator.secret_key, key_generator.relin_key,
+                   key_generator.generate_rot_key(1)]
+        checks[f'{name}往返一致'] = all(round_trip(obj, params) for obj in objects) and \
+            all(round_trip(obj, params, packed=False) for obj in objects)
+        header = read_header(data)
+        checks[f'{name}元数据'] = header['modulus'] == ciph.modulus and \
+            header['scaling_factor'] == ciph.scaling_factor and (header['level'] >= 0) == modulus_chain
+
+        if modulus_chain:
+            # 非打包的定宽剩余由mmap直接引用, 不复制
+            with tempfile.TemporaryFile() as f:
+                f.write(serialize(ciph, params, packed=False))
+                f.flush()
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    restored = deserialize(mapped, params)
+                    zero_copy = not restored.c0.residues.flags.owndata and \
+                        not restored.c0.residues.flags.writeable
+                    checks['mmap零拷贝读取'] = zero_copy and same_poly(ciph.c0, restored.c0)
+                    del restored
+
+    print()
+    for name, passed in checks.items():
+        print(f"  {name}: {'通过' if passed else '失败'}")
+    return all(checks.values())
+
+
+if __name__ == "__main__":
+    success = benchmark_serialization()
+    if success:
+        print("\n✅ 序列化往返检查通过!")
+    else:
+        print("\n❌ 序列化往返检查失败!")
\ No newline at end of file
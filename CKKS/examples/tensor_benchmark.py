@@ -0,0 +1,101 @@
+"""张量积性能测试: 逐对多项式乘法、变换复用的Karatsuba张量积与平方路径的NTT次数与耗时"""
+
+import time
+import random
+from contextlib import contextmanager
+from core.parameters import CKKSParameters
+from core.key_generator import CKKSKeyGenerator
+from core.encryptor import CKKSEncryptor
+from core.decryptor import CKKSDecryptor
+from operations.arithmetic import ArithmeticOperations
+from mathematics.crt import CRTContext
+from primitives.ciphertext import Ciphertext
+from primitives.plaintext import Plaintext
+from mathematics.polynomial import Polynomial
+
+
+@contextmanager
+def count_ntts(counter):
+    """统计上下文内各CRT上下文执行的单素数NTT次数(前向与逆向)"""
+    fwd, inv = CRTContext.ftt_fwd_array, CRTContext.ftt_inv_array
+
+    def counted_fwd(crt, residues):
+        counter['ntt'] += residues.shape[0]
+        return fwd(crt, residues)
+
+    def counted_inv(crt, residues):
+        counter['ntt'] += residues.shape[0]
+        return inv(crt, residues)
+
+    CRTContext.ftt_fwd_array, CRTContext.ftt_inv_array = counted_fwd, counted_inv
+    try:
+        yield counter
+    finally:
+        CRTContext.ftt_fwd_array, CRTContext.ftt_inv_array = fwd, inv
+
+
+def legacy_tensor(arithmetic, ciph1, ciph2):
+    """原有的张量积: 四次独立的CRT多项式乘法, 每次都重新变换两个输入"""
+    modulus = ciph1.modulus
+    crt = arithmetic.crt_for(ciph1.modulus, ciph2.modulus)
+    c0 = ciph1.c0.multiply(ciph2.c0, modulus, crt=crt).mod_small(modulus)
+    c1 = ciph1.c0.multiply(ciph2.c1, modulus, crt=crt)
+    c1 = c1.add(ciph1.c1.multiply(ciph2.c0, modulus, crt=crt), modulus).mod_small(modulus)
+    c2 = ciph1.c1.multiply(ciph2.c1, modulus, crt=crt).mod_small(modulus)
+    return c0, c1, c2
+
+
+def measure(func, *args):
+    """返回(结果, 耗时, 单素数NTT次数)"""
+    with count_ntts({'ntt': 0}) as counter:
+        start_time = time.time()
+        result = func(*args)
+        elapsed = time.time() - start_time
+    return result, elapsed, counter['ntt']
+
+
+def benchmark_tensor(log_degrees=(10, 12), seed=0):
+    """对比三种张量积的NTT次数与耗时, 检查结果一致, 并检查平方与乘法解密一致"""
+    print("张量积性能测试 (单位: 毫秒 / 单素数NTT次数)")
+    print(f"{'N':>6} {'逐对乘法':>16} {'Karatsuba':>16} {'平方':>16}")
+
+    all_exact = True
+    for log_degree in log_degrees:
+        random.seed(seed)
+        poly_degree = 1 << log_degree
+        params = CKKSParameters(poly_degree=poly_degree, ciph_modulus=1 << 120, big_modulus=1 << 160,
+                                scaling_factor=1 << 40)
+        key_generator = CKKSKeyGenerator(params, seed=seed)
+        encryptor = CKKSEncryptor(params, key_generator.public_key, key_generator.secret_key, seed=seed)
+        decryptor = CKKSDecryptor(params, key_generator.secret_key)
+        arithmetic = ArithmeticOperations(params, params.crt_context)
+
+        message = [random.randint(-1000, 1000) * (1 << 30) for _ in range(poly_degree)]
+        ciph = encryptor.encrypt(Plaintext(Polynomial(poly_degree, message), params.scaling_factor))
+        ciph_copy = Ciphertext(ciph.c0, ciph.c1, ciph.scaling_factor, ciph.modulus)
+
+        legacy, legacy_time, legacy_ntts = measure(legacy_tensor, arithmetic, ciph, ciph_copy)
+        tensor, tensor_time, tensor_ntts = measure(arithmetic.tensor, ciph, ciph_copy)
+        square, square_time, square_ntts = measure(arithmetic.tensor_square, ciph)
+
+        exact = [poly.coeffs for poly in legacy] == [poly.coeffs for poly in tensor] == \
+            [poly.coeffs for poly in square]
+        squared = decryptor.decrypt(arithmetic.square(ciph, key_generator.relin_key)).poly.coeffs
+        multiplied = decryptor.decrypt(arithmetic.multiply(ciph, ciph_copy, key_generator.relin_key)).poly.coeffs
+        exact = exact and squared == multiplied
+        all_exact = all_exact and exact
+
+        print(f"{poly_degree:>6} " + " ".join(f"{elapsed * 1000:>9.1f} / {ntts:>4}" for elapsed, ntts in
+                                              ((legacy_time, legacy_ntts), (tensor_time, tensor_ntts),
+                                               (square_time, square_ntts))) +
+              f"{'' if exact else '  结果不一致!'}")
+
+    return all_exact
+
+
+if __name__ == "__main__":
+    success = benchmark_tensor()
+    if success:
+        print("\n✅ 张量积与平方结果与原实现一致!")
+    else:
+        print("\n❌ 张量积结果不一致!")
\ No newline at end of file
@@ -1,32 +1,82 @@
 """完整的中国剩余定理实现"""
 
+import bisect
+import numpy as np
 import mathematics.number_theory as nbtheory
-from mathematics.ntt import NTTContext
+from mathematics.ntt import NTTContext, WORD_MODULUS_LIMIT, ntt_array
+
+# 小素数RNS模式的素数位数: 素数小于2^31, 剩余乘积可放入uint64
+SMALL_PRIME_SIZE = 30
+
+# 整体重构时大整数按16位分段, 分段乘积之和在float64中保持精确
+LIMB_BITS = 16
+LIMB_MASK = (1 << LIMB_BITS) - 1
+
+
+def mod_matmul(coeff_halves, values, moduli):
+    """定宽模矩阵乘法: (C @ values) mod moduli
+
+    C以(低16位, 高16位)两段float64矩阵给出, values为小于2^32的uint64数组;
+    四个分段乘积之和均小于2^53, 由float64矩阵乘法精确求得后再在uint64下约化。
+    """
+    lo, hi = coeff_halves
+    shift = np.uint64(LIMB_BITS)
+    v_lo = (values & np.uint64(LIMB_MASK)).astype(np.float64)
+    v_hi = (values >> shift).astype(np.float64)
+
+    low = (lo @ v_lo).astype(np.uint64) % moduli
+    mid = (lo @ v_hi + hi @ v_lo).astype(np.uint64) % moduli
+    high = (hi @ v_hi).astype(np.uint64) % moduli
+    return ((((high << shift) % moduli + mid) << shift) % moduli + low) % moduli
+
+
+def split_halves(matrix):
+    """将小于2^32的整数矩阵拆为(低16位, 高16位)两段float64矩阵"""
+    return (np.array([[v & LIMB_MASK for v in row] for row in matrix], dtype=np.float64),
+            np.array([[v >> LIMB_BITS for v in row] for row in matrix], dtype=np.float64))
 
 
 class CRTContext:
     """完整的CRT上下文"""
 
-    def __init__(self, num_primes, prime_size, poly_degree):
+    def __init__(self, num_primes, prime_size, poly_degree, small_primes=False, primes=None, ntts=None):
         self.poly_degree = poly_degree
-        self.generate_primes(num_primes, prime_size, mod=2 * poly_degree)
-        self.generate_ntt_contexts()
+        self.small_primes = small_primes
+        if primes is None:
+            self.generate_primes(num_primes, prime_size, mod=2 * poly_degree,
+                                 small_primes=small_primes)
+        else:
+            self.primes = list(primes)
+
+        if ntts is None:
+            self.generate_ntt_contexts()
+        else:
+            self.ntts = list(ntts)
 
         self.modulus = 1
         for prime in self.primes:
             self.modulus *= prime
 
         self.precompute_crt()
+        self.precompute_batch_ntt()
+        self.precompute_garner()
+        self.sub_contexts = {}
+        self.base_convert_tables = {}
+
+    def generate_primes(self, num_primes, prime_size, mod, small_primes=False):
+        """生成素数
 
-    def generate_primes(self, num_primes, prime_size, mod):
-        """生成素数"""
-        self.primes = [1] * num_primes
+        small_primes为True时所有素数限制在2^(SMALL_PRIME_SIZE+1)以内,
+        使NTT、逐点乘积与约化均可在定宽uint64数组上完成。
+        """
+        if small_primes and prime_size > SMALL_PRIME_SIZE:
+            raise ValueError(f'小素数模式要求素数大小不超过{SMALL_PRIME_SIZE}位, 实际为{prime_size}位')
+
+        upper_bound = (1 << (SMALL_PRIME_SIZE + 1)) if small_primes else None
         possible_prime = (1 << prime_size) + 1
-        for i in range(num_primes):
-            possible_prime += mod
-            while not nbtheory.is_prime(possible_prime):
-                possible_prime += mod
-            self.primes[i] = possible_prime
+        self.primes = nbtheory.generate_ntt_primes(num_primes, possible_prime + mod, mod, limit=upper_bound)
+        if len(self.primes) < num_primes:
+            raise ValueError(f'2^{SMALL_PRIME_SIZE + 1}以内的NTT友好素数不足{num_primes}个')
 
     def generate_ntt_contexts(self):
         """生成NTT上下文"""
@@ -44,10 +94,135 @@ class CRTContext:
             self.crt_vals[i] = self.modulus // self.primes[i]
             self.crt_inv_vals[i] = nbtheory.mod_inv(self.crt_vals[i], self.primes[i])
 
+        # prefix_moduli[i]为前i+1个素数的乘积
+        self.prefix_moduli = [self.primes[0]]
+        for prime in self.primes[1:]:
+            self.prefix_moduli.append(self.prefix_moduli[-1] * prime)
+
+    def precompute_batch_ntt(self):
+        """按素数堆叠NTT表, 以便对 素数数 × N 的剩余数组整体做NTT"""
+        self.word_sized = all(prime < WORD_MODULUS_LIMIT for prime in self.primes)
+        self.dtype = np.uint64 if self.word_sized else object
+
+        num_primes = len(self.primes)
+        self.moduli = np.array(self.primes, dtype=self.dtype).reshape(num_primes, 1)
+        self.reversed_bits_array = self.ntts[0].reversed_bits_array
+        self.stage_twiddles = self._stack_tables([ntt.stage_twiddles for ntt in self.ntts])
+        self.stage_twiddles_inv = self._stack_tables([ntt.stage_twiddles_inv for ntt in self.ntts])
+        self.fwd_scale = np.stack([ntt.fwd_scale.astype(self.dtype) for ntt in self.ntts])
+        self.inv_scale = np.stack([ntt.inv_scale.astype(self.dtype) for ntt in self.ntts])
+
+    def _stack_tables(self, tables):
+        """将各素数的逐级旋转因子堆叠为 素数数 × 1 × 半长 的数组"""
+        return [np.stack([table[s].astype(self.dtype) for table in tables])[:, None, :]
+                for s in range(len(tables[0]))]
+
+    def precompute_garner(self):
+        """整体重构预计算
+
+        定宽素数使用Garner混合基: P_0 = 1, P_i = p_0 * ... * p_{i-1},
+        garner_inv[i] = P_i^-1 mod p_i;
+        大素数使用CRT基crt_vals。两种基都预先拆成16位分段矩阵。
+        """
+        num_primes = len(self.primes)
+        self.mixed_radix = [1] * num_primes
+        for i in range(1, num_primes):
+            self.mixed_radix[i] = self.mixed_radix[i - 1] * self.primes[i - 1]
+
+        self.crt_inv_vals_array = np.array(self.crt_inv_vals, dtype=self.dtype).reshape(num_primes, 1)
+        if self.word_sized:
+            # garner_radix_halves[i]为 [P_j mod p_i for j < i] 的16位分段
+            self.garner_radix_halves = [None] * num_primes
+            for i in range(1, num_primes):
+                self.garner_radix_halves[i] = split_halves([[self.mixed_radix[j] % self.primes[i]
+                                                             for j in range(i)]])
+            self.garner_inv = np.array([nbtheory.mod_inv(self.mixed_radix[i], self.primes[i])
+                                        for i in range(num_primes)], dtype=self.dtype)
+            self.radix_limbs = self._to_limbs(self.mixed_radix)
+        else:
+            self.radix_limbs = self._to_limbs(self.crt_vals)
+
+        self.digit_limbs = -(-max(self.primes).bit_length() // LIMB_BITS)
+
+    def _to_limbs(self, values):
+        """将大整数列表拆为 L × 个数 的16位分段矩阵"""
+        num_limbs = max(value.bit_length() for value in values) // LIMB_BITS + 1
+        return np.array([[(value >> (LIMB_BITS * l)) & LIMB_MASK for value in values]
+                         for l in range(num_limbs)], dtype=np.float64)
+
+    def sub_context(self, primes):
+        """由本上下文中部分素数构成的子上下文, 共享各素数的NTT上下文"""
+        key = tuple(primes)
+        if key not in self.sub_contexts:
+            ntt_of = dict(zip(self.primes, self.ntts))
+            self.sub_contexts[key] = CRTContext(len(key), None, self.poly_degree, self.small_primes,
+                                                primes=key, ntts=[ntt_of[prime] for prime in key])
+        return self.sub_contexts[key]
+
+    def prefix_context(self, num_primes):
+        """由前num_primes个素数构成的子上下文"""
+        if num_primes >= len(self.primes):
+            return self
+        return self.sub_context(self.primes[:num_primes])
+
+    def context_for_product(self, bound1, bound2):
+        """系数绝对值分别不超过bound1与bound2的两个多项式相乘时, 能唯一恢复乘积的最小前缀上下文
+
+        乘积系数绝对值不超过 N * bound1 * bound2, 中心化重构要求模数大于其两倍;
+        完整上下文也不满足时乘积会被错误地回绕, 直接报错。
+        """
+        target = 2 * self.poly_degree * bound1 * bound2
+        if target >= self.modulus:
+            raise ValueError(f'CRT模数({self.modulus.bit_length()}位)不足以容纳乘积系数'
+                             f'({target.bit_length()}位), 请增加素数个数')
+        return self.prefix_context(bisect.bisect_right(self.prefix_moduli, target) + 1)
+
+    def base_convert(self, residues, target):
+        """快速基转换: 将本基下的剩余转换到target上下文的素数下
+
+        计算 sum_i [r_i * (Q/q_i)^-1]_{q_i} * (Q/q_i) 在target各素数下的剩余,
+        其值等于 x + u*Q (0 <= u < 素数个数), x为剩余表示的[0, Q)内整数。
+        """
+        key = tuple(target.primes)
+        if key not in self.base_convert_tables:
+            table = [[crt_val % prime for crt_val in self.crt_vals] for prime in target.primes]
+            self.base_convert_tables[key] = split_halves(table) if self.word_sized and target.word_sized \
+                else np.array(table, dtype=object)
+
+        terms = (residues * self.crt_inv_vals_array) % self.moduli
+        table = self.base_convert_tables[key]
+        if isinstance(table, tuple):
+            return mod_matmul(table, terms, target.moduli)
+        return ((table @ terms.astype(object)) % np.array(target.primes, dtype=object)[:, None]).astype(target.dtype)
+
     def crt(self, value):
         """CRT表示"""
         return [value % p for p in self.primes]
 
+    def crt_poly(self, coeffs):
+        """多项式的CRT表示, 返回 素数数 × N 的剩余数组
+
+        coeffs可为二维数组(每行一个多项式), 此时返回 多项式数 × 素数数 × N 的数组;
+        int64数组且素数小于2^63时(如小系数的随机多项式)直接以int64运算。
+        """
+        if isinstance(coeffs, np.ndarray) and coeffs.dtype == np.int64 and max(self.primes) < 1 << 63:
+            values = coeffs[..., None, :] % np.array(self.primes, dtype=np.int64)[:, None]
+            return values.astype(self.dtype)
+        values = np.array(coeffs, dtype=object)[..., None, :] % np.array(self.primes, dtype=object)[:, None]
+        return values.astype(self.dtype)
+
+    def ftt_fwd_array(self, residues):
+        """对所有素数的剩余同时做前向FTT"""
+        ftt_input = (residues * self.fwd_scale) % self.moduli
+        return ntt_array(ftt_input, self.reversed_bits_array, self.stage_twiddles,
+                         self.moduli[:, :, None])
+
+    def ftt_inv_array(self, residues):
+        """对所有素数的剩余同时做逆向FTT"""
+        to_scale_down = ntt_array(residues, self.reversed_bits_array, self.stage_twiddles_inv,
+                                  self.moduli[:, :, None])
+        return (to_scale_down * self.inv_scale) % self.moduli
+
     def reconstruct(self, values):
         """CRT重构"""
         assert len(values) == len(self.primes)
@@ -59,4 +234,62 @@ class CRTContext:
             regular_rep_val += intermed_val
             regular_rep_val %= self.modulus
 
-        return regular_rep_val
\ No newline at end of file
+        return regular_rep_val
+
+    def reconstruct_poly(self, residues, centered=False):
+        """整体CRT重构: 输入 素数数 × N 的剩余数组, 返回N个系数
+
+        定宽素数使用Garner混合基算法, 数字运算全部在uint64数组上完成;
+        大素数的数字运算需要任意精度, 改用O(k)次的向量化CRT求和。
+        两种情况下数字与基的组合都以16位分段矩阵乘法完成。
+        centered为True时结果落在(-Q/2, Q/2], 与mod_small(Q)一致。
+        """
+        assert residues.shape[0] == len(self.primes), "reconstruct_poly: 剩余行数与素数个数不匹配"
+
+        if self.word_sized:
+            result = self._combine_limbs(self._garner_digits(residues))
+        else:
+            digits = ((residues * self.crt_inv_vals_array) % self.moduli).astype(np.uint64)
+            result = [value % self.modulus for value in self._combine_limbs(digits)]
+
+        if centered:
+            half_modulus = self.modulus // 2
+            result = [value - self.modulus if value > half_modulus else value for value in result]
+
+        return result
+
+    def _garner_digits(self, residues):
+        """Garner算法求混合基数字
+
+        第i个数字需要 sum_{j<i} d_j * (P_j mod p_i) mod p_i, 由mod_matmul精确计算。
+        """
+        num_primes = len(self.primes)
+        digits = np.empty(residues.shape, dtype=self.dtype)
+
+        for i in range(num_primes):
+            prime = self.moduli[i]
+            partial = mod_matmul(self.garner_radix_halves[i], digits[:i], prime)[0] if i else 0
+            digits[i] = ((residues[i] + prime - partial) % prime * self.garner_inv[i]) % prime
+
+        return digits
+
+    def _combine_limbs(self, digits):
+        """计算 sum_i digits[i] * radix[i], 返回N个Python整数
+
+        数字与基均拆为16位分段, 分段乘积之和小于2^53, 可用float64矩阵乘法精确求得,
+        再逐段进位后按小端字节转换为整数。
+        """
+        num_limbs, num_coeffs = self.radix_limbs.shape[0], digits.shape[1]
+        limbs = np.zeros((num_limbs + self.digit_limbs + 1, num_coeffs), dtype=np.float64)
+        for a in range(self.digit_limbs):
+            digit_part = ((digits >> np.uint64(LIMB_BITS * a)) & np.uint64(LIMB_MASK)).astype(np.float64)
+            limbs[a:a + num_limbs] += self.radix_limbs @ digit_part
+
+        limbs = limbs.astype(np.uint64)
+        for l in range(limbs.shape[0] - 1):
+            limbs[l + 1] += limbs[l] >> np.uint64(LIMB_BITS)
+            limbs[l] &= np.uint64(LIMB_MASK)
+
+        width = 2 * limbs.shape[0]
+        data = limbs.T.astype('<u2').tobytes()
+        return [int.from_bytes(data[i * width:(i + 1) * width], 'little') for i in range(num_coeffs)]
\ No newline at end of file
@@ -0,0 +1,51 @@
+"""Galois自同构 x -> x^g 的下标置换表
+
+置换表按(度数, g mod 2N)缓存, 系数域与NTT域各一张, 数组只读以便共享。
+"""
+
+from functools import lru_cache
+import numpy as np
+
+
+def rotation_element(rotation, degree):
+    """槽位旋转rotation对应的Galois元素 5^rotation mod 2N"""
+    return pow(5, rotation, 2 * degree)
+
+
+def conjugation_element(degree):
+    """复共轭对应的Galois元素 2N - 1"""
+    return 2 * degree - 1
+
+
+@lru_cache(maxsize=None)
+def _coeff_table(degree, galois_elt):
+    index = np.arange(degree, dtype=np.int64) * galois_elt % (2 * degree)
+    source = np.empty(degree, dtype=np.int64)
+    source[index % degree] = np.arange(degree, dtype=np.int64)
+    negate = np.zeros(degree, dtype=bool)
+    negate[index % degree] = index >= degree
+    source.flags.writeable = False
+    negate.flags.writeable = False
+    return source, negate
+
+
+def coeff_table(degree, galois_elt):
+    """系数域置换: 结果第j项为 (-1 if negate[j]) * 原系数[source[j]]"""
+    galois_elt %= 2 * degree
+    assert galois_elt % 2 == 1, 'Galois元素必须为奇数'
+    return _coeff_table(degree, galois_elt)
+
+
+@lru_cache(maxsize=None)
+def _ntt_permutation(degree, galois_elt):
+    index = (2 * np.arange(degree, dtype=np.int64) + 1) * galois_elt % (2 * degree)
+    perm = (index - 1) // 2
+    perm.flags.writeable = False
+    return perm
+
+
+def ntt_permutation(degree, galois_elt):
+    """NTT域置换: 第k个求值点为 psi^(2k+1), 自同构后取原求值结果的第 ((2k+1)g - 1)/2 项"""
+    galois_elt %= 2 * degree
+    assert galois_elt % 2 == 1, 'Galois元素必须为奇数'
+    return _ntt_permutation(degree, galois_elt)
\ No newline at end of file
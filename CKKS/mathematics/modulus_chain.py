@@ -0,0 +1,166 @@
+"""RNS模数链: 以丢弃素数实现重缩放, 以快速基扩展实现密钥交换"""
+
+import math
+import weakref
+import numpy as np
+import mathematics.number_theory as nbtheory
+from mathematics.crt import CRTContext
+from mathematics.rns_polynomial import RNSPolynomial
+
+
+class ModulusChain:
+    """模数链 Q_L = q_0 * q_1 * ... * q_L 与特殊模数 P = p_0 * ... * p_{k-1}
+
+    q_1..q_L 均为接近缩放因子的NTT友好素数, 除以缩放因子即丢弃最高层素数;
+    底层 q_0 承担剩余的密文模数位数, 必要时拆为不超过缩放因子位数的多个素数,
+    使缩放因子不超过2^30时各层剩余均为定宽整数。
+    密钥交换在 Q_l * P 上进行, 再除以P回到 Q_l。
+    """
+
+    def __init__(self, poly_degree, scaling_factor, ciph_modulus, big_modulus):
+        self.poly_degree = poly_degree
+        scale_bits = math.log(scaling_factor, 2)
+        num_levels = max(0, int((math.log(ciph_modulus, 2) - scale_bits) / scale_bits))
+        base_bits = math.log(ciph_modulus, 2) - num_levels * scale_bits
+        num_base = math.ceil(base_bits / scale_bits - 1e-9)
+        num_special = max(1, math.ceil(math.log(big_modulus, 2) / scale_bits))
+
+        mod = 2 * poly_degree
+        used = set()
+        self.chain_primes = self.find_primes(round(2 ** (base_bits / num_base)), num_base, mod, used) + \
+            self.find_primes(scaling_factor, num_levels, mod, used)
+        self.special_primes = self.find_primes(scaling_factor, num_special, mod, used)
+
+        self.full_context = CRTContext(None, None, poly_degree,
+                                       primes=self.chain_primes + self.special_primes)
+        self.special_context = self.full_context.sub_context(self.special_primes)
+        self.special_modulus = self.special_context.modulus
+        self.num_base = num_base
+        self.num_levels = num_levels
+        self.key_cache = weakref.WeakKeyDictionary()
+
+    def __getstate__(self):
+        """序列化时丢弃按密钥对象缓存的NTT剩余(弱引用字典无法序列化)"""
+        state = self.__dict__.copy()
+        del state['key_cache']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.key_cache = weakref.WeakKeyDictionary()
+
+    @staticmethod
+    def find_primes(target, count, mod, used):
+        """由近及远在target两侧交替寻找模mod余1的素数, 使素数乘积尽量接近target的幂"""
+        primes = []
+        start = target - (target - 1) % mod
+        step = 0
+        while len(primes) < count:
+            for candidate in (start + step * mod, start - step * mod)[:2 if step else 1]:
+                if len(primes) < count and candidate > mod and candidate not in used \
+                        and nbtheory.is_prime(candidate):
+                    used.add(candidate)
+                    primes.append(candidate)
+            step += 1
+        return primes
+
+    @property
+    def ciph_modulus(self):
+        """最高层密文模数 Q_L"""
+        return self.level_context(self.num_levels).modulus
+
+    def level_context(self, level):
+        """第level层的CRT上下文"""
+        return self.full_context.sub_context(self.chain_primes[:self.num_base + level])
+
+    def extended_context(self, level):
+        """第level层加特殊素数的CRT上下文"""
+        return self.full_context.sub_context(self.chain_primes[:self.num_base + level] + self.special_primes)
+
+    def level_of(self, modulus):
+        """由密文模数确定所在层"""
+        for level in range(self.num_levels + 1):
+            if self.level_context(level).modulus == modulus:
+                return level
+        raise ValueError('密文模数不在模数链上')
+
+    def context_for_modulus(self, modulus):
+        """密文模数对应的CRT上下文"""
+        return self.level_context(self.level_of(modulus))
+
+    def rescale(self, poly):
+        """丢弃最高层素数q_l: 返回 round(x / q_l) 在 q_0..q_{l-1} 下的剩余"""
+        crt = poly.crt
+        top_index = len(crt.primes) - 1
+        assert top_index >= self.num_base, '模数链已到最底层, 无法继续重缩放'
+        lower = self.level_context(top_index - self.num_base)
+        top_prime = crt.primes[top_index]
+
+        residues = poly.from_ntt().residues.astype(lower.dtype)
+        top = residues[top_index]
+        # 中心化最高层剩余, 使除法结果为四舍五入
+        negative = top > top_prime // 2
+        top_mod = top % lower.moduli
+        top_mod = (top_mod + lower.moduli - (top_prime % lower.moduli) * negative) % lower.moduli
+        inv = np.array([nbtheory.mod_inv(top_prime, prime) for prime in lower.primes],
+                       dtype=lower.dtype).reshape(-1, 1)
+        residues = (residues[:top_index] + lower.moduli - top_mod) % lower.moduli * inv % lower.moduli
+
+        result = RNSPolynomial(poly.ring_degree, residues, lower)
+        return result.to_ntt() if poly.ntt_form else result
+
+    def drop(self, poly, num_primes):
+        """丢弃最高的num_primes个素数, 即约化到较低层的模数而不做除法"""
+        crt = poly.crt
+        lower = self.level_context(len(crt.primes) - num_primes - self.num_base)
+        return RNSPolynomial(poly.ring_degree, poly.residues[:len(lower.primes)], lower,
+                             poly.ntt_form)
+
+    def mod_up(self, poly):
+        """快速基扩展: Q_l 下的剩余扩展到 Q_l * P"""
+        crt = poly.crt
+        extended = self.extended_context(len(crt.primes) - self.num_base)
+        residues = poly.from_ntt().residues
+        special = crt.base_convert(residues, self.special_context)
+        return RNSPolynomial(poly.ring_degree, np.concatenate([residues, special]).astype(extended.dtype),
+                             extended)
+
+    def mod_down(self, poly):
+        """Q_l * P 下的剩余除以P: (d - [d]_P) * P^-1 mod q_i"""
+        num_chain = len(poly.crt.primes) - len(self.special_primes)
+        lower = self.level_context(num_chain - self.num_base)
+        residues = poly.from_ntt().residues
+        conv = self.special_context.base_convert(residues[num_chain:].astype(self.special_context.dtype), lower)
+        inv = np.array([nbtheory.mod_inv(self.special_modulus, prime) for prime in lower.primes],
+                       dtype=lower.dtype).reshape(-1, 1)
+        residues = (residues[:num_chain].astype(lower.dtype) + lower.moduli - conv) % lower.moduli * inv % lower.moduli
+        return RNSPolynomial(poly.ring_degree, residues, lower)
+
+    def key_residues(self, key):
+        """交换密钥在全部素数下的NTT域剩余, 按密钥对象缓存
+
+        密钥库中的密钥已是全部素数下的NTT域RNS多项式, 直接使用其剩余(可为映射页面上的uint64视图,
+        key_switch_extended只转换所需的行)。
+        """
+        if isinstance(key.p0, RNSPolynomial):
+            assert key.p0.crt.primes == self.full_context.primes, '交换密钥的素数与模数链不一致'
+            return [key.p0.residues, key.p1.residues]
+        if key not in self.key_cache:
+            self.key_cache[key] = [self.full_context.ftt_fwd_array(self.full_context.crt_poly(p.coeffs))
+                                   for p in (key.p0, key.p1)]
+        return self.key_cache[key]
+
+    def key_switch(self, poly, key):
+        """密钥交换: 返回 (d0, d1) 使 d0 + d1*s ≈ poly * s', 全程不重构大整数"""
+        return self.key_switch_extended(self.mod_up(poly).to_ntt(), key)
+
+    def key_switch_extended(self, extended, key):
+        """对已扩展到 Q_l * P 且处于NTT域的多项式做密钥交换, 供提升旋转共享同一次模数提升"""
+        num_chain = len(extended.crt.primes) - len(self.special_primes)
+        rows = list(range(num_chain)) + list(range(len(self.chain_primes), len(self.full_context.primes)))
+
+        results = []
+        for key_res in self.key_residues(key):
+            prod = (extended.residues * key_res[rows].astype(extended.crt.dtype)) % extended.crt.moduli
+            results.append(self.mod_down(RNSPolynomial(extended.ring_degree, prod, extended.crt, ntt_form=True)))
+        return results
\ No newline at end of file
@@ -1,21 +1,53 @@
 from math import log, pi, cos, sin
+import numpy as np
 import mathematics.number_theory as nbtheory
 from utils.bit_operations import reverse_bits,bit_reverse_vec
 
+# 模数小于该值时, 两个剩余的乘积可放入uint64
+WORD_MODULUS_LIMIT = 1 << 32
+
+
+def ntt_array(values, reversed_bits, stage_twiddles, modulus):
+    """按级向量化的NTT蝶形运算
+
+    values的最后一维为系数维, 其余维度按广播规则批量处理;
+    stage_twiddles[s]为第s级的旋转因子数组, 与ntt()中的rou_idx一一对应。
+    """
+    result = values[..., reversed_bits]
+    lead_shape = result.shape[:-1]
+    num_coeffs = result.shape[-1]
+
+    for twiddles in stage_twiddles:
+        half = twiddles.shape[-1]
+        blocks = result.reshape(lead_shape + (num_coeffs // (2 * half), 2, half))
+        even = blocks[..., 0, :]
+        omega_factor = (blocks[..., 1, :] * twiddles) % modulus
+
+        butterfly_plus = (even + omega_factor) % modulus
+        butterfly_minus = (even + modulus - omega_factor) % modulus
+        result = np.concatenate((butterfly_plus, butterfly_minus), axis=-1)
+        result = result.reshape(lead_shape + (num_coeffs,))
+
+    return result
+
 
 class NTTContext:
     """完整的NTT上下文实现"""
 
-    def __init__(self, poly_degree, coeff_modulus, root_of_unity=None):
+    def __init__(self, poly_degree, coeff_modulus, root_of_unity=None, tables=None):
         assert (poly_degree & (poly_degree - 1)) == 0, \
             "多项式度数必须是2的幂"
         self.coeff_modulus = coeff_modulus
         self.degree = poly_degree
 
-        if not root_of_unity:
-            root_of_unity = nbtheory.root_of_unity(order=2 * poly_degree, modulus=coeff_modulus)
-
-        self.precompute_ntt(root_of_unity)
+        if tables is not None:
+            # 由缓存的(单位根幂, 逆单位根幂, 位反转索引)表恢复, 跳过逐项模乘
+            self.load_tables(*tables)
+        else:
+            if not root_of_unity:
+                root_of_unity = nbtheory.root_of_unity(order=2 * poly_degree, modulus=coeff_modulus)
+            self.precompute_ntt(root_of_unity)
+        self.precompute_ntt_arrays()
 
     def precompute_ntt(self, root_of_unity):
         """NTT预计算"""
@@ -35,6 +67,49 @@ class NTTContext:
         for i in range(self.degree):
             self.reversed_bits[i] = reverse_bits(i, width) % self.degree
 
+    def load_tables(self, roots, roots_inv, reversed_bits):
+        """由预计算表恢复NTT上下文"""
+        self.roots_of_unity = roots.tolist()
+        self.roots_of_unity_inv = roots_inv.tolist()
+        self.reversed_bits = reversed_bits.tolist()
+
+    def tables(self):
+        """可缓存的预计算表: 单位根幂, 逆单位根幂与位反转索引"""
+        return (np.array(self.roots_of_unity, dtype=np.uint64),
+                np.array(self.roots_of_unity_inv, dtype=np.uint64),
+                np.array(self.reversed_bits, dtype=np.uint64))
+
+    def precompute_ntt_arrays(self):
+        """向量化NTT预计算: 每级旋转因子与首尾扭转因子"""
+        if self.coeff_modulus < WORD_MODULUS_LIMIT:
+            self.dtype = np.uint64
+            self.modulus = np.uint64(self.coeff_modulus)
+        else:
+            self.dtype = object
+            self.modulus = self.coeff_modulus
+
+        self.reversed_bits_array = np.array(self.reversed_bits, dtype=np.int64)
+        roots = np.array(self.roots_of_unity, dtype=self.dtype)
+        roots_inv = np.array(self.roots_of_unity_inv, dtype=self.dtype)
+
+        # 第logm级使用下标为 i << (1 + log N - logm) 的单位根幂, 即步长切片
+        log_degree = int(log(self.degree, 2))
+        self.stage_twiddles = []
+        self.stage_twiddles_inv = []
+        for logm in range(1, log_degree + 1):
+            step = 1 << (1 + log_degree - logm)
+            self.stage_twiddles.append(roots[::step].copy())
+            self.stage_twiddles_inv.append(roots_inv[::step].copy())
+
+        poly_degree_inv = nbtheory.mod_inv(self.degree, self.coeff_modulus)
+        self.fwd_scale = roots
+        self.inv_scale = (roots_inv * poly_degree_inv) % self.modulus
+
+    def to_array(self, coeffs):
+        """将系数约化到[0, q)并转换为本模数对应的数组"""
+        values = np.array(coeffs, dtype=object) % self.coeff_modulus
+        return values.astype(self.dtype)
+
     def ntt(self, coeffs, rou):
         """NTT变换"""
         num_coeffs = len(coeffs)
@@ -84,6 +159,22 @@ class NTTContext:
 
         return result
 
+    def ftt_fwd_array(self, coeffs):
+        """向量化前向FTT, 结果与ftt_fwd逐位一致"""
+        values = self.to_array(coeffs)
+        assert values.shape[-1] == self.degree, "ftt_fwd_array: 输入长度不匹配"
+
+        ftt_input = (values * self.fwd_scale) % self.modulus
+        return ntt_array(ftt_input, self.reversed_bits_array, self.stage_twiddles, self.modulus)
+
+    def ftt_inv_array(self, values):
+        """向量化逆向FTT, 输入为[0, q)内的数组, 结果与ftt_inv逐位一致"""
+        assert values.shape[-1] == self.degree, "ftt_inv_array: 输入长度不匹配"
+
+        to_scale_down = ntt_array(values, self.reversed_bits_array, self.stage_twiddles_inv,
+                                  self.modulus)
+        return (to_scale_down * self.inv_scale) % self.modulus
+
 
 class FFTContext:
     """完整的FFT上下文实现"""
@@ -111,6 +202,8 @@ class FFTContext:
         for i in range(1, num_slots):
             self.rot_group[i] = (5 * self.rot_group[i - 1]) % self.fft_length
 
+        self._embedding_tables = {}
+
     def fft(self, coeffs, rou):
         """FFT变换"""
         num_coeffs = len(coeffs)
@@ -211,4 +304,68 @@ class FFTContext:
         for i in range(num_coeffs):
             to_scale_down[i] /= num_coeffs
 
-        return to_scale_down
\ No newline at end of file
+        return to_scale_down
+
+    def embedding_tables(self, num_coeffs):
+        """向量化规范嵌入预计算, 按槽位数缓存: 位反转索引与每级的旋转因子数组
+
+        第logm级第i个蝶形使用下标为 (rot_group[i] mod 2^(logm+2)) * gap 的单位根, 与embedding()一一对应。
+        """
+        if num_coeffs not in self._embedding_tables:
+            width = int(log(num_coeffs, 2))
+            indices = np.arange(num_coeffs, dtype=np.int64)
+            reversed_bits = np.zeros(num_coeffs, dtype=np.int64)
+            for bit in range(width):
+                reversed_bits |= ((indices >> bit) & 1) << (width - 1 - bit)
+
+            roots = np.array(self.roots_of_unity, dtype=np.complex128)
+            roots_inv = np.array(self.roots_of_unity_inv, dtype=np.complex128)
+            rot_group = np.array(self.rot_group[:max(num_coeffs // 2, 1)], dtype=np.int64)
+            stage_twiddles = []
+            stage_twiddles_inv = []
+            for logm in range(1, width + 1):
+                idx_mod = 1 << (logm + 2)
+                rou_idx = (rot_group[:1 << (logm - 1)] % idx_mod) * (self.fft_length // idx_mod)
+                stage_twiddles.append(roots[rou_idx])
+                stage_twiddles_inv.append(roots_inv[rou_idx])
+
+            self._embedding_tables[num_coeffs] = (reversed_bits, stage_twiddles, stage_twiddles_inv)
+        return self._embedding_tables[num_coeffs]
+
+    def embedding_array(self, coeffs):
+        """向量化规范嵌入, 最后一维为槽位维, 其余维度批量处理, 结果与embedding()在浮点误差内一致"""
+        values = np.asarray(coeffs, dtype=np.complex128)
+        num_coeffs = values.shape[-1]
+        assert num_coeffs <= self.fft_length // 4, f"输入向量长度必须小于等于 {self.fft_length // 4}"
+        reversed_bits, stage_twiddles, _ = self.embedding_tables(num_coeffs)
+
+        result = values[..., reversed_bits]
+        lead_shape = result.shape[:-1]
+        for twiddles in stage_twiddles:
+            half = twiddles.shape[-1]
+            blocks = result.reshape(lead_shape + (num_coeffs // (2 * half), 2, half))
+            even = blocks[..., 0, :]
+            omega_factor = blocks[..., 1, :] * twiddles
+            result = np.concatenate((even + omega_factor, even - omega_factor), axis=-1)
+            result = result.reshape(lead_shape + (num_coeffs,))
+
+        return result
+
+    def embedding_inv_array(self, coeffs):
+        """向量化规范嵌入逆变换, 最后一维为槽位维, 结果与embedding_inv()在浮点误差内一致"""
+        values = np.asarray(coeffs, dtype=np.complex128)
+        num_coeffs = values.shape[-1]
+        assert num_coeffs <= self.fft_length // 4, f"输入向量长度必须小于等于 {self.fft_length // 4}"
+        reversed_bits, _, stage_twiddles_inv = self.embedding_tables(num_coeffs)
+
+        result = values
+        lead_shape = result.shape[:-1]
+        for twiddles in reversed(stage_twiddles_inv):
+            half = twiddles.shape[-1]
+            blocks = result.reshape(lead_shape + (num_coeffs // (2 * half), 2, half))
+            even = blocks[..., 0, :]
+            odd = blocks[..., 1, :]
+            result = np.concatenate((even + odd, (even - odd) * twiddles), axis=-1)
+            result = result.reshape(lead_shape + (num_coeffs,))
+
+        return result[..., reversed_bits] / num_coeffs
\ No newline at end of file
@@ -1,7 +1,15 @@
 """完整的数论函数实现"""
 
-import random
-import sympy
+import math
+import numpy as np
+
+# 试除与批量筛选所用的小素数
+SMALL_PRIMES = [p for p in range(2, 2000) if all(p % d for d in range(2, math.isqrt(p) + 1))]
+
+# 确定性Miller-Rabin的固定见证集合: 小于2^64的整数用7个见证, 小于MR_BOUND_81的整数用前13个素数
+MR_BASES_64 = (2, 325, 9375, 28178, 450775, 9780504, 1795265022)
+MR_BASES_81 = tuple(SMALL_PRIMES[:13])
+MR_BOUND_81 = 3317044064679887385961981
 
 def mod_exp(val, exp, modulus):
     """模幂运算"""
@@ -11,45 +19,145 @@ def mod_inv(val, modulus):
     """模逆元"""
     return mod_exp(val, modulus - 2, modulus)
 
+def _pollard_brent(number):
+    """Pollard-Brent算法求合数number的一个非平凡因子, 多项式常数按1, 2, ...依次尝试"""
+    if number % 2 == 0:
+        return 2
+    for c in range(1, number):
+        y, r, q, g = 2, 1, 1, 1
+        x = ys = y
+        while g == 1:
+            x = y
+            for _ in range(r):
+                y = (y * y + c) % number
+            k = 0
+            while k < r and g == 1:
+                ys = y
+                for _ in range(min(128, r - k)):
+                    y = (y * y + c) % number
+                    q = q * abs(x - y) % number
+                g = math.gcd(q, number)
+                k += 128
+            r *= 2
+        if g == number:
+            g = 1
+            while g == 1:
+                ys = (ys * ys + c) % number
+                g = math.gcd(abs(x - ys), number)
+        if g != number:
+            return g
+    return number
+
+def prime_factors(number):
+    """number的全部素因子(升序, 不含重数)"""
+    factors = set()
+    for p in SMALL_PRIMES:
+        if number % p == 0:
+            factors.add(p)
+            while number % p == 0:
+                number //= p
+
+    stack = [number] if number > 1 else []
+    while stack:
+        value = stack.pop()
+        if is_prime(value):
+            factors.add(value)
+        else:
+            divisor = _pollard_brent(value)
+            stack.extend([divisor, value // divisor])
+    return sorted(factors)
+
 def find_generator(modulus):
-    """寻找生成元"""
-    return sympy.ntheory.primitive_root(modulus)
+    """寻找素数模数的最小原根: g^((p-1)/f) != 1 对p-1的每个素因子f成立"""
+    if modulus == 2:
+        return 1
+    factors = prime_factors(modulus - 1)
+    for generator in range(2, modulus):
+        if all(pow(generator, (modulus - 1) // f, modulus) != 1 for f in factors):
+            return generator
+    return None
 
 def root_of_unity(order, modulus):
-    """寻找单位根"""
+    """寻找单位根
+
+    对 x = 2, 3, ... 计算 y = x^((p-1)/order), 当 y^(order/f) != 1 对order的每个素因子f成立时
+    y恰为order阶单位根。order = 2N时只需检查 y^N == p-1, 无需分解p-1。
+    """
     if ((modulus - 1) % order) != 0:
         raise ValueError(f'必须满足 order | m-1, 其中 m={modulus}, q={order} 不满足条件')
 
-    generator = find_generator(modulus)
-    if generator is None:
-        raise ValueError(f'在模 {modulus} 下没有原根')
-
-    result = mod_exp(generator, (modulus - 1)//order, modulus)
+    cofactor = (modulus - 1) // order
+    order_factors = prime_factors(order)
+    for base in range(2, modulus):
+        result = pow(base, cofactor, modulus)
+        if all(pow(result, order // f, modulus) != 1 for f in order_factors):
+            return result
 
-    if result == 1:
-        return root_of_unity(order, modulus)
+    raise ValueError(f'在模 {modulus} 下没有{order}阶单位根')
 
-    return result
+def _strong_probable_prime(number, base, exp, shift):
+    """以base为底的强可能素数测试, number - 1 = exp * 2^shift"""
+    power = pow(base, exp, number)
+    if power in (1, number - 1):
+        return True
+    for _ in range(shift - 1):
+        power = power * power % number
+        if power == number - 1:
+            return True
+    return False
 
 def is_prime(number, num_trials=200):
-    """素数测试"""
+    """确定性素数测试
+
+    先做小素数试除; 小于2^64与小于MR_BOUND_81的整数使用固定见证集合, 结果确定无误;
+    更大的整数以前num_trials个小素数为底做Miller-Rabin测试。
+    """
     if number < 2:
         return False
-    if number != 2 and number % 2 == 0:
-        return False
+    for p in SMALL_PRIMES:
+        if number % p == 0:
+            return number == p
+    if number < SMALL_PRIMES[-1] ** 2:
+        return True
+
+    if number < 1 << 64:
+        bases = MR_BASES_64
+    elif number < MR_BOUND_81:
+        bases = MR_BASES_81
+    else:
+        bases = SMALL_PRIMES[:num_trials]
 
-    exp = number - 1
+    exp, shift = number - 1, 0
     while exp % 2 == 0:
         exp //= 2
+        shift += 1
+    return all(_strong_probable_prime(number, base % number, exp, shift)
+               for base in bases if base % number)
+
+def generate_ntt_primes(count, start, mod, limit=None, window=4096):
+    """批量生成模mod余1的素数
+
+    按 start, start + mod, start + 2*mod, ... 的顺序返回前count个素数(limit给出时只取小于limit的素数)。
+    每批window个候选先用小素数筛去倍数, 仅对剩余候选做Miller-Rabin测试。
+    """
+    primes = []
+    base = start
+    while len(primes) < count and (limit is None or base < limit):
+        candidates = np.ones(window, dtype=bool)
+        if base > SMALL_PRIMES[-1]:
+            for p in SMALL_PRIMES:
+                if mod % p:
+                    # base + k*mod ≡ 0 (mod p) 的k构成模p的一个剩余类
+                    candidates[(-base * pow(mod, -1, p)) % p::p] = False
+
+        for k in np.flatnonzero(candidates):
+            candidate = base + int(k) * mod
+            if limit is not None and candidate >= limit:
+                break
+            if is_prime(candidate):
+                primes.append(candidate)
+                if len(primes) == count:
+                    break
+        base += window * mod
 
-    for _ in range(num_trials):
-        rand_val = int(random.SystemRandom().randrange(1, number))
-        new_exp = exp
-        power = pow(rand_val, new_exp, number)
-        while new_exp != number - 1 and power != 1 and power != number - 1:
-            power = (power * power) % number
-            new_exp *= 2
-        if power != number - 1 and new_exp % 2 == 0:
-            return False
-
-    return True
\ No newline at end of file
+    return primes
\ No newline at end of file
@@ -1,4 +1,6 @@
+import numpy as np
 from mathematics.ntt import NTTContext,FFTContext
+from mathematics import galois
 
 
 class Polynomial:
@@ -37,11 +39,10 @@ class Polynomial:
             return self.multiply_crt(poly, crt)
 
         if ntt:
-            a = ntt.ftt_fwd(self.coeffs)
-            b = ntt.ftt_fwd(poly.coeffs)
-            ab = [a[i] * b[i] for i in range(self.ring_degree)]
-            prod = ntt.ftt_inv(ab)
-            return Polynomial(self.ring_degree, prod)
+            a = ntt.ftt_fwd_array(self.coeffs)
+            b = ntt.ftt_fwd_array(poly.coeffs)
+            prod = ntt.ftt_inv_array((a * b) % ntt.modulus)
+            return Polynomial(self.ring_degree, prod.tolist())
 
         return self.multiply_naive(poly, coeff_modulus)
 
@@ -49,20 +50,15 @@ class Polynomial:
         """CRT多项式乘法"""
         assert isinstance(poly, Polynomial)
 
-        poly_prods = []
+        # 对所有素数同时执行NTT
+        a = crt.ftt_fwd_array(crt.crt_poly(self.coeffs))
+        b = crt.ftt_fwd_array(crt.crt_poly(poly.coeffs))
+        poly_prods = crt.ftt_inv_array((a * b) % crt.moduli)
 
-        # 对每个素数执行NTT
-        for i in range(len(crt.primes)):
-            prod = self.multiply(poly, crt.primes[i], ntt=crt.ntts[i])
-            poly_prods.append(prod)
+        # 使用CRT组合结果, 直接得到中心化系数
+        final_coeffs = crt.reconstruct_poly(poly_prods, centered=True)
 
-        # 使用CRT组合结果
-        final_coeffs = [0] * self.ring_degree
-        for i in range(self.ring_degree):
-            values = [p.coeffs[i] for p in poly_prods]
-            final_coeffs[i] = crt.reconstruct(values)
-
-        return Polynomial(self.ring_degree, final_coeffs).mod_small(crt.modulus)
+        return Polynomial(self.ring_degree, final_coeffs)
 
     def multiply_fft(self, poly, round=True):
         """FFT多项式乘法"""
@@ -122,25 +118,26 @@ class Polynomial:
             new_coeffs = [(c // scalar) for c in self.coeffs]
         return Polynomial(self.ring_degree, new_coeffs)
 
+    def multiply_monomial(self, power):
+        """乘以单项式 x^power (0 <= power < N), 即负循环移位"""
+        shift = self.ring_degree - power
+        new_coeffs = [-c for c in self.coeffs[shift:]] + self.coeffs[:shift]
+        return Polynomial(self.ring_degree, new_coeffs)
+
+    def automorphism(self, galois_elt):
+        """自同构 x -> x^galois_elt, 按缓存的置换表一次完成下标收集与变号"""
+        source, negate = galois.coeff_table(self.ring_degree, galois_elt)
+        new_coeffs = np.array(self.coeffs, dtype=object)[source]
+        new_coeffs[negate] = -new_coeffs[negate]
+        return Polynomial(self.ring_degree, new_coeffs.tolist())
+
     def rotate(self, r):
         """多项式旋转"""
-        k = 5 ** r
-        new_coeffs = [0] * self.ring_degree
-        for i in range(self.ring_degree):
-            index = (i * k) % (2 * self.ring_degree)
-            if index < self.ring_degree:
-                new_coeffs[index] = self.coeffs[i]
-            else:
-                new_coeffs[index - self.ring_degree] = -self.coeffs[i]
-        return Polynomial(self.ring_degree, new_coeffs)
+        return self.automorphism(galois.rotation_element(r, self.ring_degree))
 
     def conjugate(self):
         """多项式共轭"""
-        new_coeffs = [0] * self.ring_degree
-        new_coeffs[0] = self.coeffs[0]
-        for i in range(1, self.ring_degree):
-            new_coeffs[i] = -self.coeffs[self.ring_degree - i]
-        return Polynomial(self.ring_degree, new_coeffs)
+        return self.automorphism(galois.conjugation_element(self.ring_degree))
 
     def round(self):
         """系数舍入"""
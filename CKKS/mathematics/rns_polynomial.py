@@ -0,0 +1,170 @@
+"""RNS(双CRT)多项式表示"""
+
+import operator
+import numpy as np
+from mathematics.polynomial import Polynomial
+from mathematics import galois
+
+
+class RNSPolynomial:
+    """按素数存储剩余的多项式
+
+    residues为 素数数 × N 的数组, 表示模crt.modulus的中心化整数多项式;
+    ntt_form为True时剩余处于NTT(求值)域, 乘法为逐点乘积。
+    bound为系数绝对值上界, 用于保证运算结果不超出CRT模数;
+    bound为None时按模crt.modulus的剩余类运算, 不做上界检查(模数链中的密文)。
+    """
+
+    def __init__(self, degree, residues, crt, ntt_form=False, bound=None):
+        assert residues.shape == (len(crt.primes), degree), \
+            f'剩余数组形状{residues.shape}与CRT上下文不匹配'
+        self.ring_degree = degree
+        self.residues = residues
+        self.crt = crt
+        self.ntt_form = ntt_form
+        self.bound = bound
+
+    @staticmethod
+    def from_polynomial(poly, crt, ntt_form=False, bound=None):
+        """由系数多项式构造RNS表示"""
+        rns_poly = RNSPolynomial(poly.ring_degree, crt.crt_poly(poly.coeffs), crt, bound=bound)
+        return rns_poly.to_ntt() if ntt_form else rns_poly
+
+    def to_ntt(self):
+        """转换到NTT域"""
+        if self.ntt_form:
+            return self
+        return RNSPolynomial(self.ring_degree, self.crt.ftt_fwd_array(self.residues), self.crt,
+                             ntt_form=True, bound=self.bound)
+
+    def from_ntt(self):
+        """转换回系数域"""
+        if not self.ntt_form:
+            return self
+        return RNSPolynomial(self.ring_degree, self.crt.ftt_inv_array(self.residues), self.crt,
+                             ntt_form=False, bound=self.bound)
+
+    def to_polynomial(self, coeff_modulus=None):
+        """CRT重构为系数多项式, 可选地再约化到coeff_modulus"""
+        coeffs = self.crt.reconstruct_poly(self.from_ntt().residues, centered=True)
+        poly = Polynomial(self.ring_degree, coeffs)
+        if coeff_modulus:
+            poly = poly.mod_small(coeff_modulus)
+        return poly
+
+    def _check_bound(self, bound):
+        """检查系数上界是否仍可由CRT模数唯一恢复, 超出时抛出OverflowError"""
+        if bound is None:
+            return None
+        if 2 * bound >= self.crt.modulus:
+            raise OverflowError('RNS多项式系数上界超出CRT模数, 请先转换回系数表示')
+        return bound
+
+    def _bound_of(self, op, poly):
+        """两个操作数上界的组合, 任一方为模运算语义时结果亦然"""
+        if self.bound is None or poly.bound is None:
+            return None
+        return op(self.bound, poly.bound)
+
+    def _matching(self, poly):
+        """将poly转换为与自身相同的域"""
+        assert isinstance(poly, RNSPolynomial) and poly.crt is self.crt, 'RNS多项式的CRT上下文不一致'
+        return poly.to_ntt() if self.ntt_form else poly.from_ntt()
+
+    def add(self, poly):
+        """逐素数加法"""
+        poly = self._matching(poly)
+        residues = (self.residues + poly.residues) % self.crt.moduli
+        return RNSPolynomial(self.ring_degree, residues, self.crt, self.ntt_form,
+                             self._check_bound(self._bound_of(operator.add, poly)))
+
+    def subtract(self, poly):
+        """逐素数减法"""
+        poly = self._matching(poly)
+        residues = (self.residues + self.crt.moduli - poly.residues) % self.crt.moduli
+        return RNSPolynomial(self.ring_degree, residues, self.crt, self.ntt_form,
+                             self._check_bound(self._bound_of(operator.add, poly)))
+
+    def multiply(self, poly):
+        """NTT域逐点乘法, 结果保持在NTT域"""
+        a = self.to_ntt()
+        b = a._matching(poly)
+        residues = (a.residues * b.residues) % self.crt.moduli
+        return RNSPolynomial(self.ring_degree, residues, self.crt, True,
+                             self._check_bound(self._bound_of(lambda b1, b2: self.ring_degree * b1 * b2, poly)))
+
+    @staticmethod
+    def tensor(a0, a1, b0, b1):
+        """密文张量积 (a0 + a1*s)(b0 + b1*s) 的三个分量, 结果处于NTT域
+
+        每个输入只变换一次; 中间项按Karatsuba以一次乘积得到: (a0 + a1)(b0 + b1) - a0*b0 - a1*b1。
+        """
+        a0, a1, b0, b1 = [poly.to_ntt() for poly in (a0, a1, b0, b1)]
+        degree, crt = a0.ring_degree, a0.crt
+        assert all(poly.crt is crt for poly in (a1, b0, b1)), 'RNS多项式的CRT上下文不一致'
+        moduli = crt.moduli
+
+        r0 = (a0.residues * b0.residues) % moduli
+        r2 = (a1.residues * b1.residues) % moduli
+        r1 = ((a0.residues + a1.residues) % moduli) * ((b0.residues + b1.residues) % moduli) % moduli
+        r1 = (r1 + 2 * moduli - r0 - r2) % moduli
+
+        def product_bound(poly1, poly2):
+            if poly1.bound is None or poly2.bound is None:
+                return None
+            return degree * poly1.bound * poly2.bound
+
+        bound0, bound2 = product_bound(a0, b0), product_bound(a1, b1)
+        cross = (product_bound(a0, b1), product_bound(a1, b0))
+        bound1 = None if None in cross else sum(cross)
+        return tuple(RNSPolynomial(degree, residues, crt, True, a0._check_bound(bound))
+                     for residues, bound in ((r0, bound0), (r1, bound1), (r2, bound2)))
+
+    @staticmethod
+    def square(a0, a1):
+        """密文平方 (a0 + a1*s)^2 的三个分量 a0^2, 2*a0*a1, a1^2, 结果处于NTT域, 每个输入只变换一次"""
+        a0, a1 = a0.to_ntt(), a1.to_ntt()
+        cross = a0.multiply(a1)
+        return a0.multiply(a0), cross.add(cross), a1.multiply(a1)
+
+    def scalar_multiply(self, scalar):
+        """标量乘法"""
+        scalar_residues = self.crt.crt_poly([scalar])
+        residues = (self.residues * scalar_residues) % self.crt.moduli
+        return RNSPolynomial(self.ring_degree, residues, self.crt, self.ntt_form,
+                             self._check_bound(None if self.bound is None else self.bound * abs(scalar)))
+
+    def multiply_monomial(self, power):
+        """乘以单项式 x^power (0 <= power < N): 系数域为负循环移位, NTT域为逐点乘以 psi^((2k+1)*power)"""
+        degree = self.ring_degree
+        moduli = self.crt.moduli
+        if self.ntt_form:
+            exponent = (2 * np.arange(degree, dtype=np.int64) + 1) * power % (2 * degree)
+            factors = self.crt.fwd_scale[:, exponent % degree]
+            factors = np.where(exponent >= degree, (moduli - factors) % moduli, factors)
+            residues = (self.residues * factors) % moduli
+        else:
+            shift = degree - power
+            residues = np.concatenate([(moduli - self.residues[:, shift:]) % moduli, self.residues[:, :shift]],
+                                      axis=1)
+        return RNSPolynomial(degree, residues, self.crt, self.ntt_form, self.bound)
+
+    def automorphism(self, galois_elt):
+        """自同构 x -> x^galois_elt: NTT域为求值点置换, 结果不离开NTT域; 系数域逐素数整体置换并变号"""
+        degree = self.ring_degree
+        if self.ntt_form:
+            return RNSPolynomial(degree, self.residues[:, galois.ntt_permutation(degree, galois_elt)], self.crt,
+                                 ntt_form=True, bound=self.bound)
+
+        source, negate = galois.coeff_table(degree, galois_elt)
+        residues = self.residues[:, source]
+        new_residues = np.where(negate, (self.crt.moduli - residues) % self.crt.moduli, residues)
+        return RNSPolynomial(degree, new_residues, self.crt, bound=self.bound)
+
+    def rotate(self, r):
+        """多项式旋转, 与Polynomial.rotate一致"""
+        return self.automorphism(galois.rotation_element(r, self.ring_degree))
+
+    def conjugate(self):
+        """多项式共轭, 与Polynomial.conjugate一致"""
+        return self.automorphism(galois.conjugation_element(self.ring_degree))
\ No newline at end of file
@@ -1,9 +1,11 @@
 """完整的算术运算实现"""
 
 import math
+import numpy as np
 from primitives.ciphertext import Ciphertext
-from primitives.plaintext import Plaintext
+from primitives.plaintext import Plaintext, PreparedPlaintext
 from mathematics.polynomial import Polynomial
+from mathematics.rns_polynomial import RNSPolynomial
 
 
 class ArithmeticOperations:
@@ -13,89 +15,435 @@ class ArithmeticOperations:
         self.params = params
         self.crt_context = crt_context
         self.big_modulus = params.big_modulus
+        self.modulus_chain = params.modulus_chain
+
+    def is_rns(self, ciph):
+        """密文是否为RNS表示"""
+        return isinstance(ciph.c0, RNSPolynomial)
+
+    def to_rns(self, ciph, ntt_form=True):
+        """将密文转换为RNS表示, 之后的加减、明文乘法与张量积直接在剩余上进行"""
+        if self.is_rns(ciph):
+            return ciph
+
+        if self.modulus_chain:
+            # 模数链上的密文按模Q_l的剩余类表示, 无需追踪系数上界
+            crt, bound = self.modulus_chain.context_for_modulus(ciph.modulus), None
+        else:
+            crt, bound = self.crt_context, ciph.modulus // 2 + 1
+        c0, c1, c2 = [None if poly is None else RNSPolynomial.from_polynomial(poly, crt, ntt_form, bound)
+                      for poly in (ciph.c0, ciph.c1, ciph.c2)]
+        return Ciphertext(c0, c1, ciph.scaling_factor, ciph.modulus, c2)
+
+    def from_rns(self, ciph):
+        """将RNS密文重构为模ciph.modulus的系数表示"""
+        if not self.is_rns(ciph):
+            return ciph
+
+        c0, c1, c2 = [None if poly is None else poly.to_polynomial(ciph.modulus)
+                      for poly in (ciph.c0, ciph.c1, ciph.c2)]
+        return Ciphertext(c0, c1, ciph.scaling_factor, ciph.modulus, c2)
+
+    def crt_for(self, bound1, bound2):
+        """按两操作数系数上界选取最小的CRT前缀上下文, 低层密文只需较少的素数"""
+        if self.crt_context is None:
+            return None
+        return self.crt_context.context_for_product(bound1, bound2)
+
+    def _plain_to_rns(self, plain, crt, ntt_form):
+        """明文多项式在密文所用CRT上下文下的RNS表示"""
+        if isinstance(plain, PreparedPlaintext):
+            poly = self._prepared_residues(plain, crt)
+            return poly if ntt_form else poly.from_ntt()
+
+        bound = None if self.modulus_chain else max(abs(c) for c in plain.poly.coeffs)
+        return RNSPolynomial.from_polynomial(plain.poly, crt, ntt_form, bound)
+
+    def _prepared_residues(self, plain, crt):
+        """预处理明文在crt下的NTT域剩余: crt的素数须为明文上下文的前缀, 直接截取对应行而不做变换"""
+        poly = plain.poly
+        if poly.crt is crt:
+            return poly
+        num_primes = len(crt.primes)
+        assert tuple(poly.crt.primes[:num_primes]) == tuple(crt.primes), \
+            '预处理明文的CRT上下文不包含密文所需的素数, 请在更高层预处理'
+        return RNSPolynomial(poly.ring_degree, poly.residues[:num_primes], crt, True, poly.bound)
+
+    def _combine_c2(self, ciph1, ciph2, subtract=False):
+        """三分量密文c2的加(减)法, 缺少c2的一方视为0"""
+        c2, other = ciph1.c2, ciph2.c2
+        if other is None:
+            return c2
+
+        if isinstance(other, RNSPolynomial):
+            if subtract:
+                other = other.scalar_multiply(-1)
+            return other if c2 is None else c2.add(other)
+
+        if subtract:
+            other = other.scalar_multiply(-1, ciph1.modulus)
+        c2 = other if c2 is None else c2.add(other, ciph1.modulus)
+        return c2.mod_small(ciph1.modulus)
 
     def add(self, ciph1, ciph2):
-        """同态加法"""
+        """同态加法, 支持未重线性化的三分量密文"""
         modulus = ciph1.modulus
 
+        if self.is_rns(ciph1) or self.is_rns(ciph2):
+            ciph1, ciph2 = self.to_rns(ciph1), self.to_rns(ciph2)
+            return Ciphertext(ciph1.c0.add(ciph2.c0), ciph1.c1.add(ciph2.c1),
+                              ciph1.scaling_factor, modulus, self._combine_c2(ciph1, ciph2))
+
         c0 = ciph1.c0.add(ciph2.c0, modulus)
         c0 = c0.mod_small(modulus)
         c1 = ciph1.c1.add(ciph2.c1, modulus)
         c1 = c1.mod_small(modulus)
 
-        return Ciphertext(c0, c1, ciph1.scaling_factor, modulus)
+        return Ciphertext(c0, c1, ciph1.scaling_factor, modulus, self._combine_c2(ciph1, ciph2))
 
     def add_plain(self, ciph, plain):
         """密文与明文加法"""
-        c0 = ciph.c0.add(plain.poly, ciph.modulus)
+        if self.is_rns(ciph):
+            c0 = ciph.c0.add(self._plain_to_rns(plain, ciph.c0.crt, ciph.c0.ntt_form))
+            return Ciphertext(c0, ciph.c1, ciph.scaling_factor, ciph.modulus, ciph.c2)
+
+        poly = plain.poly.to_polynomial() if isinstance(plain, PreparedPlaintext) else plain.poly
+        c0 = ciph.c0.add(poly, ciph.modulus)
         c0 = c0.mod_small(ciph.modulus)
-        return Ciphertext(c0, ciph.c1, ciph.scaling_factor, ciph.modulus)
+        return Ciphertext(c0, ciph.c1, ciph.scaling_factor, ciph.modulus, ciph.c2)
+
+    def _constant_coeffs(self, const, scaling_factor):
+        """复常数c在所有槽位上的编码为 round(Re(c)*Δ) + round(Im(c)*Δ) * x^(N/2), 返回两个整数系数"""
+        const = complex(const)
+        return round(const.real * scaling_factor), round(const.imag * scaling_factor)
+
+    def add_const(self, ciph, const):
+        """密文所有槽位加上实数或复数常数, 只修改c0的常数项与x^(N/2)项, O(N)"""
+        real, imag = self._constant_coeffs(const, ciph.scaling_factor)
+        half_degree = self.params.poly_degree // 2
+
+        if self.is_rns(ciph):
+            c0 = ciph.c0
+            ones = np.zeros_like(c0.residues)
+            if c0.ntt_form:
+                ones[:] = 1
+            else:
+                ones[:, 0] = 1
+            bound = None if c0.bound is None else max(abs(real), abs(imag))
+            ones = RNSPolynomial(c0.ring_degree, ones, c0.crt, c0.ntt_form, bound)
+            constant = ones.scalar_multiply(real).add(ones.multiply_monomial(half_degree).scalar_multiply(imag))
+            return Ciphertext(c0.add(constant), ciph.c1, ciph.scaling_factor, ciph.modulus, ciph.c2)
+
+        coeffs = list(ciph.c0.coeffs)
+        coeffs[0] += real
+        coeffs[half_degree] += imag
+        c0 = Polynomial(self.params.poly_degree, coeffs).mod_small(ciph.modulus)
+        return Ciphertext(c0, ciph.c1, ciph.scaling_factor, ciph.modulus, ciph.c2)
+
+    def multiply_const(self, ciph, const, scaling_factor=None):
+        """密文所有槽位乘以实数或复数常数, 以系数缩放与x^(N/2)负循环移位代替多项式乘法, O(N)
+
+        常数按scaling_factor(默认为参数缩放因子)量化, 结果缩放因子为两者之积, 之后通常需要重缩放。
+        """
+        if scaling_factor is None:
+            scaling_factor = self.params.scaling_factor
+        real, imag = self._constant_coeffs(const, scaling_factor)
+        half_degree = self.params.poly_degree // 2
+
+        def scale(poly):
+            if poly is None:
+                return None
+            if isinstance(poly, RNSPolynomial):
+                result = poly.scalar_multiply(real)
+                if imag:
+                    result = result.add(poly.multiply_monomial(half_degree).scalar_multiply(imag))
+                return result
+
+            result = poly.scalar_multiply(real, ciph.modulus)
+            if imag:
+                result = result.add(poly.multiply_monomial(half_degree).scalar_multiply(imag, ciph.modulus),
+                                    ciph.modulus)
+            return result.mod_small(ciph.modulus)
+
+        return Ciphertext(scale(ciph.c0), scale(ciph.c1), ciph.scaling_factor * scaling_factor, ciph.modulus,
+                          scale(ciph.c2))
 
     def subtract(self, ciph1, ciph2):
-        """同态减法"""
+        """同态减法, 支持未重线性化的三分量密文"""
         modulus = ciph1.modulus
 
+        if self.is_rns(ciph1) or self.is_rns(ciph2):
+            ciph1, ciph2 = self.to_rns(ciph1), self.to_rns(ciph2)
+            return Ciphertext(ciph1.c0.subtract(ciph2.c0), ciph1.c1.subtract(ciph2.c1),
+                              ciph1.scaling_factor, modulus, self._combine_c2(ciph1, ciph2, subtract=True))
+
         c0 = ciph1.c0.subtract(ciph2.c0, modulus)
         c0 = c0.mod_small(modulus)
         c1 = ciph1.c1.subtract(ciph2.c1, modulus)
         c1 = c1.mod_small(modulus)
 
-        return Ciphertext(c0, c1, ciph1.scaling_factor, modulus)
+        return Ciphertext(c0, c1, ciph1.scaling_factor, modulus, self._combine_c2(ciph1, ciph2, subtract=True))
 
     def multiply(self, ciph1, ciph2, relin_key):
         """同态乘法"""
+        return self.relinearize_ciphertext(self.multiply_no_relin(ciph1, ciph2), relin_key)
+
+    def square(self, ciph, relin_key):
+        """同态平方"""
+        return self.relinearize_ciphertext(self.multiply_no_relin(ciph, ciph), relin_key)
+
+    def multiply_no_relin(self, ciph1, ciph2):
+        """不做重线性化的同态乘法, 返回三分量密文
+
+        多个乘积求和时先以add累加三分量密文, 最后调用一次relinearize_ciphertext,
+        只需一次密钥交换。两个操作数为同一密文时走平方路径。
+        """
+        assert ciph1.c2 is None and ciph2.c2 is None, '三分量密文需先重线性化才能相乘'
+        squaring = ciph1 is ciph2
         modulus = ciph1.modulus
+        new_scaling_factor = ciph1.scaling_factor * ciph2.scaling_factor
+        if self.modulus_chain:
+            ciph1, ciph2 = self.to_rns(ciph1), self.to_rns(ciph2)
+
+        c0, c1, c2 = self.tensor_square(ciph1) if squaring else self.tensor(ciph1, ciph2)
+        return Ciphertext(c0, c1, new_scaling_factor, modulus, c2)
+
+    def relinearize_ciphertext(self, ciph, relin_key):
+        """对三分量密文重线性化, 两分量密文原样返回"""
+        if ciph.c2 is None:
+            return ciph
 
-        c0 = ciph1.c0.multiply(ciph2.c0, modulus, crt=self.crt_context)
+        c0, c1, c2, modulus = ciph.c0, ciph.c1, ciph.c2, ciph.modulus
+        if isinstance(c0, RNSPolynomial) and not self.modulus_chain:
+            # 重线性化需要除以big_modulus, 仅在此处重构一次
+            ciph = self.relinearize(relin_key, c0.to_polynomial(modulus), c1.to_polynomial(modulus),
+                                    c2.to_polynomial(modulus), ciph.scaling_factor, modulus)
+            return self.to_rns(ciph)
+
+        return self.relinearize(relin_key, c0, c1, c2, ciph.scaling_factor, modulus)
+
+    def tensor(self, ciph1, ciph2):
+        """张量积, 返回未重线性化的(c0, c1, c2)
+
+        每个输入分量只做一次NTT, 中间项按Karatsuba只需一次乘积与一次逆NTT。
+        """
+        modulus = ciph1.modulus
+
+        if self.is_rns(ciph1) or self.is_rns(ciph2):
+            ciph1, ciph2 = self.to_rns(ciph1), self.to_rns(ciph2)
+            return RNSPolynomial.tensor(ciph1.c0, ciph1.c1, ciph2.c0, ciph2.c1)
+
+        crt = self.crt_for(ciph1.modulus, ciph2.modulus)
+        if crt:
+            inputs = [RNSPolynomial.from_polynomial(poly, crt, ntt_form=True)
+                      for poly in (ciph1.c0, ciph1.c1, ciph2.c0, ciph2.c1)]
+            return tuple(poly.to_polynomial(modulus) for poly in RNSPolynomial.tensor(*inputs))
+
+        c0 = ciph1.c0.multiply(ciph2.c0, modulus, crt=crt)
         c0 = c0.mod_small(modulus)
 
-        c1 = ciph1.c0.multiply(ciph2.c1, modulus, crt=self.crt_context)
-        temp = ciph1.c1.multiply(ciph2.c0, modulus, crt=self.crt_context)
+        c1 = ciph1.c0.multiply(ciph2.c1, modulus, crt=crt)
+        temp = ciph1.c1.multiply(ciph2.c0, modulus, crt=crt)
         c1 = c1.add(temp, modulus)
         c1 = c1.mod_small(modulus)
 
-        c2 = ciph1.c1.multiply(ciph2.c1, modulus, crt=self.crt_context)
+        c2 = ciph1.c1.multiply(ciph2.c1, modulus, crt=crt)
         c2 = c2.mod_small(modulus)
 
-        return self.relinearize(relin_key, c0, c1, c2,
-                                ciph1.scaling_factor * ciph2.scaling_factor, modulus)
+        return c0, c1, c2
+
+    def tensor_square(self, ciph):
+        """密文与自身的张量积, 利用c0*c1的对称性只需两次前向NTT与三次乘积"""
+        modulus = ciph.modulus
+
+        if self.is_rns(ciph):
+            return RNSPolynomial.square(ciph.c0, ciph.c1)
+
+        crt = self.crt_for(modulus, modulus)
+        if crt:
+            inputs = [RNSPolynomial.from_polynomial(poly, crt, ntt_form=True) for poly in (ciph.c0, ciph.c1)]
+            return tuple(poly.to_polynomial(modulus) for poly in RNSPolynomial.square(*inputs))
+
+        return self.tensor(ciph, ciph)
 
     def multiply_plain(self, ciph, plain):
         """密文与明文乘法"""
-        c0 = ciph.c0.multiply(plain.poly, ciph.modulus, crt=self.crt_context)
+        if self.is_rns(ciph):
+            plain_rns = self._plain_to_rns(plain, ciph.c0.crt, ntt_form=True)
+            c2 = None if ciph.c2 is None else ciph.c2.multiply(plain_rns)
+            return Ciphertext(ciph.c0.multiply(plain_rns), ciph.c1.multiply(plain_rns),
+                              ciph.scaling_factor * plain.scaling_factor, ciph.modulus, c2)
+
+        if isinstance(plain, PreparedPlaintext):
+            if self.modulus_chain:
+                return self.from_rns(self.multiply_plain(self.to_rns(ciph), plain))
+
+            # 只变换密文分量, 明文剩余直接截取到乘积所需的前缀上下文
+            crt = self.crt_for(ciph.modulus, plain.poly.bound)
+            plain_rns = self._prepared_residues(plain, crt)
+            c0, c1, c2 = [None if poly is None else
+                          RNSPolynomial.from_polynomial(poly, crt, True).multiply(plain_rns).to_polynomial(ciph.modulus)
+                          for poly in (ciph.c0, ciph.c1, ciph.c2)]
+            return Ciphertext(c0, c1, ciph.scaling_factor * plain.scaling_factor, ciph.modulus, c2)
+
+        crt = self.crt_for(ciph.modulus, max(abs(c) for c in plain.poly.coeffs))
+        c0 = ciph.c0.multiply(plain.poly, ciph.modulus, crt=crt)
         c0 = c0.mod_small(ciph.modulus)
 
-        c1 = ciph.c1.multiply(plain.poly, ciph.modulus, crt=self.crt_context)
+        c1 = ciph.c1.multiply(plain.poly, ciph.modulus, crt=crt)
         c1 = c1.mod_small(ciph.modulus)
 
-        return Ciphertext(c0, c1, ciph.scaling_factor * plain.scaling_factor, ciph.modulus)
+        c2 = None
+        if ciph.c2 is not None:
+            c2 = ciph.c2.multiply(plain.poly, ciph.modulus, crt=crt)
+            c2 = c2.mod_small(ciph.modulus)
+
+        return Ciphertext(c0, c1, ciph.scaling_factor * plain.scaling_factor, ciph.modulus, c2)
 
     def relinearize(self, relin_key, c0, c1, c2, new_scaling_factor, modulus):
         """重线性化"""
-        new_c0 = relin_key.p0.multiply(c2, modulus * self.big_modulus, crt=self.crt_context)
-        new_c0 = new_c0.mod_small(modulus * self.big_modulus)
-        new_c0 = new_c0.scalar_integer_divide(self.big_modulus)
+        if isinstance(c2, RNSPolynomial):
+            # 模数链: 基扩展到Q_l*P后与密钥相乘, 再以基转换除以P
+            d0, d1 = self.modulus_chain.key_switch(c2, relin_key)
+            return Ciphertext(c0.add(d0), c1.add(d1), new_scaling_factor, modulus)
+
+        # 交换密钥系数位于[0, swk_modulus)
+        crt = self.crt_for(self.params.swk_modulus, modulus)
+        switch_modulus = modulus * self.big_modulus
+        if isinstance(relin_key.p0, RNSPolynomial):
+            # 密钥库中的NTT域密钥: 只变换c2
+            from operations.rotation import RotationOperations
+            c2_ntt = RNSPolynomial.from_polynomial(c2, crt, ntt_form=True)
+            prods = [c2_ntt.multiply(key_ntt).to_polynomial()
+                     for key_ntt in RotationOperations._key_ntt(relin_key, crt)]
+        else:
+            prods = [key_poly.multiply(c2, switch_modulus, crt=crt) for key_poly in (relin_key.p0, relin_key.p1)]
+
+        new_c0, new_c1 = [prod.mod_small(switch_modulus).scalar_integer_divide(self.big_modulus) for prod in prods]
         new_c0 = new_c0.add(c0, modulus)
         new_c0 = new_c0.mod_small(modulus)
-
-        new_c1 = relin_key.p1.multiply(c2, modulus * self.big_modulus, crt=self.crt_context)
-        new_c1 = new_c1.mod_small(modulus * self.big_modulus)
-        new_c1 = new_c1.scalar_integer_divide(self.big_modulus)
         new_c1 = new_c1.add(c1, modulus)
         new_c1 = new_c1.mod_small(modulus)
 
         return Ciphertext(new_c0, new_c1, new_scaling_factor, modulus)
 
     def rescale(self, ciph, division_factor):
-        """重缩放"""
+        """重缩放
+
+        模数链模式下除以最高层素数q_l, division_factor须为q_l本身或名义上的缩放因子, 否则报错。
+        """
+        assert ciph.c2 is None, '三分量密文需先重线性化才能重缩放'
+        if self.modulus_chain:
+            if self._chain_drop_count(ciph, division_factor) != 1:
+                raise ValueError(f'模数链模式下重缩放只能除以最高层素数或缩放因子, 不支持除以{division_factor}')
+            return self._drop_primes(ciph, 1, rescale=True)
+
+        if self.is_rns(ciph):
+            return self.to_rns(self.rescale(self.from_rns(ciph), division_factor),
+                               ciph.c0.ntt_form)
+
         c0 = ciph.c0.scalar_integer_divide(division_factor)
         c1 = ciph.c1.scalar_integer_divide(division_factor)
         return Ciphertext(c0, c1, ciph.scaling_factor // division_factor,
                           ciph.modulus // division_factor)
 
     def lower_modulus(self, ciph, division_factor):
-        """降低模数"""
+        """降低模数
+
+        模数链模式下丢弃最高层的k个素数, division_factor须为这k个素数的乘积或缩放因子的k次幂, 否则报错。
+        """
+        assert ciph.c2 is None, '三分量密文需先重线性化才能降低模数'
+        if self.modulus_chain:
+            num_primes = self._chain_drop_count(ciph, division_factor)
+            return self._drop_primes(ciph, num_primes, rescale=False) if num_primes else ciph
+
+        if self.is_rns(ciph):
+            return self.to_rns(self.lower_modulus(self.from_rns(ciph), division_factor),
+                               ciph.c0.ntt_form)
+
         new_modulus = ciph.modulus // division_factor
         c0 = ciph.c0.mod_small(new_modulus)
         c1 = ciph.c1.mod_small(new_modulus)
-        return Ciphertext(c0, c1, ciph.scaling_factor, new_modulus)
\ No newline at end of file
+        return Ciphertext(c0, c1, ciph.scaling_factor, new_modulus)
+
+    def compact(self, ciph, precision, max_value):
+        """传输前将结果密文降到满足输出精度的最小模数
+
+        precision为槽位上要求的绝对精度位数, max_value为槽位取值绝对值的上界, 须由调用方给出:
+        超出该上界的槽位会在降低后的模数下回绕, 解密结果错误且不报错。
+        先把缩放因子重缩放到不小于 2^precision 倍舍入误差上界的最小值, 新增误差不超过2^-precision;
+        再降低模数, 只保留容纳 max_value * 缩放因子 的位数并多留一位余量。
+        模数链模式下重缩放与降模数均以整个素数为单位; 结果为系数表示, 以便按模数位宽序列化。
+        """
+        from utils.noise_estimator import NoiseEstimator
+        assert ciph.c2 is None, '三分量密文需先重线性化才能压缩'
+        # 模数链的重缩放四舍五入, 大整数模式的重缩放向下取整
+        rescale_noise = NoiseEstimator(self.params).estimate_rescale_noise(rounded=self.modulus_chain is not None)
+        target_scale = 2 ** precision * rescale_noise
+
+        def required_modulus(scaling_factor):
+            return 4 * max_value * scaling_factor
+
+        if self.modulus_chain:
+            chain = self.modulus_chain
+            level = chain.level_of(ciph.modulus)
+            while level > 0:
+                top_prime = chain.level_context(level).primes[-1]
+                if ciph.scaling_factor / top_prime >= target_scale:
+                    ciph = self.rescale(ciph, top_prime)
+                elif chain.level_context(level - 1).modulus > required_modulus(ciph.scaling_factor):
+                    ciph = self.lower_modulus(ciph, top_prime)
+                else:
+                    break
+                level -= 1
+            return self.from_rns(ciph)
+
+        # 大整数模式: 缩放因子与模数按2的幂整除
+        division_factor = 1 << max(0, math.floor(math.log2(ciph.scaling_factor / target_scale)))
+        while ciph.modulus % division_factor:
+            division_factor >>= 1
+        if division_factor > 1:
+            ciph = self.rescale(ciph, division_factor)
+
+        new_modulus = 1 << math.ceil(math.log2(required_modulus(ciph.scaling_factor)))
+        if new_modulus < ciph.modulus and ciph.modulus % new_modulus == 0:
+            ciph = self.lower_modulus(ciph, ciph.modulus // new_modulus)
+        return self.from_rns(ciph)
+
+    def _chain_drop_count(self, ciph, division_factor):
+        """模数链上除以division_factor对应丢弃的最高层素数个数
+
+        division_factor须恰为最高层k个素数的乘积, 或名义上的缩放因子的k次幂(链上素数均约等于缩放因子);
+        其余因子无法以整个素数为单位实现, 报错而不是近似。
+        """
+        if division_factor == 1:
+            return 0
+        chain = self.modulus_chain
+        level = chain.level_of(ciph.modulus)
+        primes = chain.level_context(level).primes
+        product = 1
+        for num_primes in range(1, level + 1):
+            product *= primes[-num_primes]
+            if division_factor in (product, self.params.scaling_factor ** num_primes):
+                return num_primes
+        raise ValueError(f'模数链模式下不能除以{division_factor}: 须为最高层素数的乘积或缩放因子的幂'
+                         f'(当前第{level}层)')
+
+    def _drop_primes(self, ciph, num_primes, rescale):
+        """模数链上丢弃最高的num_primes个素数, rescale为True时同时除以被丢弃的素数
+
+        输入为系数表示时结果也重构回系数表示。
+        """
+        chain = self.modulus_chain
+        rns_ciph = self.to_rns(ciph, ntt_form=False)
+        top_prime = rns_ciph.c0.crt.primes[-1]
+
+        if rescale:
+            c0, c1 = chain.rescale(rns_ciph.c0), chain.rescale(rns_ciph.c1)
+            scaling_factor = ciph.scaling_factor // top_prime
+        else:
+            c0, c1 = chain.drop(rns_ciph.c0, num_primes), chain.drop(rns_ciph.c1, num_primes)
+            scaling_factor = ciph.scaling_factor
+
+        result = Ciphertext(c0, c1, scaling_factor, c0.crt.modulus)
+        return result if self.is_rns(ciph) else self.from_rns(result)
\ No newline at end of file
@@ -16,8 +16,18 @@ class BootstrappingOperations:
         self.big_modulus = params.big_modulus
         self.scaling_factor = params.scaling_factor
 
+    def _check_supported(self):
+        """自举只支持大整数模式
+
+        提升后的模数big_modulus不在模数链上, 且模数链的交换密钥只覆盖 Q*P (P为特殊素数之积),
+        不能用于大整数模式下模 big_modulus 的密钥交换。
+        """
+        if self.params.modulus_chain:
+            raise ValueError('模数链模式不支持自举, 请使用modulus_chain=False的参数')
+
     def bootstrap(self, ciph, rot_keys, conj_key, relin_key, encoder):
-        """完整自举流程"""
+        """完整自举流程, 仅支持大整数模式"""
+        self._check_supported()
         # 保存原始状态
         old_modulus = ciph.modulus
         old_scaling_factor = self.scaling_factor
@@ -40,10 +50,9 @@ class BootstrappingOperations:
         ciph_sin1 = self.subtract(ciph_exp1, ciph_neg_exp1)
 
         # 缩放答案
-        plain_const = self.create_complex_constant_plain(
-            old_modulus / self.scaling_factor * 0.25 / math.pi / 1j, encoder)
-        ciph0 = self.multiply_plain(ciph_sin0, plain_const)
-        ciph1 = self.multiply_plain(ciph_sin1, plain_const)
+        const_scale = old_modulus / self.scaling_factor * 0.25 / math.pi / 1j
+        ciph0 = self.multiply_const(ciph_sin0, const_scale)
+        ciph1 = self.multiply_const(ciph_sin1, const_scale)
         ciph0 = self.rescale(ciph0, self.scaling_factor)
         ciph1 = self.rescale(ciph1, self.scaling_factor)
 
@@ -62,24 +71,22 @@ class BootstrappingOperations:
         return ciph
 
     def coeff_to_slot(self, ciph, rot_keys, conj_key, encoder):
-        """系数到槽位转换"""
-        s1 = self.multiply_matrix(ciph, self.boot_context.encoding_mat_conj_transpose0,
-                                  rot_keys, encoder)
-        s2 = self.conjugate(ciph, conj_key)
-        s2 = self.multiply_matrix(s2, self.boot_context.encoding_mat_transpose0, rot_keys,
-                                  encoder)
-        ciph0 = self.add(s1, s2)
-        constant = self.create_constant_plain(1 / self.params.poly_degree)
-        ciph0 = self.multiply_plain(ciph0, constant)
+        """系数到槽位转换, 两部分共享同一密文及其共轭的小步旋转"""
+        s1_0, s1_1 = self.multiply_matrices(ciph, [self.boot_context.encoding_mat_conj_transpose0,
+                                                   self.boot_context.encoding_mat_conj_transpose1],
+                                            rot_keys, encoder)
+        ciph_conj = self.conjugate(ciph, conj_key)
+        s2_0, s2_1 = self.multiply_matrices(ciph_conj, [self.boot_context.encoding_mat_transpose0,
+                                                        self.boot_context.encoding_mat_transpose1],
+                                            rot_keys, encoder)
+
+        ciph0 = self.add(s1_0, s2_0)
+        constant = 1 / self.params.poly_degree
+        ciph0 = self.multiply_const(ciph0, constant)
         ciph0 = self.rescale(ciph0, self.scaling_factor)
 
-        s1 = self.multiply_matrix(ciph, self.boot_context.encoding_mat_conj_transpose1,
-                                  rot_keys, encoder)
-        s2 = self.conjugate(ciph, conj_key)
-        s2 = self.multiply_matrix(s2, self.boot_context.encoding_mat_transpose1, rot_keys,
-                                  encoder)
-        ciph1 = self.add(s1, s2)
-        ciph1 = self.multiply_plain(ciph1, constant)
+        ciph1 = self.add(s1_1, s2_1)
+        ciph1 = self.multiply_const(ciph1, constant)
         ciph1 = self.rescale(ciph1, self.scaling_factor)
 
         return ciph0, ciph1
@@ -95,24 +102,18 @@ class BootstrappingOperations:
 
     def exp_taylor(self, ciph, relin_key, encoder):
         """泰勒指数函数"""
-        ciph2 = self.multiply(ciph, ciph, relin_key)
+        ciph2 = self.square(ciph, relin_key)
         ciph2 = self.rescale(ciph2, self.scaling_factor)
 
-        ciph4 = self.multiply(ciph2, ciph2, relin_key)
+        ciph4 = self.square(ciph2, relin_key)
         ciph4 = self.rescale(ciph4, self.scaling_factor)
 
-        const = self.create_constant_plain(1)
-        ciph01 = self.add_plain(ciph, const)
-
-        const = self.create_constant_plain(1)
-        ciph01 = self.multiply_plain(ciph01, const)
+        ciph01 = self.add_const(ciph, 1)
+        ciph01 = self.multiply_const(ciph01, 1)
         ciph01 = self.rescale(ciph01, self.scaling_factor)
 
-        const = self.create_constant_plain(3)
-        ciph23 = self.add_plain(ciph, const)
-
-        const = self.create_constant_plain(1 / 6)
-        ciph23 = self.multiply_plain(ciph23, const)
+        ciph23 = self.add_const(ciph, 3)
+        ciph23 = self.multiply_const(ciph23, 1 / 6)
         ciph23 = self.rescale(ciph23, self.scaling_factor)
 
         ciph23 = self.multiply(ciph23, ciph2, relin_key)
@@ -120,18 +121,12 @@ class BootstrappingOperations:
         ciph01 = self.lower_modulus(ciph01, self.scaling_factor)
         ciph23 = self.add(ciph23, ciph01)
 
-        const = self.create_constant_plain(5)
-        ciph45 = self.add_plain(ciph, const)
-
-        const = self.create_constant_plain(1 / 120)
-        ciph45 = self.multiply_plain(ciph45, const)
+        ciph45 = self.add_const(ciph, 5)
+        ciph45 = self.multiply_const(ciph45, 1 / 120)
         ciph45 = self.rescale(ciph45, self.scaling_factor)
 
-        const = self.create_constant_plain(7)
-        ciph = self.add_plain(ciph, const)
-
-        const = self.create_constant_plain(1 / 5040)
-        ciph = self.multiply_plain(ciph, const)
+        ciph = self.add_const(ciph, 7)
+        ciph = self.multiply_const(ciph, 1 / 5040)
         ciph = self.rescale(ciph, self.scaling_factor)
 
         ciph = self.multiply(ciph, ciph2, relin_key)
@@ -150,6 +145,7 @@ class BootstrappingOperations:
 
     def raise_modulus(self, ciph):
         """提升模数"""
+        self._check_supported()
         self.scaling_factor = ciph.modulus
         ciph.scaling_factor = self.scaling_factor
         ciph.modulus = self.big_modulus
@@ -157,13 +153,12 @@ class BootstrappingOperations:
     def exp(self, ciph, const, relin_key, encoder):
         """指数函数"""
         num_iterations = self.boot_context.num_taylor_iterations
-        const_plain = self.create_complex_constant_plain(const / 2 ** num_iterations, encoder)
-        ciph = self.multiply_plain(ciph, const_plain)
+        ciph = self.multiply_const(ciph, const / 2 ** num_iterations)
         ciph = self.rescale(ciph, self.scaling_factor)
         ciph = self.exp_taylor(ciph, relin_key, encoder)
 
         for _ in range(num_iterations):
-            ciph = self.multiply(ciph, ciph, relin_key)
+            ciph = self.square(ciph, relin_key)
             ciph = self.rescale(ciph, self.scaling_factor)
 
         return ciph
@@ -200,11 +195,26 @@ class BootstrappingOperations:
         arithmetic = ArithmeticOperations(self.params, self.crt_context)
         return arithmetic.multiply(ciph1, ciph2, relin_key)
 
+    def square(self, ciph, relin_key):
+        from operations.arithmetic import ArithmeticOperations
+        arithmetic = ArithmeticOperations(self.params, self.crt_context)
+        return arithmetic.square(ciph, relin_key)
+
     def multiply_plain(self, ciph, plain):
         from operations.arithmetic import ArithmeticOperations
         arithmetic = ArithmeticOperations(self.params, self.crt_context)
         return arithmetic.multiply_plain(ciph, plain)
 
+    def multiply_const(self, ciph, const):
+        from operations.arithmetic import ArithmeticOperations
+        arithmetic = ArithmeticOperations(self.params, self.crt_context)
+        return arithmetic.multiply_const(ciph, const, self.scaling_factor)
+
+    def add_const(self, ciph, const):
+        from operations.arithmetic import ArithmeticOperations
+        arithmetic = ArithmeticOperations(self.params, self.crt_context)
+        return arithmetic.add_const(ciph, const)
+
     def rescale(self, ciph, division_factor):
         from operations.arithmetic import ArithmeticOperations
         arithmetic = ArithmeticOperations(self.params, self.crt_context)
@@ -223,4 +233,9 @@ class BootstrappingOperations:
     def multiply_matrix(self, ciph, matrix, rot_keys, encoder):
         from operations.matrix_ops import MatrixOperations
         matrix_ops = MatrixOperations(self.params, self.crt_context)
-        return matrix_ops.multiply_matrix(ciph, matrix, rot_keys, encoder)
\ No newline at end of file
+        return matrix_ops.multiply_matrix(ciph, matrix, rot_keys, encoder)
+
+    def multiply_matrices(self, ciph, matrices, rot_keys, encoder):
+        from operations.matrix_ops import MatrixOperations
+        matrix_ops = MatrixOperations(self.params, self.crt_context)
+        return matrix_ops.multiply_matrices(ciph, matrices, rot_keys, encoder)
\ No newline at end of file
@@ -1,9 +1,11 @@
 """完整的矩阵运算实现"""
 
 from math import log, sqrt
+import numpy as np
 from primitives.ciphertext import Ciphertext
-from primitives.plaintext import Plaintext
+from primitives.plaintext import Plaintext, PreparedPlaintext
 from mathematics.polynomial import Polynomial
+from mathematics.rns_polynomial import RNSPolynomial
 
 
 class MatrixOperations:
@@ -20,60 +22,154 @@ class MatrixOperations:
         diag_plain = encoder.encode(diag, self.scaling_factor)
         ciph_prod = self._multiply_plain(ciph, diag_plain)
 
-        for j in range(1, len(matrix)):
-            diag = self.diagonal(matrix, j)
+        diags = {j: self.diagonal(matrix, j) for j in range(1, len(matrix))}
+        diags = {j: diag for j, diag in diags.items() if any(diag)}
+        rots = self._rotate_many(ciph, list(diags), rot_keys)
+        for j, diag in diags.items():
             diag_plain = encoder.encode(diag, self.scaling_factor)
-            rot = self._rotate(ciph, j, rot_keys[j])
-            ciph_temp = self._multiply_plain(rot, diag_plain)
+            ciph_temp = self._multiply_plain(rots[j], diag_plain)
             ciph_prod = self._add(ciph_prod, ciph_temp)
 
         return ciph_prod
 
     def multiply_matrix(self, ciph, matrix, rot_keys, encoder):
         """快速矩阵乘法"""
-        matrix_len = len(matrix)
-        matrix_len_factor1 = int(sqrt(matrix_len))
-        if matrix_len != matrix_len_factor1 * matrix_len_factor1:
-            matrix_len_factor1 = int(sqrt(2 * matrix_len))
-        matrix_len_factor2 = matrix_len // matrix_len_factor1
-
-        ciph_rots = [0] * matrix_len_factor1
-        ciph_rots[0] = ciph
-        for i in range(1, matrix_len_factor1):
-            ciph_rots[i] = self._rotate(ciph, i, rot_keys[i])
-
+        return self.multiply_matrices(ciph, [matrix], rot_keys, encoder)[0]
+
+    def multiply_matrices(self, ciph, matrices, rot_keys, encoder):
+        """同一密文与多个同阶矩阵的快速乘法
+
+        各矩阵所需的小步旋转合并后以提升旋转一次完成; 全零对角线与旋转量为0的大步旋转被跳过,
+        rot_keys中缺少的旋转量由RotationOperations按 ±2^k 密钥组合完成。
+        """
+        matrix_len = len(matrices[0])
+        matrix_len_factor1, _ = self.baby_giant_steps(matrix_len)
+        diagonals = [self.encoded_diagonals(matrix, ciph.modulus, encoder) for matrix in matrices]
+
+        baby_steps = sorted({index % matrix_len_factor1 for diagonal_plains in diagonals for index in diagonal_plains})
+        ciph_rots = self._rotate_many(ciph, baby_steps, rot_keys)
+
+        return [self._baby_giant_sum(ciph, ciph_rots, diagonal_plains, matrix_len, rot_keys, encoder)
+                for diagonal_plains in diagonals]
+
+    def encoded_diagonals(self, matrix, modulus, encoder):
+        """快速矩阵乘法所用的编码对角线, 按下标索引且只含非零对角线, 已按所在大步预旋转
+
+        有CRT上下文时为模数modulus所在层的NTT域预处理明文。参数配置了对角线缓存时
+        按(矩阵指纹, 小步数, 缩放因子, 层的素数)缓存, 同一矩阵的重复乘法不再提取与编码对角线。
+        """
+        matrix_len_factor1, matrix_len_factor2 = self.baby_giant_steps(len(matrix))
+        chain = self.params.modulus_chain
+        crt = chain.context_for_modulus(modulus) if chain else self.crt_context
+
+        def generate():
+            """编码对角线, 有CRT上下文时再转换为NTT域剩余, 返回(元数据, 数组)"""
+            indices, coeffs = self.encode_diagonals(matrix, matrix_len_factor1 * matrix_len_factor2,
+                                                    matrix_len_factor1, encoder)
+            if crt is None:
+                return {'indices': indices}, coeffs
+            plains = [Plaintext(Polynomial(len(row), row), self.scaling_factor) for row in coeffs.tolist()]
+            prepared = encoder.prepare_many(plains, modulus) if plains else []
+            residues = np.stack([plain.poly.residues for plain in prepared]) if prepared else \
+                np.zeros((0, len(crt.primes), 2 * len(matrix)), dtype=crt.dtype)
+            # 大素数的剩余为对象数组, 素数小于2^64时以uint64保存, 以便写入磁盘缓存
+            if residues.dtype == object and max(crt.primes) < 1 << 64:
+                residues = residues.astype(np.uint64)
+            return {'indices': indices, 'bounds': [plain.poly.bound for plain in prepared]}, residues
+
+        def restore(meta, data):
+            """由generate的结果构造按下标索引的明文字典, data可为只读内存映射"""
+            if crt is None:
+                plains = [Plaintext(Polynomial(len(row), row), self.scaling_factor) for row in data.tolist()]
+            else:
+                plains = [PreparedPlaintext(RNSPolynomial(data.shape[2], residues.astype(crt.dtype, copy=False),
+                                                          crt, True, bound),
+                                            self.scaling_factor)
+                          for residues, bound in zip(data, meta['bounds'])]
+            return dict(zip(meta['indices'], plains))
+
+        cache = self.params.diagonal_cache
+        if cache is None:
+            return restore(*generate())
+        key = (cache.fingerprint(matrix), matrix_len_factor1, self.scaling_factor)
+        return cache.diagonals(key, tuple(crt.primes) if crt else None, generate, restore)
+
+    def encode_diagonals(self, matrix, num_diagonals, matrix_len_factor1, encoder):
+        """批量编码前num_diagonals条对角线中的非零者, 第index条预先旋转 -(index - index % 小步数)
+
+        返回(非零对角线下标, 整数系数矩阵), 系数可放入int64时矩阵为int64类型。
+        """
+        mat = np.asarray(matrix, dtype=np.complex128)
+        matrix_len = len(mat)
+        index = np.arange(num_diagonals)[:, None]
+        shift = index - index % matrix_len_factor1
+        column = np.arange(matrix_len)[None, :]
+        diagonals = mat[(column - shift) % matrix_len, (index + column - shift) % matrix_len]
+
+        indices = np.flatnonzero(np.any(diagonals != 0, axis=1)).tolist()
+        if not indices:
+            return indices, np.zeros((0, 2 * matrix_len), dtype=np.int64)
+
+        rows = [plain.poly.coeffs for plain in encoder.encode_many(diagonals[indices], self.scaling_factor)]
+        try:
+            coeffs = np.array(rows, dtype=np.int64)
+        except OverflowError:
+            coeffs = np.array(rows, dtype=object)
+        return indices, coeffs
+
+    def _baby_giant_sum(self, ciph, ciph_rots, diagonal_plains, matrix_len, rot_keys, encoder):
+        """由小步旋转结果累加 sum_j rot(sum_i diag'_(j,i) * rot(ciph, i), shift_j)"""
+        matrix_len_factor1, matrix_len_factor2 = self.baby_giant_steps(matrix_len)
         outer_sum = None
-        for j in range(matrix_len_factor2):
+        for shift in range(0, matrix_len_factor1 * matrix_len_factor2, matrix_len_factor1):
             inner_sum = None
-            shift = matrix_len_factor1 * j
             for i in range(matrix_len_factor1):
-                diagonal = self.diagonal(matrix, shift + i)
-                diagonal = self.rotate_vector(diagonal, -shift)
-                diagonal_plain = encoder.encode(diagonal, self.scaling_factor)
+                diagonal_plain = diagonal_plains.get(shift + i)
+                if diagonal_plain is None:
+                    continue
                 dot_prod = self._multiply_plain(ciph_rots[i], diagonal_plain)
                 if inner_sum:
                     inner_sum = self._add(inner_sum, dot_prod)
                 else:
                     inner_sum = dot_prod
 
-            rotated_sum = self._rotate(inner_sum, shift, rot_keys[shift])
+            if inner_sum is None:
+                continue
+            rotated_sum = self._rotate(inner_sum, shift, rot_keys) if shift else inner_sum
             if outer_sum:
                 outer_sum = self._add(outer_sum, rotated_sum)
             else:
                 outer_sum = rotated_sum
 
+        if outer_sum is None:
+            # 零矩阵
+            zero_plain = encoder.encode([0] * matrix_len, self.scaling_factor)
+            outer_sum = self._multiply_plain(ciph, zero_plain)
+
         outer_sum = self._rescale(outer_sum, self.scaling_factor)
         return outer_sum
 
-    def diagonal(self, mat, diag_index):
+    @staticmethod
+    def baby_giant_steps(matrix_len):
+        """小步大步矩阵乘法的分解 matrix_len = 小步数 * 大步数"""
+        matrix_len_factor1 = int(sqrt(matrix_len))
+        if matrix_len != matrix_len_factor1 * matrix_len_factor1:
+            matrix_len_factor1 = int(sqrt(2 * matrix_len))
+        matrix_len_factor2 = matrix_len // matrix_len_factor1
+        return matrix_len_factor1, matrix_len_factor2
+
+    @staticmethod
+    def diagonal(mat, diag_index):
         """获取矩阵对角线"""
         return [mat[j % len(mat)][(diag_index + j) % len(mat)] for j in range(len(mat))]
 
-    def rotate_vector(self, vec, rotation):
+    @staticmethod
+    def rotate_vector(vec, rotation):
         """旋转向量"""
         return [vec[(j + rotation) % len(vec)] for j in range(len(vec))]
 
-    def conjugate_matrix(self, matrix):
+    @staticmethod
+    def conjugate_matrix(matrix):
         """矩阵共轭"""
         conj_matrix = [[0] * len(matrix[i]) for i in range(len(matrix))]
         for i, row in enumerate(matrix):
@@ -81,7 +177,8 @@ class MatrixOperations:
                 conj_matrix[i][j] = matrix[i][j].conjugate()
         return conj_matrix
 
-    def transpose_matrix(self, matrix):
+    @staticmethod
+    def transpose_matrix(matrix):
         """矩阵转置"""
         transpose = [[0] * len(matrix) for _ in range(len(matrix[0]))]
         for i, row in enumerate(matrix):
@@ -91,42 +188,25 @@ class MatrixOperations:
 
     def _multiply_plain(self, ciph, plain):
         """密文明文乘法"""
-        c0 = ciph.c0.multiply(plain.poly, ciph.modulus, crt=self.crt_context)
-        c0 = c0.mod_small(ciph.modulus)
-        c1 = ciph.c1.multiply(plain.poly, ciph.modulus, crt=self.crt_context)
-        c1 = c1.mod_small(ciph.modulus)
-        return Ciphertext(c0, c1, ciph.scaling_factor * plain.scaling_factor, ciph.modulus)
+        from operations.arithmetic import ArithmeticOperations
+        return ArithmeticOperations(self.params, self.crt_context).multiply_plain(ciph, plain)
 
     def _add(self, ciph1, ciph2):
         """密文加法"""
-        c0 = ciph1.c0.add(ciph2.c0, ciph1.modulus).mod_small(ciph1.modulus)
-        c1 = ciph1.c1.add(ciph2.c1, ciph1.modulus).mod_small(ciph1.modulus)
-        return Ciphertext(c0, c1, ciph1.scaling_factor, ciph1.modulus)
-
-    def _rotate(self, ciph, rotation, rot_key):
-        """密文旋转"""
-        rot_ciph0 = ciph.c0.rotate(rotation)
-        rot_ciph1 = ciph.c1.rotate(rotation)
-        rot_ciph = Ciphertext(rot_ciph0, rot_ciph1, ciph.scaling_factor, ciph.modulus)
-        return self._switch_key(rot_ciph, rot_key.key)
-
-    def _switch_key(self, ciph, key):
-        """密钥交换"""
-        c0 = key.p0.multiply(ciph.c1, ciph.modulus * self.params.big_modulus, crt=self.crt_context)
-        c0 = c0.mod_small(ciph.modulus * self.params.big_modulus)
-        c0 = c0.scalar_integer_divide(self.params.big_modulus)
-        c0 = c0.add(ciph.c0, ciph.modulus).mod_small(ciph.modulus)
-
-        c1 = key.p1.multiply(ciph.c1, ciph.modulus * self.params.big_modulus, crt=self.crt_context)
-        c1 = c1.mod_small(ciph.modulus * self.params.big_modulus)
-        c1 = c1.scalar_integer_divide(self.params.big_modulus)
-        c1 = c1.mod_small(ciph.modulus)
-
-        return Ciphertext(c0, c1, ciph.scaling_factor, ciph.modulus)
+        from operations.arithmetic import ArithmeticOperations
+        return ArithmeticOperations(self.params, self.crt_context).add(ciph1, ciph2)
+
+    def _rotate(self, ciph, rotation, rot_keys):
+        """密文旋转, 旋转密钥从rot_keys中选取或组合"""
+        from operations.rotation import RotationOperations
+        return RotationOperations(self.params, self.crt_context).rotate_with_keys(ciph, rotation, rot_keys)
+
+    def _rotate_many(self, ciph, rotations, rot_keys):
+        """提升旋转, 返回按旋转量索引的密文字典"""
+        from operations.rotation import RotationOperations
+        return RotationOperations(self.params, self.crt_context).rotate_many(ciph, rotations, rot_keys)
 
     def _rescale(self, ciph, division_factor):
         """重缩放"""
-        c0 = ciph.c0.scalar_integer_divide(division_factor)
-        c1 = ciph.c1.scalar_integer_divide(division_factor)
-        return Ciphertext(c0, c1, ciph.scaling_factor // division_factor,
-                          ciph.modulus // division_factor)
\ No newline at end of file
+        from operations.arithmetic import ArithmeticOperations
+        return ArithmeticOperations(self.params, self.crt_context).rescale(ciph, division_factor)
\ No newline at end of file
@@ -1,7 +1,13 @@
 """完整的旋转操作实现"""
 
+import weakref
 from primitives.ciphertext import Ciphertext
 from mathematics.polynomial import Polynomial
+from mathematics.rns_polynomial import RNSPolynomial
+from operations.rotation_planner import naf_rotation_steps
+
+# 交换密钥的NTT域表示缓存: 密钥 -> {CRT上下文: [p0, p1]}
+_key_ntt_cache = weakref.WeakKeyDictionary()
 
 
 class RotationOperations:
@@ -11,16 +17,83 @@ class RotationOperations:
         self.params = params
         self.crt_context = crt_context
         self.big_modulus = params.big_modulus
+        self.modulus_chain = params.modulus_chain
+
+    def _to_chain(self, ciph):
+        """模数链模式下转换为RNS密文"""
+        from operations.arithmetic import ArithmeticOperations
+        return ArithmeticOperations(self.params, self.crt_context).to_rns(ciph, ntt_form=False)
+
+    def _restore_rns(self, ciph, result):
+        """大整数模式下RNS密文的运算结果(系数表示)转换回与输入相同的RNS表示"""
+        if self.modulus_chain or not isinstance(ciph.c0, RNSPolynomial) or isinstance(result.c0, RNSPolynomial):
+            return result
+        from operations.arithmetic import ArithmeticOperations
+        return ArithmeticOperations(self.params, self.crt_context).to_rns(result, ciph.c0.ntt_form)
 
     def rotate(self, ciph, rotation, rot_key):
         """同态旋转"""
+        assert ciph.c2 is None, '三分量密文需先重线性化才能旋转或共轭'
+        if self.modulus_chain:
+            ciph = self._to_chain(ciph)
         rot_ciph0 = ciph.c0.rotate(rotation)
         rot_ciph1 = ciph.c1.rotate(rotation)
         rot_ciph = Ciphertext(rot_ciph0, rot_ciph1, ciph.scaling_factor, ciph.modulus)
-        return self.switch_key(rot_ciph, rot_key.key)
+        return self._restore_rns(ciph, self.switch_key(rot_ciph, rot_key.key))
+
+    def _direct_rotation(self, rotation, rot_keys):
+        """rot_keys中可直接用于旋转rotation的密钥旋转量, 没有时返回None"""
+        if rotation in rot_keys:
+            return rotation
+        rotation %= self.params.poly_degree // 2
+        return rotation if rotation in rot_keys else None
+
+    def rotate_with_keys(self, ciph, rotation, rot_keys):
+        """使用密钥字典旋转: 有对应密钥时直接旋转, 否则按NAF分解为多次 ±2^k 旋转"""
+        key_rotation = self._direct_rotation(rotation, rot_keys)
+        if key_rotation is not None:
+            return self.rotate(ciph, key_rotation, rot_keys[key_rotation])
+
+        for step in naf_rotation_steps(rotation, self.params.poly_degree // 2):
+            assert step in rot_keys, f'缺少旋转量{step}的旋转密钥, 无法组合旋转{rotation}'
+            ciph = self.rotate(ciph, step, rot_keys[step])
+        return ciph
+
+    def rotate_many(self, ciph, rotations, rot_keys):
+        """提升(hoisted)旋转: 同一密文的多个旋转共享c1的模数提升与NTT
+
+        每个旋转只需一次NTT域置换与两次密钥乘积; rot_keys中没有直接密钥的旋转量
+        退回rotate_with_keys。返回按旋转量索引的密文字典, 旋转量为0时即原密文。
+        """
+        assert ciph.c2 is None, '三分量密文需先重线性化才能旋转或共轭'
+        if self.modulus_chain:
+            ciph = self._to_chain(ciph)
+
+        num_slots = self.params.poly_degree // 2
+        hoisted = None
+        rot_ciphs = {}
+        for rotation in rotations:
+            key_rotation = self._direct_rotation(rotation, rot_keys)
+            if rotation % num_slots == 0:
+                rot_ciphs[rotation] = ciph
+            elif key_rotation is None:
+                rot_ciphs[rotation] = self.rotate_with_keys(ciph, rotation, rot_keys)
+            else:
+                if hoisted is None:
+                    hoisted = self.hoist(ciph)
+                rot_ciphs[rotation] = self._restore_rns(ciph, self.switch_key_hoisted(
+                    ciph, ciph.c0.rotate(key_rotation), hoisted.rotate(key_rotation), rot_keys[key_rotation].key))
+        return rot_ciphs
 
     def conjugate(self, ciph, conj_key):
         """同态共轭"""
+        assert ciph.c2 is None, '三分量密文需先重线性化才能旋转或共轭'
+        if self.modulus_chain:
+            ciph = self._to_chain(ciph)
+        if isinstance(ciph.c0, RNSPolynomial):
+            conj_ciph = Ciphertext(ciph.c0.conjugate(), ciph.c1.conjugate(), ciph.scaling_factor, ciph.modulus)
+            return self._restore_rns(ciph, self.switch_key(conj_ciph, conj_key))
+
         conj_ciph0 = ciph.c0.conjugate().mod_small(ciph.modulus)
         conj_ciph1 = ciph.c1.conjugate().mod_small(ciph.modulus)
         conj_ciph = Ciphertext(conj_ciph0, conj_ciph1, ciph.scaling_factor, ciph.modulus)
@@ -28,15 +101,65 @@ class RotationOperations:
 
     def switch_key(self, ciph, key):
         """密钥交换"""
-        c0 = key.p0.multiply(ciph.c1, ciph.modulus * self.big_modulus, crt=self.crt_context)
-        c0 = c0.mod_small(ciph.modulus * self.big_modulus)
-        c0 = c0.scalar_integer_divide(self.big_modulus)
-        c0 = c0.add(ciph.c0, ciph.modulus)
-        c0 = c0.mod_small(ciph.modulus)
+        return self.switch_key_hoisted(ciph, ciph.c0, self.hoist(ciph), key)
+
+    def hoist(self, ciph):
+        """密钥交换中与密钥无关的部分: c1的模数提升与NTT, 结果可在自同构后供多次密钥交换共享
+
+        模数链模式下为扩展到 Q_l * P 的NTT域RNS多项式; 大整数模式下为足以容纳
+        c1与交换密钥乘积的CRT上下文中的NTT域RNS多项式(RNS密文的c1先重构为模q的中心化系数);
+        未配置CRT时为c1本身。
+        """
+        if self.modulus_chain:
+            return self.modulus_chain.mod_up(ciph.c1).to_ntt()
+
+        c1 = ciph.c1.to_polynomial(ciph.modulus) if isinstance(ciph.c1, RNSPolynomial) else ciph.c1
+        if self.crt_context is None:
+            return c1
+
+        # 交换密钥系数位于[0, swk_modulus), 按当前密文模数选取最小的CRT上下文
+        crt = self.crt_context.context_for_product(self.params.swk_modulus, ciph.modulus)
+        return RNSPolynomial.from_polynomial(c1, crt, ntt_form=True)
+
+    @staticmethod
+    def _key_ntt(key, crt):
+        """交换密钥在crt下的NTT域表示, 按密钥与CRT上下文缓存
+
+        密钥库中的密钥已是完整CRT上下文下的NTT域剩余, 直接截取crt对应的前缀行; 剩余为映射页面上的
+        uint64视图而crt的剩余为对象类型时, 每次只转换这些前缀行, 不缓存转换结果。
+        """
+        if isinstance(key.p0, RNSPolynomial):
+            num_primes = len(crt.primes)
+            assert tuple(key.p0.crt.primes[:num_primes]) == tuple(crt.primes), \
+                '交换密钥的CRT上下文不包含密钥交换所需的素数'
+            return [RNSPolynomial(p.ring_degree, p.residues[:num_primes].astype(crt.dtype, copy=False), crt, True)
+                    for p in (key.p0, key.p1)]
+
+        cache = _key_ntt_cache.setdefault(key, {})
+        if crt not in cache:
+            cache[crt] = [RNSPolynomial.from_polynomial(p, crt, ntt_form=True) for p in (key.p0, key.p1)]
+        return cache[crt]
+
+    def switch_key_hoisted(self, ciph, c0, hoisted, key):
+        """以(已做自同构的)c0与提升后的c1完成密钥交换, ciph提供缩放因子与模数
+
+        大整数模式下结果为系数表示。
+        """
+        if self.modulus_chain:
+            d0, d1 = self.modulus_chain.key_switch_extended(hoisted, key)
+            c1 = d1.to_ntt() if c0.ntt_form else d1
+            return Ciphertext(c0.add(d0), c1, ciph.scaling_factor, ciph.modulus)
+
+        if isinstance(c0, RNSPolynomial):
+            c0 = c0.to_polynomial(ciph.modulus)
 
-        c1 = key.p1.multiply(ciph.c1, ciph.modulus * self.big_modulus, crt=self.crt_context)
-        c1 = c1.mod_small(ciph.modulus * self.big_modulus)
-        c1 = c1.scalar_integer_divide(self.big_modulus)
-        c1 = c1.mod_small(ciph.modulus)
+        switch_modulus = ciph.modulus * self.big_modulus
+        if isinstance(hoisted, RNSPolynomial):
+            prods = [hoisted.multiply(key_ntt).to_polynomial() for key_ntt in self._key_ntt(key, hoisted.crt)]
+        else:
+            prods = [key_poly.multiply(hoisted, switch_modulus) for key_poly in (key.p0, key.p1)]
 
+        d0, d1 = [prod.mod_small(switch_modulus).scalar_integer_divide(self.big_modulus) for prod in prods]
+        c0 = d0.add(c0, ciph.modulus).mod_small(ciph.modulus)
+        c1 = d1.mod_small(ciph.modulus)
         return Ciphertext(c0, c1, ciph.scaling_factor, ciph.modulus)
\ No newline at end of file
@@ -0,0 +1,116 @@
+"""旋转密钥规划"""
+
+import math
+from operations.matrix_ops import MatrixOperations
+
+
+def naf_digits(value):
+    """非相邻形式(NAF): 返回使 value = sum(d_k * 2^k) 的非零项 d_k * 2^k 列表, d_k ∈ {-1, 1}"""
+    sign = -1 if value < 0 else 1
+    value = abs(value)
+    terms = []
+    power = 1
+    while value:
+        if value % 2:
+            digit = 2 - value % 4
+            terms.append(sign * digit * power)
+            value -= digit
+        value //= 2
+        power *= 2
+    return terms
+
+
+def naf_rotation_steps(rotation, num_slots):
+    """将旋转量分解为若干 ±2^k 旋转, 返回各步对应的密钥旋转量(模num_slots)
+
+    同时考虑 r 与 r - num_slots 两种表示, 取步数较少者。
+    """
+    rotation %= num_slots
+    if rotation == 0:
+        return []
+    terms = min(naf_digits(rotation), naf_digits(rotation - num_slots), key=len)
+    return [term % num_slots for term in terms]
+
+
+class RotationKeyPlanner:
+    """根据工作负载所需的旋转量规划旋转密钥
+
+    direct策略为每个不同的旋转量生成一个密钥;
+    naf策略只生成 ±2^k 的密钥, 任意旋转按NAF分解为多次 ±2^k 旋转, 以更多的密钥交换换取更少的密钥。
+    """
+
+    STRATEGIES = ('direct', 'naf')
+
+    def __init__(self, params):
+        self.params = params
+        self.num_slots = params.poly_degree // 2
+        self.rotation_counts = {}
+
+    def add_rotation(self, rotation, count=1):
+        """记录一次(或count次)旋转"""
+        rotation %= self.num_slots
+        if rotation:
+            self.rotation_counts[rotation] = self.rotation_counts.get(rotation, 0) + count
+
+    def add_matrix(self, matrix, count=1, naive=False):
+        """记录一次矩阵向量乘法所需的旋转, 与MatrixOperations的小步大步实现一致, 全零对角线不需要旋转"""
+        matrix_len = len(matrix)
+        nonzero = [any(MatrixOperations.diagonal(matrix, index)) for index in range(matrix_len)]
+
+        if naive:
+            for index in range(1, matrix_len):
+                if nonzero[index]:
+                    self.add_rotation(index, count)
+            return
+
+        baby_steps, giant_steps = MatrixOperations.baby_giant_steps(matrix_len)
+        for i in range(1, baby_steps):
+            if any(nonzero[baby_steps * j + i] for j in range(giant_steps)):
+                self.add_rotation(i, count)
+        for j in range(1, giant_steps):
+            if any(nonzero[baby_steps * j: baby_steps * (j + 1)]):
+                self.add_rotation(baby_steps * j, count)
+
+    def add_bootstrapping(self, boot_context):
+        """记录一次自举所需的旋转: 系数到槽位4次、槽位到系数2次编码矩阵乘法"""
+        for matrix in (boot_context.encoding_mat_conj_transpose0, boot_context.encoding_mat_transpose0,
+                       boot_context.encoding_mat_conj_transpose1, boot_context.encoding_mat_transpose1,
+                       boot_context.encoding_mat0, boot_context.encoding_mat1):
+            self.add_matrix(matrix)
+
+    def key_bytes(self):
+        """单个旋转密钥(两个模swk_modulus的多项式)的字节数"""
+        return 2 * self.params.poly_degree * math.ceil(self.params.swk_modulus.bit_length() / 8)
+
+    def plan(self, strategy='direct'):
+        """给出策略所需的密钥旋转量、密钥内存与预期密钥交换次数"""
+        assert strategy in self.STRATEGIES, f'未知的旋转密钥策略: {strategy}'
+        if strategy == 'direct':
+            rotations = set(self.rotation_counts)
+            key_switches = sum(self.rotation_counts.values())
+        else:
+            rotations = set()
+            key_switches = 0
+            for rotation, count in self.rotation_counts.items():
+                steps = naf_rotation_steps(rotation, self.num_slots)
+                rotations.update(steps)
+                key_switches += count * len(steps)
+
+        return {'strategy': strategy, 'rotations': sorted(rotations), 'num_keys': len(rotations),
+                'memory_bytes': len(rotations) * self.key_bytes(), 'key_switches': key_switches}
+
+    def generate_keys(self, key_generator, strategy='direct', num_workers=None, seed=None):
+        """按规划生成旋转密钥字典"""
+        return key_generator.generate_rot_keys(self.plan(strategy)['rotations'],
+                                               num_workers=num_workers, seed=seed)
+
+    def report(self):
+        """打印各策略的密钥数、密钥内存与预期密钥交换次数"""
+        print(f"旋转密钥规划 (N = {self.params.poly_degree}, 不同旋转量: {len(self.rotation_counts)}个, "
+              f"单个密钥: {self.key_bytes() / 2 ** 20:.2f} MB)")
+        print(f"{'策略':>8} {'密钥数':>8} {'密钥内存(MB)':>14} {'密钥交换次数':>12}")
+        plans = [self.plan(strategy) for strategy in self.STRATEGIES]
+        for plan in plans:
+            print(f"{plan['strategy']:>8} {plan['num_keys']:>8} {plan['memory_bytes'] / 2 ** 20:>14.2f} "
+                  f"{plan['key_switches']:>12}")
+        return plans
\ No newline at end of file
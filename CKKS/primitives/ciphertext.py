@@ -1,14 +1,63 @@
 """完整的密文实现"""
 
+from mathematics.polynomial import Polynomial
+from utils.random_sampler import XOFSampler
+
 
 class Ciphertext:
-    """密文"""
+    """密文
+
+    c2不为None时为未重线性化的三分量密文, 解密为 c0 + c1*s + c2*s^2。
+    """
 
-    def __init__(self, c0, c1, scaling_factor=None, modulus=None):
+    def __init__(self, c0, c1, scaling_factor=None, modulus=None, c2=None):
         self.c0 = c0
         self.c1 = c1
         self.scaling_factor = scaling_factor
         self.modulus = modulus
+        self.c2 = c2
 
     def __str__(self):
-        return 'c0: ' + str(self.c0) + '\n + c1: ' + str(self.c1)
\ No newline at end of file
+        result = 'c0: ' + str(self.c0) + '\n + c1: ' + str(self.c1)
+        if self.c2 is not None:
+            result += '\n + c2: ' + str(self.c2)
+        return result
+
+
+class SeededCiphertext(Ciphertext):
+    """种子压缩的对称密文
+
+    c1为由seed经SHAKE-256展开的模modulus均匀多项式, 只保存c0与种子;
+    首次访问c1时重新展开并缓存, 展开结果只取决于种子、多项式度数与模数。
+    """
+
+    def __init__(self, c0, seed, scaling_factor=None, modulus=None):
+        super().__init__(c0, None, scaling_factor, modulus)
+        self.seed = seed
+
+    def __getstate__(self):
+        """序列化时只保留c0与种子, 不写出已展开的c1"""
+        state = self.__dict__.copy()
+        state['_c1'] = None
+        return state
+
+    @staticmethod
+    def expand(seed, degree, modulus):
+        """由种子展开c1, 系数为模modulus的中心化表示"""
+        values = XOFSampler(seed).uniform(degree, modulus)
+        return Polynomial(degree, [int(value) for value in values]).mod_small(modulus)
+
+    @property
+    def c1(self):
+        if self._c1 is None:
+            self._c1 = self.expand(self.seed, self.c0.ring_degree, self.modulus)
+        return self._c1
+
+    @c1.setter
+    def c1(self, c1):
+        self._c1 = c1
+
+    @property
+    def expanded(self):
+        """c1是否已展开"""
+        return self._c1 is not None
\ No newline at end of file
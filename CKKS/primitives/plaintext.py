@@ -9,4 +9,16 @@ class Plaintext:
         self.scaling_factor = scaling_factor
 
     def __str__(self):
-        return str(self.poly)
\ No newline at end of file
+        return str(self.poly)
+
+
+class PreparedPlaintext(Plaintext):
+    """预处理明文
+
+    poly为NTT域的RNSPolynomial, 各素数的剩余已处于求值形式。与密文相乘时只需逐点乘法,
+    密文CRT上下文的素数为其前缀时直接截取对应行, 适合同一明文与大量密文相乘(如固定的模型权重)。
+    """
+
+    def __init__(self, poly, scaling_factor=None):
+        assert poly.ntt_form, '预处理明文必须处于NTT域'
+        super().__init__(poly, scaling_factor)
\ No newline at end of file
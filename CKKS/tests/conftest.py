@@ -0,0 +1,5 @@
+import os
+import sys
+
+# 包内模块以CKKS目录为导入根(与examples一致)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
\ No newline at end of file
@@ -0,0 +1,38 @@
+"""加密器的随机数来源测试"""
+
+import pickle
+import numpy as np
+import pytest
+from core.parameters import CKKSParameters
+from core.key_generator import CKKSKeyGenerator
+from core.encoder import CKKSEncoder
+from core.encryptor import CKKSEncryptor
+from core.decryptor import CKKSDecryptor
+
+
+@pytest.fixture(scope='module')
+def scheme():
+    params = CKKSParameters(poly_degree=64, ciph_modulus=1 << 120, big_modulus=1 << 160, scaling_factor=1 << 30)
+    key_generator = CKKSKeyGenerator(params, seed=0)
+    return params, key_generator, CKKSEncoder(params), CKKSDecryptor(params, key_generator.secret_key)
+
+
+def test_seed_makes_encryption_reproducible(scheme):
+    params, key_generator, encoder, _ = scheme
+    plain = encoder.encode(np.zeros(32), params.scaling_factor)
+    ciphs = [CKKSEncryptor(params, key_generator.public_key, seed=1).encrypt(plain) for _ in range(2)]
+    assert ciphs[0].c0.coeffs == ciphs[1].c0.coeffs
+
+
+@pytest.mark.parametrize('seed', [None, 1])
+def test_pickled_copies_draw_fresh_randomness(scheme, seed):
+    params, key_generator, encoder, decryptor = scheme
+    encryptor = CKKSEncryptor(params, key_generator.public_key, seed=seed)
+    copies = [pickle.loads(pickle.dumps(encryptor)) for _ in range(2)]
+
+    message = np.random.default_rng(0).uniform(-1, 1, 32)
+    plain = encoder.encode(message, params.scaling_factor)
+    ciphs = [copy.encrypt(plain) for copy in [encryptor] + copies]
+    assert len({tuple(ciph.c1.coeffs) for ciph in ciphs}) == len(ciphs)
+    for ciph in ciphs:
+        assert np.abs(np.array(encoder.decode(decryptor.decrypt(ciph))) - message).max() < 1e-5
\ No newline at end of file
@@ -0,0 +1,185 @@
+"""二进制序列化格式的往返测试"""
+
+import mmap
+import random
+import tempfile
+import numpy as np
+import pytest
+from core.parameters import CKKSParameters
+from core.key_generator import CKKSKeyGenerator
+from core.encoder import CKKSEncoder
+from core.encryptor import CKKSEncryptor
+from core.decryptor import CKKSDecryptor
+from core.evaluator import CKKSEvaluator
+from mathematics.crt import CRTContext
+from mathematics.polynomial import Polynomial
+from mathematics.rns_polynomial import RNSPolynomial
+from primitives.plaintext import Plaintext
+from primitives.ciphertext import Ciphertext, SeededCiphertext
+from primitives.public_key import PublicKey
+from utils.serialization import (serialize, deserialize, read_header, MAGIC, FORMAT_VERSION, CIPHERTEXT,
+                                 SEEDED_CIPHERTEXT, ROTATION_KEY)
+
+
+class Scheme:
+    """一组参数下的密钥与运算对象"""
+
+    def __init__(self, modulus_chain):
+        self.params = CKKSParameters(poly_degree=64, ciph_modulus=1 << 120, big_modulus=1 << 160,
+                                     scaling_factor=1 << 30, modulus_chain=modulus_chain)
+        self.key_generator = CKKSKeyGenerator(self.params, seed=0)
+        self.encoder = CKKSEncoder(self.params)
+        self.encryptor = CKKSEncryptor(self.params, self.key_generator.public_key, self.key_generator.secret_key,
+                                       seed=0)
+        self.decryptor = CKKSDecryptor(self.params, self.key_generator.secret_key)
+        self.evaluator = CKKSEvaluator(self.params)
+        self.message = np.random.default_rng(0).uniform(-1, 1, 32)
+        self.plain = self.encoder.encode(self.message, self.params.scaling_factor)
+        self.ciph = self.encryptor.encrypt(self.plain)
+
+    def objects(self):
+        """全部可序列化的对象类型"""
+        return {
+            'plaintext': self.plain,
+            'prepared_plaintext': self.encoder.prepare(self.plain),
+            'ciphertext': self.ciph,
+            'rns_ciphertext': self.evaluator.to_rns(self.ciph),
+            'three_component': self.evaluator.multiply_no_relin(self.ciph, self.ciph),
+            'seeded_ciphertext': self.encryptor.encrypt_seeded(self.plain),
+            'public_key': self.key_generator.public_key,
+            'secret_key': self.key_generator.secret_key,
+            'relin_key': self.key_generator.relin_key,
+            'rotation_key': self.key_generator.generate_rot_key(1),
+        }
+
+
+@pytest.fixture(scope='module', params=[False, True], ids=['big_integer', 'modulus_chain'])
+def scheme(request):
+    return Scheme(request.param)
+
+
+def assert_same_poly(poly1, poly2):
+    assert type(poly1) is type(poly2)
+    if isinstance(poly1, RNSPolynomial):
+        assert poly1.crt.primes == poly2.crt.primes
+        assert poly1.ntt_form == poly2.ntt_form and poly1.bound == poly2.bound
+        assert np.array_equal(poly1.residues, poly2.residues)
+    else:
+        assert poly1.ring_degree == poly2.ring_degree and poly1.coeffs == poly2.coeffs
+
+
+def polys_of(obj):
+    if hasattr(obj, 'key'):
+        obj = obj.key
+    names = ('c0', 'c1', 'c2', 'poly', 'p0', 'p1', 's')
+    return [getattr(obj, name) for name in names if getattr(obj, name, None) is not None]
+
+
+@pytest.mark.parametrize('packed', [True, False], ids=['packed', 'unpacked'])
+@pytest.mark.parametrize('name', ['plaintext', 'prepared_plaintext', 'ciphertext', 'rns_ciphertext',
+                                  'three_component', 'seeded_ciphertext', 'public_key', 'secret_key',
+                                  'relin_key', 'rotation_key'])
+def test_round_trip(scheme, name, packed):
+    obj = scheme.objects()[name]
+    restored = deserialize(serialize(obj, scheme.params, packed), scheme.params)
+
+    assert type(restored) is type(obj)
+    for attr in ('scaling_factor', 'modulus', 'rotation', 'seed'):
+        assert getattr(restored, attr, None) == getattr(obj, attr, None)
+    assert len(polys_of(restored)) == len(polys_of(obj))
+    for poly1, poly2 in zip(polys_of(obj), polys_of(restored)):
+        assert_same_poly(poly1, poly2)
+
+
+def test_rns_context_taken_from_params(scheme):
+    restored = deserialize(serialize(scheme.evaluator.to_rns(scheme.ciph), scheme.params), scheme.params)
+    full_context = scheme.params.modulus_chain.full_context if scheme.params.modulus_chain \
+        else scheme.params.crt_context
+    assert set(restored.c0.crt.primes) <= set(full_context.primes)
+    assert restored.c0.residues.dtype == restored.c0.crt.dtype
+
+
+def test_seeded_ciphertext_expands_to_same_c1(scheme):
+    seeded = scheme.encryptor.encrypt_seeded(scheme.plain)
+    data = serialize(seeded, scheme.params)
+    restored = deserialize(data, scheme.params)
+
+    assert isinstance(restored, SeededCiphertext) and not restored.expanded
+    full = Ciphertext(seeded.c0, seeded.c1, seeded.scaling_factor, seeded.modulus)
+    assert len(data) < len(serialize(full, scheme.params))
+    assert_same_poly(restored.c1, seeded.c1)
+    decoded = scheme.encoder.decode(scheme.decryptor.decrypt(restored))
+    assert np.abs(np.array(decoded) - scheme.message).max() < 1e-3
+
+
+def test_three_component_ciphertext_decrypts_after_relinearization(scheme):
+    product = scheme.evaluator.multiply_no_relin(scheme.ciph, scheme.ciph)
+    restored = deserialize(serialize(product, scheme.params), scheme.params)
+
+    assert restored.c2 is not None
+    relinearized = scheme.evaluator.relinearize_ciphertext(restored, scheme.key_generator.relin_key)
+    expected = scheme.evaluator.relinearize_ciphertext(product, scheme.key_generator.relin_key)
+    assert scheme.decryptor.decrypt(relinearized).poly.coeffs == scheme.decryptor.decrypt(expected).poly.coeffs
+
+
+def test_header_metadata(scheme):
+    ciph = scheme.evaluator.to_rns(scheme.ciph)
+    header = read_header(serialize(ciph, scheme.params))
+    assert header['version'] == FORMAT_VERSION and header['type'] == CIPHERTEXT
+    assert header['scaling_factor'] == ciph.scaling_factor and header['modulus'] == ciph.modulus
+    if scheme.params.modulus_chain:
+        assert header['level'] == scheme.params.modulus_chain.level_of(ciph.modulus)
+    else:
+        assert header['level'] == -1
+
+    assert read_header(serialize(scheme.encryptor.encrypt_seeded(scheme.plain)))['type'] == SEEDED_CIPHERTEXT
+    rotation_header = read_header(serialize(scheme.key_generator.generate_rot_key(3)))
+    assert rotation_header['type'] == ROTATION_KEY and rotation_header['rotation'] == 3
+
+
+def test_unpacked_residues_read_zero_copy_from_mmap():
+    scheme = Scheme(modulus_chain=True)
+    ciph = scheme.evaluator.to_rns(scheme.ciph)
+    with tempfile.TemporaryFile() as f:
+        f.write(serialize(ciph, scheme.params, packed=False))
+        f.flush()
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            restored = deserialize(mapped, scheme.params)
+            residues = restored.c0.residues
+            assert not residues.flags.owndata and not residues.flags.writeable
+            assert_same_poly(restored.c0, ciph.c0)
+            del restored, residues
+
+
+def test_packed_residues_use_four_byte_words():
+    scheme = Scheme(modulus_chain=True)
+    ciph = scheme.evaluator.to_rns(scheme.ciph)
+    assert len(serialize(ciph, scheme.params)) < len(serialize(ciph, scheme.params, packed=False))
+
+
+@pytest.mark.parametrize('bits', [7, 62, 63, 64, 65, 120, 320])
+def test_coefficient_widths(bits):
+    modulus = 1 << bits
+    rng = random.Random(bits)
+    coeffs = [rng.randrange(-modulus // 2, modulus // 2) for _ in range(60)] + \
+        [-(modulus // 2), modulus // 2 - 1, 0, -1]
+    plain = Plaintext(Polynomial(len(coeffs), coeffs), 1 << 30)
+    assert deserialize(serialize(plain)).poly.coeffs == coeffs
+
+
+def test_rejects_primes_wider_than_eight_bytes():
+    crt = CRTContext(1, 70, 16)
+    assert crt.primes[0] >= 1 << 64
+    poly = RNSPolynomial(16, np.zeros((1, 16), dtype=crt.dtype), crt)
+    with pytest.raises(ValueError):
+        serialize(PublicKey(poly, poly))
+
+
+def test_rejects_foreign_data():
+    data = serialize(Plaintext(Polynomial(4, [1, -2, 3, -4]), 1 << 10))
+    with pytest.raises(ValueError):
+        deserialize(b'XXXX' + data[len(MAGIC):])
+    with pytest.raises(ValueError):
+        deserialize(data[:len(MAGIC)] + bytes([FORMAT_VERSION + 1]) + data[len(MAGIC) + 1:])
+    with pytest.raises(ValueError):
+        deserialize(data[:-8])
\ No newline at end of file
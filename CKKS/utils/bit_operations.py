@@ -10,6 +10,7 @@ def reverse_bits(value, width):
 def bit_reverse_vec(values):
     """向量位反转"""
     result = [0] * len(values)
+    width = int(log(len(values), 2))
     for i in range(len(values)):
-        result[i] = values[reverse_bits(i, int(log(len(values), 2)))]
+        result[i] = values[reverse_bits(i, width)]
     return result
\ No newline at end of file
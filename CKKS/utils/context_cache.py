@@ -0,0 +1,162 @@
+"""预计算上下文的磁盘缓存"""
+
+import os
+import json
+import hashlib
+import numpy as np
+from mathematics.crt import CRTContext
+from mathematics.ntt import NTTContext
+
+CACHE_VERSION = 2
+
+
+class ContextCache:
+    """CRT/NTT上下文与自举编码矩阵的磁盘缓存
+
+    每个条目由一个JSON清单与一个.npy数据文件组成: 清单记录键、素数、数据形状、文件大小与SHA-256摘要,
+    数据文件以内存映射方式加载。摘要在本进程首次读取某文件时校验一次, 之后只比较文件大小与修改时间,
+    不再逐次读取整个文件。校验失败的条目视为未命中并重新生成。
+    """
+
+    def __init__(self, cache_dir=None):
+        self.cache_dir = cache_dir or os.path.join(os.path.expanduser('~'), '.cache', 'ckks')
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self.hits = 0
+        self.misses = 0
+        self.invalid = 0
+        self._verified = {}
+
+    def _paths(self, key):
+        """条目的清单与数据文件路径"""
+        digest = hashlib.sha256(repr(key).encode()).hexdigest()[:24]
+        name = os.path.join(self.cache_dir, f'{key[0]}_{digest}')
+        return name + '.json', name + '.npy'
+
+    @staticmethod
+    def _file_digest(path):
+        """文件的SHA-256摘要"""
+        sha = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                sha.update(block)
+        return sha.hexdigest()
+
+    def _load(self, key, validate=None):
+        """读取并校验条目, 未命中或校验失败时返回None
+
+        validate(manifest, data)可对内容做额外的数学校验。
+        """
+        manifest_path, data_path = self._paths(key)
+        if not (os.path.exists(manifest_path) and os.path.exists(data_path)):
+            self.misses += 1
+            return None
+
+        try:
+            with open(manifest_path, encoding='utf-8') as f:
+                manifest = json.load(f)
+            if manifest['version'] != CACHE_VERSION or manifest['key'] != json.loads(json.dumps(key)):
+                raise ValueError('缓存键不一致')
+            stat = os.stat(data_path)
+            if stat.st_size != manifest['size']:
+                raise ValueError('缓存数据大小不一致')
+            if self._verified.get(data_path) != (stat.st_size, stat.st_mtime_ns):
+                if manifest['sha256'] != self._file_digest(data_path):
+                    raise ValueError('缓存数据摘要不一致')
+                self._verified[data_path] = (stat.st_size, stat.st_mtime_ns)
+            data = np.load(data_path, mmap_mode='r')
+            if list(data.shape) != manifest['shape']:
+                raise ValueError('缓存数据形状不一致')
+            if validate is not None and not validate(manifest, data):
+                raise ValueError('缓存内容校验失败')
+        except (OSError, ValueError, KeyError):
+            self.invalid += 1
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return manifest, data
+
+    def _save(self, key, manifest, data):
+        """写入条目, 先写临时文件再原子替换"""
+        manifest_path, data_path = self._paths(key)
+        tmp_data = data_path + f'.{os.getpid()}.tmp'
+        with open(tmp_data, 'wb') as f:
+            np.save(f, data)
+        manifest = dict(manifest, version=CACHE_VERSION, key=list(key), shape=list(data.shape),
+                        size=os.path.getsize(tmp_data), sha256=self._file_digest(tmp_data))
+        tmp_manifest = manifest_path + f'.{os.getpid()}.tmp'
+        with open(tmp_manifest, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f)
+        os.replace(tmp_data, data_path)
+        os.replace(tmp_manifest, manifest_path)
+
+    def crt_context(self, num_primes, prime_size, poly_degree, small_primes=False):
+        """读取或生成CRT上下文
+
+        缓存内容为素数及每个素数的单位根幂、逆单位根幂表, 以及共享的位反转索引;
+        加载时检查素数满足 p ≡ 1 (mod 2N) 且 psi^N ≡ -1 (mod p)。
+        """
+        def validate(manifest, data):
+            return all(prime % (2 * poly_degree) == 1 and
+                       pow(int(data[2 * i][1]), poly_degree, prime) == prime - 1
+                       for i, prime in enumerate(manifest['primes']))
+
+        key = ('crt', poly_degree, prime_size, num_primes, bool(small_primes))
+        entry = self._load(key, validate)
+        if entry is not None:
+            manifest, data = entry
+            primes = manifest['primes']
+            ntts = [NTTContext(poly_degree, prime, tables=(data[2 * i], data[2 * i + 1], data[-1]))
+                    for i, prime in enumerate(primes)]
+            return CRTContext(num_primes, prime_size, poly_degree, small_primes, primes=primes, ntts=ntts)
+
+        crt = CRTContext(num_primes, prime_size, poly_degree, small_primes)
+        rows = []
+        for ntt in crt.ntts:
+            roots, roots_inv, reversed_bits = ntt.tables()
+            rows.extend([roots, roots_inv])
+        rows.append(reversed_bits)
+        self._save(key, {'primes': crt.primes}, np.stack(rows))
+        return crt
+
+    def encoding_matrices(self, poly_degree, generate):
+        """读取或生成自举编码矩阵(encoding_mat0, encoding_mat1)
+
+        命中时返回只读的内存映射数组, 未命中时返回新生成的复数数组, 两种情况均为np.ndarray。
+        """
+        key = ('boot', poly_degree)
+        entry = self._load(key)
+        if entry is not None:
+            data = entry[1]
+            return data[0], data[1]
+
+        data = np.asarray(generate(), dtype=np.complex128)
+        self._save(key, {}, data)
+        return data[0], data[1]
+
+    def encoded_diagonals(self, key, generate):
+        """读取或生成矩阵乘法的编码对角线(元数据, 定宽数组)
+
+        key由DiagonalCache给出(矩阵指纹、小步数、缩放因子与层的素数), 元数据须可写入JSON;
+        数组为对象类型(不小于2^64的素数的剩余或超出int64的系数)时不写入磁盘。
+        """
+        key = ('diag',) + tuple(key)
+        entry = self._load(key)
+        if entry is not None:
+            manifest, data = entry
+            return manifest['meta'], data
+
+        meta, data = generate()
+        if data.dtype != object:
+            self._save(key, {'meta': meta}, data)
+        return meta, data
+
+    def report(self):
+        """打印缓存命中情况"""
+        total = self.hits + self.misses
+        print("上下文缓存统计:")
+        print(f"  缓存目录: {self.cache_dir}")
+        print(f"  命中: {self.hits}, 未命中: {self.misses}, 校验失败: {self.invalid}")
+        if total:
+            print(f"  命中率: {self.hits / total:.1%}")
+        return {'hits': self.hits, 'misses': self.misses, 'invalid': self.invalid}
\ No newline at end of file
@@ -0,0 +1,115 @@
+"""矩阵乘法编码对角线的内存LRU缓存"""
+
+import sys
+import hashlib
+import weakref
+from collections import OrderedDict
+import numpy as np
+
+
+def plaintext_nbytes(plain):
+    """明文占用内存的估计值(字节)"""
+    poly = plain.poly
+    if hasattr(poly, 'residues'):
+        residues = poly.residues
+        if residues.dtype != object:
+            return residues.nbytes
+        return residues.size * (8 + sys.getsizeof(int(residues.max())))
+    return len(poly.coeffs) * (8 + sys.getsizeof(max(poly.coeffs, key=abs)))
+
+
+class DiagonalCache:
+    """编码并预旋转的矩阵对角线缓存
+
+    条目以(矩阵指纹, 小步数, 缩放因子, 层的素数)为键, 值为按对角线下标索引的明文字典,
+    总字节数超过max_bytes时淘汰最久未使用的条目。配置了ContextCache时, NTT域的剩余
+    (无CRT上下文时为int64系数)同时持久化到磁盘, 磁盘命中时既不重新编码也不重新做NTT:
+    定宽素数下直接引用内存映射, 大素数的剩余以uint64保存, 读回时转换为上下文的对象数组。
+    超出int64的系数与不小于2^64的素数不写入磁盘。
+    只读ndarray的指纹按对象标识记忆, 其余矩阵每次重新计算指纹。
+    """
+
+    def __init__(self, max_bytes=256 << 20, context_cache=None):
+        self.max_bytes = max_bytes
+        self.context_cache = context_cache
+        self.entries = OrderedDict()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+        self.evictions = 0
+        self._fingerprints = {}
+
+    def __getstate__(self):
+        """参数传递到子进程时不复制缓存内容"""
+        state = self.__dict__.copy()
+        state.update(entries=OrderedDict(), nbytes=0, _fingerprints={})
+        return state
+
+    def fingerprint(self, matrix):
+        """矩阵内容的SHA-256指纹"""
+        memoize = isinstance(matrix, np.ndarray) and not matrix.flags.writeable
+        if memoize:
+            memo = self._fingerprints.get(id(matrix))
+            if memo is not None and memo[0]() is matrix:
+                return memo[1]
+
+        data = np.ascontiguousarray(np.asarray(matrix, dtype=np.complex128))
+        digest = hashlib.sha256(repr(data.shape).encode() + data.tobytes()).hexdigest()[:32]
+        if memoize:
+            key = id(matrix)
+            self._fingerprints[key] = (weakref.ref(matrix, lambda _: self._fingerprints.pop(key, None)), digest)
+        return digest
+
+    def diagonals(self, key, level, generate, restore):
+        """读取或生成编码对角线
+
+        generate()返回第level层使用的(元数据, 数组), 磁盘缓存与内存缓存均以key与level索引;
+        restore(meta, data)将其转换为按对角线下标索引的明文字典。
+        """
+        memory_key = tuple(key) + (level,)
+        entry = self.entries.get(memory_key)
+        if entry is not None:
+            self.entries.move_to_end(memory_key)
+            self.hits += 1
+            return entry[0]
+
+        self.misses += 1
+        if self.context_cache:
+            disk_hits = self.context_cache.hits
+            meta, data = self.context_cache.encoded_diagonals(memory_key, generate)
+            self.disk_hits += self.context_cache.hits - disk_hits
+        else:
+            meta, data = generate()
+
+        plains = restore(meta, data)
+        self._store(memory_key, plains, sum(plaintext_nbytes(plain) for plain in plains.values()))
+        return plains
+
+    def _store(self, key, plains, nbytes):
+        """写入条目并按LRU淘汰, 超过容量上限的单个条目不缓存"""
+        if nbytes > self.max_bytes:
+            return
+        self.entries[key] = (plains, nbytes)
+        self.nbytes += nbytes
+        while self.nbytes > self.max_bytes:
+            _, (_, evicted) = self.entries.popitem(last=False)
+            self.nbytes -= evicted
+            self.evictions += 1
+
+    def clear(self):
+        """清空内存中的条目"""
+        self.entries.clear()
+        self.nbytes = 0
+
+    def report(self):
+        """打印缓存命中率与占用内存"""
+        total = self.hits + self.misses
+        print("对角线缓存统计:")
+        print(f"  条目: {len(self.entries)}, 占用内存: {self.nbytes / (1 << 20):.2f} MB "
+              f"(上限 {self.max_bytes / (1 << 20):.0f} MB)")
+        print(f"  命中: {self.hits}, 未命中: {self.misses}, 磁盘命中: {self.disk_hits}, 淘汰: {self.evictions}")
+        if total:
+            print(f"  命中率: {self.hits / total:.1%}")
+        return {'hits': self.hits, 'misses': self.misses, 'disk_hits': self.disk_hits,
+                'evictions': self.evictions, 'entries': len(self.entries), 'nbytes': self.nbytes}
\ No newline at end of file
@@ -0,0 +1,152 @@
+"""旋转、共轭与重线性化密钥的内存映射密钥库"""
+
+import os
+import json
+import mmap
+import struct
+from collections.abc import Mapping
+from mathematics.rns_polynomial import RNSPolynomial
+from primitives.public_key import PublicKey
+from primitives.rotation_key import RotationKey
+from utils.serialization import serialize, deserialize
+
+STORE_MAGIC = b'CKKSKEYS'
+STORE_VERSION = 1
+
+# 魔数、版本、索引偏移与索引长度; 文件头长度为8的倍数, 其后的记录保持8字节对齐
+_PREFIX = struct.Struct('<8sI4xQQ')
+
+
+def key_context(params):
+    """密钥库中密钥所用的CRT上下文: 模数链的全部素数, 或大整数模式的完整CRT上下文"""
+    if params.modulus_chain:
+        return params.modulus_chain.full_context
+    assert params.crt_context is not None, '密钥库需要RNS参数(crt_context或模数链)'
+    return params.crt_context
+
+
+def prepare_key(key, crt):
+    """交换密钥转换为crt下的NTT域RNS形式, 密钥交换时按所需素数截取前缀行"""
+    return PublicKey(*[poly if isinstance(poly, RNSPolynomial) else
+                       RNSPolynomial.from_polynomial(poly, crt, ntt_form=True) for poly in (key.p0, key.p1)])
+
+
+class RotationKeys(Mapping):
+    """按旋转量索引的只读旋转密钥字典, 首次访问某旋转量时才从密钥库加载"""
+
+    def __init__(self, store, rotations):
+        self.store = store
+        self.rotations = frozenset(rotations)
+
+    def __getitem__(self, rotation):
+        if rotation not in self.rotations:
+            raise KeyError(rotation)
+        return self.store.load(f'rot:{rotation}')
+
+    def __contains__(self, rotation):
+        return rotation in self.rotations
+
+    def __iter__(self):
+        return iter(sorted(self.rotations))
+
+    def __len__(self):
+        return len(self.rotations)
+
+
+class KeyStore:
+    """单文件密钥库
+
+    文件由定长文件头、按8字节对齐的序列化记录与末尾的JSON索引组成。每条记录为完整CRT上下文下
+    NTT域的交换密钥, 剩余以8字节字写出。打开时只读映射整个文件, 访问到的密钥才反序列化,
+    剩余始终是映射页面上的uint64视图, 多个进程打开同一文件时共享操作系统页缓存而不各自复制。
+    rot_keys、conj_key与relin_key可直接传给RotationOperations、MatrixOperations与自举。
+
+    只有小素数(小于2^32, 即small_primes或缩放因子不超过2^30的模数链)的上下文能直接以映射的剩余运算。
+    大素数的上下文(默认prime_size=59, 或缩放因子为2^40等的模数链)剩余为对象类型, 每次密钥交换都要把
+    所需的行临时转换为对象数组; 页面仍然共享, 但运算比内存中已转换的密钥慢。
+    """
+
+    def __init__(self, path, params):
+        self.path = path
+        self.params = params
+        self._open()
+
+    def _open(self):
+        with open(self.path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, index_offset, index_size = _PREFIX.unpack_from(self._mmap, 0)
+        if magic != STORE_MAGIC:
+            raise ValueError('文件不是CKKS密钥库')
+        if version != STORE_VERSION:
+            raise ValueError(f'不支持的密钥库版本{version}')
+
+        self.index = json.loads(bytes(self._mmap[index_offset:index_offset + index_size]))
+        assert self.index['primes'] == key_context(self.params).primes, '密钥库的素数与参数不一致'
+        self._keys = {}
+        self.rot_keys = RotationKeys(self, [int(name[4:]) for name in self.index['entries']
+                                            if name.startswith('rot:')])
+
+    def __getstate__(self):
+        """传递到子进程时只传路径与参数, 子进程重新映射同一文件"""
+        return {'path': self.path, 'params': self.params}
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._open()
+
+    @staticmethod
+    def write(path, params, rot_keys=None, conj_key=None, relin_key=None):
+        """将密钥转换为NTT域并写入path, 逐条写出而不在内存中拼接整个文件"""
+        crt = key_context(params)
+        records = [(f'rot:{rotation}', rotation, rot_key.key) for rotation, rot_key in (rot_keys or {}).items()]
+        records += [(name, None, key) for name, key in (('conj', conj_key), ('relin', relin_key))
+                    if key is not None]
+
+        entries = {}
+        tmp_path = path + f'.{os.getpid()}.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(bytes(_PREFIX.size))
+            for name, rotation, key in records:
+                key = prepare_key(key, crt)
+                data = serialize(key if rotation is None else RotationKey(rotation, key), packed=False)
+                entries[name] = [f.tell(), len(data)]
+                f.write(data)
+                f.write(bytes(-len(data) % 8))
+
+            index = json.dumps({'poly_degree': params.poly_degree, 'primes': crt.primes,
+                                'entries': entries}).encode()
+            index_offset = f.tell()
+            f.write(index)
+            f.seek(0)
+            f.write(_PREFIX.pack(STORE_MAGIC, STORE_VERSION, index_offset, len(index)))
+        os.replace(tmp_path, path)
+
+    def load(self, name):
+        """按条目名读取密钥, 结果在本进程内缓存"""
+        if name not in self._keys:
+            offset, size = self.index['entries'][name]
+            self._keys[name] = deserialize(memoryview(self._mmap)[offset:offset + size], self.params, zero_copy=True)
+        return self._keys[name]
+
+    @property
+    def conj_key(self):
+        return self.load('conj') if 'conj' in self.index['entries'] else None
+
+    @property
+    def relin_key(self):
+        return self.load('relin') if 'relin' in self.index['entries'] else None
+
+    @property
+    def loaded(self):
+        """本进程已加载的条目名"""
+        return sorted(self._keys)
+
+    def report(self):
+        """打印密钥库大小与已加载的条目数"""
+        size = os.path.getsize(self.path)
+        print("密钥库统计:")
+        print(f"  文件: {self.path}, 大小: {size / (1 << 20):.2f} MB")
+        print(f"  旋转密钥: {len(self.rot_keys)}, 共轭密钥: {'有' if 'conj' in self.index['entries'] else '无'}, "
+              f"重线性化密钥: {'有' if 'relin' in self.index['entries'] else '无'}")
+        print(f"  已加载: {len(self._keys)} / {len(self.index['entries'])}")
+        return {'nbytes': size, 'entries': len(self.index['entries']), 'loaded': len(self._keys)}
\ No newline at end of file
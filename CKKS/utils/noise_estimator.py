@@ -13,6 +13,20 @@ class NoiseEstimator:
         """估计初始噪声"""
         return math.sqrt(self.params.poly_degree / 12.0)
 
+    def estimate_rescale_noise(self, rounded=True):
+        """估计重缩放舍入误差在槽位上的高概率上界
+
+        c0与c1各系数的舍入误差在[-1/2, 1/2]内均匀分布, c0 + c1*s每个系数的方差为(1 + h)/12,
+        经典范嵌入后每个槽位为N个系数的加权和, 取6倍标准差。
+        rounded为False时为向下取整, 误差另含均值1/2的偏置: 全1多项式在槽位上的模不超过2N/π,
+        私钥在槽位上的模取sqrt(h)的6倍。
+        """
+        poly_degree, hamming_weight = self.params.poly_degree, self.params.hamming_weight
+        noise = 6 * math.sqrt(poly_degree * (1 + hamming_weight) / 12.0)
+        if not rounded:
+            noise += poly_degree / math.pi * (1 + 6 * math.sqrt(hamming_weight))
+        return noise
+
     def estimate_addition_noise(self, noise1, noise2):
         """加法噪声估计"""
         return math.sqrt(noise1 ** 2 + noise2 ** 2)
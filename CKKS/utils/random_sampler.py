@@ -1,7 +1,13 @@
 """完整的随机采样实现"""
 
+import os
+import math
 import random
+import hashlib
+import numpy as np
 
+# 以下基于random模块的逐系数采样不是密码学安全的, 密钥生成与加密均使用XOFSampler;
+# 保留这些函数仅作为基准测试中的对照与生成随机消息
 def sample_uniform(min_val, max_val, num_samples):
     """均匀分布采样"""
     if num_samples == 1:
@@ -52,4 +58,88 @@ def sample_random_real_vector(length):
     sample = [0] * length
     for i in range(length):
         sample[i] = random.random()
-    return sample
\ No newline at end of file
+    return sample
+
+
+class XOFSampler:
+    """以SHAKE-256扩展种子的批量密码学安全采样器
+
+    每次采样以 SHAKE-256(种子 || 计数器) 生成所需的全部字节, 再以数组运算转换为目标分布;
+    相同种子与相同的调用顺序得到相同的结果。seed为None时从os.urandom取32字节。
+    """
+
+    def __init__(self, seed=None):
+        if seed is None:
+            seed = os.urandom(32)
+        elif isinstance(seed, int):
+            seed = seed.to_bytes(max(1, (seed.bit_length() + 7) // 8), 'big')
+        elif isinstance(seed, str):
+            seed = seed.encode()
+        self.seed = bytes(seed)
+        self.counter = 0
+
+    def child(self, label):
+        """由本种子与标签派生独立的子采样器, 结果与派生顺序无关"""
+        return XOFSampler(hashlib.sha256(self.seed + b'/' + str(label).encode()).digest())
+
+    def random_bytes(self, num_bytes):
+        """下一段XOF输出"""
+        block = hashlib.shake_256(self.seed + self.counter.to_bytes(8, 'little')).digest(num_bytes)
+        self.counter += 1
+        return block
+
+    def random_words(self, num_words):
+        """均匀的64位无符号整数数组"""
+        return np.frombuffer(self.random_bytes(8 * num_words), dtype='<u8').astype(np.uint64)
+
+    def ternary(self, num_samples):
+        """三角形分布: -1与1的概率各为1/4, 0的概率为1/2, 与sample_triangle同分布"""
+        pairs = np.unpackbits(np.frombuffer(self.random_bytes((num_samples + 3) // 4), dtype=np.uint8))
+        pairs = pairs[:2 * num_samples].reshape(num_samples, 2).astype(np.int64)
+        # 高位为0时取 ±1 (由低位决定符号), 否则取0
+        return (1 - pairs[:, 0]) * (2 * pairs[:, 1] - 1)
+
+    def hamming_weight(self, length, hamming_weight):
+        """恰有hamming_weight个非零系数(±1等概率)的向量: 按64位随机键排序取前hamming_weight个位置"""
+        positions = np.argsort(self.random_words(length), kind='stable')[:hamming_weight]
+        signs = self.random_bytes(hamming_weight)
+        sample = np.zeros(length, dtype=np.int64)
+        sample[positions] = 2 * (np.frombuffer(signs, dtype=np.uint8) & 1).astype(np.int64) - 1
+        return sample
+
+    def gaussian(self, num_samples, sigma=3.2, tail=6):
+        """离散高斯分布: 在[-tail*sigma, tail*sigma]上按累积分布表对53位均匀数反查"""
+        bound = int(math.ceil(tail * sigma))
+        support = np.arange(-bound, bound + 1)
+        cdf = np.cumsum(np.exp(-support.astype(np.float64) ** 2 / (2 * sigma * sigma)))
+        cdf /= cdf[-1]
+        uniform = (self.random_words(num_samples) >> np.uint64(11)) * (1.0 / (1 << 53))
+        return support[np.minimum(np.searchsorted(cdf, uniform, side='right'), len(support) - 1)]
+
+    def uniform(self, num_samples, modulus):
+        """[0, modulus)上的均匀分布
+
+        模数不超过2^64时以拒绝采样得到无偏的uint64数组; 否则每个系数取 bit_length + 128 位再约化,
+        统计距离不超过2^-128, 返回Python整数的object数组。大模数的批量采样应优先使用uniform_residues。
+        """
+        if modulus <= 1 << 64:
+            # 接受 [0, limit) 内的值, limit为modulus的倍数
+            limit = ((1 << 64) // modulus) * modulus
+            sample = np.empty(0, dtype=np.uint64)
+            while len(sample) < num_samples:
+                words = self.random_words(num_samples - len(sample))
+                if limit < 1 << 64:
+                    words = words[words < np.uint64(limit)]
+                sample = np.concatenate((sample, words))
+            return sample % np.uint64(modulus) if modulus < 1 << 64 else sample
+
+        width = (modulus.bit_length() + 128 + 7) // 8
+        data = memoryview(self.random_bytes(num_samples * width))
+        values = np.empty(num_samples, dtype=object)
+        values[:] = [int.from_bytes(data[i:i + width], 'little') % modulus
+                     for i in range(0, num_samples * width, width)]
+        return values
+
+    def uniform_residues(self, num_samples, primes):
+        """模 prod(primes) 均匀分布的RNS表示: 由CRT, 各素数下独立均匀的剩余即为乘积模数下的均匀分布"""
+        return np.stack([self.uniform(num_samples, prime) for prime in primes])
\ No newline at end of file
@@ -0,0 +1,319 @@
+"""密文、明文与密钥的二进制序列化格式
+
+每条记录以 魔数b'CKKS'、格式版本、对象类型 开头, 之后为对象字段:
+- 数值字段(缩放因子、模数、系数上界)带类型标记, 整数为变长有符号小端字节, 浮点数为float64;
+- 系数多项式按所有系数中最大位数确定的定宽有符号小端字存储, 模q中心化系数的字宽即为q的位数;
+- RNS多项式先写素数列表, 再逐素数写剩余, 打包模式下素数均小于2^32时以4字节字存储, 否则以8字节字存储,
+  素数须小于2^64。
+数组均按8字节对齐, 读取时以np.frombuffer直接引用bytes/memoryview/mmap中的数据;
+以非打包模式写出定宽素数的剩余时, 反序列化得到的剩余数组即为输入缓冲区上的只读视图, 不复制数据。
+"""
+
+import struct
+import numpy as np
+from mathematics.crt import CRTContext
+from mathematics.polynomial import Polynomial
+from mathematics.rns_polynomial import RNSPolynomial
+from primitives.plaintext import Plaintext, PreparedPlaintext
+from primitives.ciphertext import Ciphertext, SeededCiphertext
+from primitives.public_key import PublicKey
+from primitives.secret_key import SecretKey
+from primitives.rotation_key import RotationKey
+
+MAGIC = b'CKKS'
+FORMAT_VERSION = 1
+
+PLAINTEXT = 1
+PREPARED_PLAINTEXT = 2
+CIPHERTEXT = 3
+SEEDED_CIPHERTEXT = 4
+PUBLIC_KEY = 5
+SECRET_KEY = 6
+ROTATION_KEY = 7
+
+_NONE, _INT, _FLOAT = 0, 1, 2
+_COEFF_POLY, _RNS_POLY = 0, 1
+_ALIGNMENT = 8
+
+
+class _Writer:
+    """按顺序拼接字段的字节缓冲"""
+
+    def __init__(self):
+        self.chunks = []
+        self.size = 0
+
+    def write(self, data):
+        self.chunks.append(data)
+        self.size += len(data)
+
+    def pack(self, fmt, *values):
+        self.write(struct.pack(fmt, *values))
+
+    def align(self):
+        """补零到8字节边界"""
+        padding = -self.size % _ALIGNMENT
+        if padding:
+            self.write(bytes(padding))
+
+    def number(self, value):
+        """None、任意精度整数或浮点数"""
+        if value is None:
+            self.pack('<B', _NONE)
+        elif isinstance(value, (int, np.integer)):
+            value = int(value)
+            data = value.to_bytes(value.bit_length() // 8 + 1, 'little', signed=True)
+            self.pack('<BI', _INT, len(data))
+            self.write(data)
+        else:
+            self.pack('<Bd', _FLOAT, float(value))
+
+    def getvalue(self):
+        return b''.join(self.chunks)
+
+
+class _Reader:
+    """在memoryview上按偏移读取字段, 不复制底层缓冲区"""
+
+    def __init__(self, buffer):
+        self.view = memoryview(buffer).cast('B')
+        self.offset = 0
+
+    def unpack(self, fmt):
+        values = struct.unpack_from(fmt, self.view, self.offset)
+        self.offset += struct.calcsize(fmt)
+        return values if len(values) > 1 else values[0]
+
+    def read(self, size):
+        data = self.view[self.offset:self.offset + size]
+        if len(data) != size:
+            raise ValueError('序列化数据不完整')
+        self.offset += size
+        return data
+
+    def align(self):
+        self.offset += -self.offset % _ALIGNMENT
+
+    def array(self, dtype, count):
+        """缓冲区上的只读数组视图"""
+        array = np.frombuffer(self.view, dtype=dtype, count=count, offset=self.offset)
+        self.offset += array.nbytes
+        return array
+
+    def number(self):
+        tag = self.unpack('<B')
+        if tag == _NONE:
+            return None
+        if tag == _INT:
+            return int.from_bytes(self.read(self.unpack('<I')), 'little', signed=True)
+        if tag == _FLOAT:
+            return self.unpack('<d')
+        raise ValueError(f'未知的数值类型标记{tag}')
+
+
+def _coeff_width(coeffs):
+    """容纳全部有符号系数的最小字节数"""
+    return max(max(coeffs), -min(coeffs)).bit_length() // 8 + 1
+
+
+def _write_coeffs(writer, coeffs):
+    """定宽有符号小端字存储系数"""
+    width = _coeff_width(coeffs)
+    writer.pack('<H', width)
+    writer.align()
+    if width <= 8:
+        words = np.array(coeffs, dtype='<i8').view(np.uint8).reshape(len(coeffs), 8)
+        writer.write(words[:, :width].tobytes())
+    else:
+        writer.write(b''.join([coeff.to_bytes(width, 'little', signed=True) for coeff in coeffs]))
+    writer.align()
+
+
+def _read_coeffs(reader, degree):
+    width = reader.unpack('<H')
+    reader.align()
+    raw = reader.array(np.uint8, degree * width).reshape(degree, width)
+    reader.align()
+    if width <= 8:
+        # 符号扩展到int64
+        words = np.where(raw[:, -1:] >= 0x80, np.uint8(0xFF), np.uint8(0)).repeat(8, axis=1)
+        words[:, :width] = raw
+        return words.view('<i8').ravel().tolist()
+
+    # 每个系数的width字节整体作为一个bytes对象, 各以一次int.from_bytes解码
+    from_bytes = int.from_bytes
+    return [from_bytes(data, 'little', signed=True) for data in raw.view(f'V{width}').ravel().tolist()]
+
+
+def _write_poly(writer, poly, packed=True):
+    if isinstance(poly, RNSPolynomial):
+        crt = poly.crt
+        if max(crt.primes) >= 1 << 64:
+            raise ValueError(f'RNS素数({max(crt.primes).bit_length()}位)超出8字节字, 无法序列化, '
+                             f'请使用不超过64位的素数(prime_size)')
+        word_bytes = 4 if packed and max(crt.primes) < 1 << 32 else 8
+        writer.pack('<BIHBB', _RNS_POLY, poly.ring_degree, len(crt.primes), poly.ntt_form, word_bytes)
+        writer.number(poly.bound)
+        writer.align()
+        writer.write(np.array(crt.primes, dtype='<u8').tobytes())
+        writer.write(np.ascontiguousarray(poly.residues.astype(f'<u{word_bytes}')).tobytes())
+        writer.align()
+    else:
+        writer.pack('<BI', _COEFF_POLY, poly.ring_degree)
+        _write_coeffs(writer, poly.coeffs)
+
+
+def _resolve_context(primes, degree, contexts):
+    """在已有上下文中查找恰由primes构成的CRT上下文, 找不到时新建"""
+    for crt in contexts:
+        if crt.primes == primes:
+            return crt
+        if crt.poly_degree == degree and set(primes) <= set(crt.primes):
+            return crt.sub_context(primes)
+    return CRTContext(len(primes), None, degree, primes=primes)
+
+
+def _read_poly(reader, contexts, zero_copy=False):
+    kind = reader.unpack('<B')
+    if kind == _COEFF_POLY:
+        degree = reader.unpack('<I')
+        return Polynomial(degree, _read_coeffs(reader, degree))
+    if kind != _RNS_POLY:
+        raise ValueError(f'未知的多项式类型{kind}')
+
+    degree, num_primes, ntt_form, word_bytes = reader.unpack('<IHBB')
+    bound = reader.number()
+    reader.align()
+    primes = [int(prime) for prime in reader.array('<u8', num_primes)]
+    residues = reader.array(f'<u{word_bytes}', num_primes * degree).reshape(num_primes, degree)
+    reader.align()
+    crt = _resolve_context(primes, degree, contexts)
+    if residues.dtype != crt.dtype and not (zero_copy and word_bytes == 8):
+        residues = residues.astype(crt.dtype)
+    return RNSPolynomial(degree, residues, crt, bool(ntt_form), bound)
+
+
+def _level_of(modulus, params):
+    """模数链参数下密文所在层, 未知时为-1"""
+    chain = params.modulus_chain if params else None
+    if chain is None or modulus is None:
+        return -1
+    try:
+        return chain.level_of(modulus)
+    except ValueError:
+        return -1
+
+
+def serialize(obj, params=None, packed=True):
+    """将Plaintext、Ciphertext、PublicKey、SecretKey或RotationKey写为bytes
+
+    给出模数链参数时同时记录密文所在层; packed为False时RNS剩余一律以8字节字写出, 以便零拷贝读取。
+    """
+    writer = _Writer()
+    if isinstance(obj, PreparedPlaintext):
+        writer.pack('<4sBB', MAGIC, FORMAT_VERSION, PREPARED_PLAINTEXT)
+        writer.number(obj.scaling_factor)
+        _write_poly(writer, obj.poly, packed)
+    elif isinstance(obj, Plaintext):
+        writer.pack('<4sBB', MAGIC, FORMAT_VERSION, PLAINTEXT)
+        writer.number(obj.scaling_factor)
+        _write_poly(writer, obj.poly, packed)
+    elif isinstance(obj, Ciphertext):
+        seeded = isinstance(obj, SeededCiphertext)
+        writer.pack('<4sBB', MAGIC, FORMAT_VERSION, SEEDED_CIPHERTEXT if seeded else CIPHERTEXT)
+        writer.number(obj.scaling_factor)
+        writer.number(obj.modulus)
+        writer.pack('<h', _level_of(obj.modulus, params))
+        if seeded:
+            writer.pack('<H', len(obj.seed))
+            writer.write(bytes(obj.seed))
+            _write_poly(writer, obj.c0, packed)
+        else:
+            writer.pack('<B', 3 if obj.c2 is not None else 2)
+            for poly in (obj.c0, obj.c1) if obj.c2 is None else (obj.c0, obj.c1, obj.c2):
+                _write_poly(writer, poly, packed)
+    elif isinstance(obj, RotationKey):
+        writer.pack('<4sBBq', MAGIC, FORMAT_VERSION, ROTATION_KEY, obj.rotation)
+        _write_poly(writer, obj.key.p0, packed)
+        _write_poly(writer, obj.key.p1, packed)
+    elif isinstance(obj, PublicKey):
+        writer.pack('<4sBB', MAGIC, FORMAT_VERSION, PUBLIC_KEY)
+        _write_poly(writer, obj.p0, packed)
+        _write_poly(writer, obj.p1, packed)
+    elif isinstance(obj, SecretKey):
+        writer.pack('<4sBB', MAGIC, FORMAT_VERSION, SECRET_KEY)
+        _write_poly(writer, obj.s, packed)
+    else:
+        raise TypeError(f'不支持序列化的对象类型{type(obj).__name__}')
+    return writer.getvalue()
+
+
+def _read_header(reader):
+    magic, version, obj_type = reader.unpack('<4sBB')
+    if magic != MAGIC:
+        raise ValueError('数据不是CKKS序列化格式')
+    if version > FORMAT_VERSION:
+        raise ValueError(f'不支持的序列化格式版本{version}')
+    return version, obj_type
+
+
+def read_header(buffer):
+    """只解析记录头部的元数据, 不读取多项式"""
+    reader = _Reader(buffer)
+    version, obj_type = _read_header(reader)
+    header = {'version': version, 'type': obj_type}
+    if obj_type in (PLAINTEXT, PREPARED_PLAINTEXT):
+        header['scaling_factor'] = reader.number()
+    elif obj_type in (CIPHERTEXT, SEEDED_CIPHERTEXT):
+        header['scaling_factor'] = reader.number()
+        header['modulus'] = reader.number()
+        header['level'] = reader.unpack('<h')
+    elif obj_type == ROTATION_KEY:
+        header['rotation'] = reader.unpack('<q')
+    return header
+
+
+def deserialize(buffer, params=None, zero_copy=False):
+    """由bytes、memoryview或mmap读取对象
+
+    RNS多项式的CRT上下文优先取自params(模数链或crt_context)中素数相同的上下文或子上下文。
+    zero_copy为True时, 8字节字的剩余即使CRT上下文的剩余为对象类型也保持为缓冲区上的uint64视图,
+    由使用方在运算前按需转换(见KeyStore)。
+    """
+    contexts = []
+    if params is not None:
+        if params.modulus_chain:
+            contexts.append(params.modulus_chain.full_context)
+        if params.crt_context:
+            contexts.append(params.crt_context)
+
+    def read_poly():
+        return _read_poly(reader, contexts, zero_copy)
+
+    reader = _Reader(buffer)
+    _, obj_type = _read_header(reader)
+    if obj_type in (PLAINTEXT, PREPARED_PLAINTEXT):
+        scaling_factor = reader.number()
+        poly = read_poly()
+        return (PreparedPlaintext if obj_type == PREPARED_PLAINTEXT else Plaintext)(poly, scaling_factor)
+
+    if obj_type in (CIPHERTEXT, SEEDED_CIPHERTEXT):
+        scaling_factor = reader.number()
+        modulus = reader.number()
+        level = reader.unpack('<h')
+        if level >= 0 and params is not None and params.modulus_chain:
+            assert params.modulus_chain.level_context(level).modulus == modulus, '密文模数与所在层不一致'
+        if obj_type == SEEDED_CIPHERTEXT:
+            seed = bytes(reader.read(reader.unpack('<H')))
+            return SeededCiphertext(read_poly(), seed, scaling_factor, modulus)
+        polys = [read_poly() for _ in range(reader.unpack('<B'))]
+        return Ciphertext(polys[0], polys[1], scaling_factor, modulus, polys[2] if len(polys) == 3 else None)
+
+    if obj_type == ROTATION_KEY:
+        rotation = reader.unpack('<q')
+        return RotationKey(rotation, PublicKey(read_poly(), read_poly()))
+    if obj_type == PUBLIC_KEY:
+        return PublicKey(read_poly(), read_poly())
+    if obj_type == SECRET_KEY:
+        return SecretKey(read_poly())
+    raise ValueError(f'未知的对象类型{obj_type}')
\ No newline at end of file